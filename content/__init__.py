@@ -1,2 +1,18 @@
 """Static content for byte_world_ai."""
 
+from typing import Callable, List
+
+
+_RELOAD_HOOKS: List[Callable[[], None]] = []
+
+
+def add_reload_hook(hook: Callable[[], None]) -> None:
+    """Register a callback that rebuilds data derived from content tables."""
+    if hook not in _RELOAD_HOOKS:
+        _RELOAD_HOOKS.append(hook)
+
+
+def content_changed() -> None:
+    """Call after editing content tables in place so derived caches are rebuilt."""
+    for hook in list(_RELOAD_HOOKS):
+        hook()
@@ -0,0 +1,337 @@
+"""Compiled, validated views of the content tables.
+
+`content/*` stays plain dicts so it is easy to author and edit. This module
+checks those dicts once (unknown ids, bad numbers, missing fields) and builds
+frozen, slotted records with numbers already coerced, defaults already filled
+in, and tuples for exits, intents, and loot tables. Every record also carries
+an integer `index` into its `*_LIST`. The systems modules read these records
+instead of calling `.get(..., default)` and `int(...)` on raw dicts every turn.
+
+The tables are rebuilt in place on `content.content_changed()`, so
+`from content.compiled import ITEM_RECORDS` stays valid after a reload.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+import content
+from content.enemies import ENEMIES, RARITY_TABLES
+from content.items import EQUIPMENT_SLOT_BY_TYPE, ITEMS
+from content.world import LOCATIONS, NPCS
+from content.flags import flags_mask, mask_of
+
+
+class ContentError(ValueError):
+    """Raised when a content table fails validation."""
+
+
+WeightedIds = Tuple[Tuple[str, int], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class ItemRecord:
+    index: int
+    id: str
+    name: str
+    type: str
+    description: str
+    slot: Optional[str]
+    attack_bonus: int
+    defense_bonus: int
+    max_hp_bonus: int
+    heal_amount: int
+    skill_points_bonus: int
+    value: int
+    # Best-in-slot ordering; 3 HP count as one stat point, like training.
+    power: Tuple[float, int, int, int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class IntentRecord:
+    name: str
+    telegraph: str
+    base_damage: int
+    defend_multiplier: float
+
+
+@dataclass(frozen=True, slots=True)
+class EnemyRecord:
+    index: int
+    id: str
+    name: str
+    category: str
+    hp: int
+    attack: int
+    defense: int
+    xp_reward: int
+    gold_reward: int
+    skill_points_reward: int
+    loot_table: WeightedIds
+    guaranteed_drops: Tuple[str, ...]
+    pre_dialogue: Tuple[str, ...]
+    post_dialogue: Tuple[str, ...]
+    intents: Tuple[IntentRecord, ...]
+    # Used when `intents` is empty; enemies without intents are never telegraphed.
+    strike: IntentRecord
+    special: Optional[str]
+
+    @property
+    def is_normal(self) -> bool:
+        return self.category == "normal"
+
+
+@dataclass(frozen=True, slots=True)
+class RequirementRecord:
+    all_flags: Tuple[str, ...]
+    any_flags: Tuple[str, ...]
+    message: str
+    # Bitmasks from `content.flags`; `met` is two integer tests.
+    all_mask: int
+    any_mask: int
+
+    def met(self, flags: AbstractSet[str]) -> bool:
+        mask = flags_mask(flags)
+        if (mask & self.all_mask) != self.all_mask:
+            return False
+        return not self.any_mask or bool(mask & self.any_mask)
+
+
+@dataclass(frozen=True, slots=True)
+class ExitRecord:
+    direction: str
+    target: str
+    target_index: int
+    requirement: Optional[RequirementRecord]
+
+
+@dataclass(frozen=True, slots=True)
+class LocationRecord:
+    index: int
+    id: str
+    name: str
+    area: str
+    descriptions: Tuple[str, ...]
+    exits: Tuple[ExitRecord, ...]
+    # ", ".join(sorted(directions)), as `look` prints it.
+    exit_list: str
+    encounter_chance: float
+    encounters: WeightedIds
+    skill_points_per_kill: int
+    boss_id: Optional[str]
+    boss_flag: Optional[str]
+    boss_optional: bool
+    boss_require_flags: Tuple[str, ...]
+    boss_require_mask: int
+    sense_hint: str
+    npcs: Tuple[str, ...]
+
+    def exit(self, direction: str) -> Optional[ExitRecord]:
+        for exit_record in self.exits:
+            if exit_record.direction == direction:
+                return exit_record
+        return None
+
+
+ITEM_RECORDS: Dict[str, ItemRecord] = {}
+ENEMY_RECORDS: Dict[str, EnemyRecord] = {}
+LOCATION_RECORDS: Dict[str, LocationRecord] = {}
+ITEM_LIST: List[ItemRecord] = []
+ENEMY_LIST: List[EnemyRecord] = []
+LOCATION_LIST: List[LocationRecord] = []
+_MISSING_ITEMS: Dict[str, ItemRecord] = {}
+
+
+def _number(table: str, entry_id: str, raw: dict, key: str, default, kind=int):
+    value = raw.get(key, default)
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ContentError(f"{table}[{entry_id!r}][{key!r}] must be {kind.__name__}, got {value!r}") from None
+
+
+def _text(table: str, entry_id: str, raw: dict, key: str, default: Optional[str] = None) -> str:
+    value = raw.get(key, default)
+    if not isinstance(value, str):
+        raise ContentError(f"{table}[{entry_id!r}][{key!r}] must be a string, got {value!r}")
+    return value
+
+
+def _lines(table: str, entry_id: str, raw: dict, key: str) -> Tuple[str, ...]:
+    value = raw.get(key, [])
+    if isinstance(value, str) or not all(isinstance(line, str) for line in value):
+        raise ContentError(f"{table}[{entry_id!r}][{key!r}] must be a list of strings")
+    return tuple(value)
+
+
+def _weighted(table: str, entry_id: str, pairs, known: Dict[str, dict], kind: str) -> WeightedIds:
+    compiled: List[Tuple[str, int]] = []
+    for pair in pairs:
+        try:
+            target, weight = pair
+            weight = int(weight)
+        except (TypeError, ValueError):
+            raise ContentError(f"{table}[{entry_id!r}] has a malformed (id, weight) pair: {pair!r}") from None
+        if target not in known:
+            raise ContentError(f"{table}[{entry_id!r}] references unknown {kind} {target!r}")
+        compiled.append((target, weight))
+    return tuple(compiled)
+
+
+def _item_record(index: int, item_id: str, raw: dict) -> ItemRecord:
+    item_type = _text("ITEMS", item_id, raw, "type", "")
+    attack = _number("ITEMS", item_id, raw, "attack_bonus", 0)
+    defense = _number("ITEMS", item_id, raw, "defense_bonus", 0)
+    max_hp = _number("ITEMS", item_id, raw, "max_hp_bonus", 0)
+    value = _number("ITEMS", item_id, raw, "value", 0)
+    return ItemRecord(
+        index=index,
+        id=item_id,
+        name=_text("ITEMS", item_id, raw, "name", item_id),
+        type=item_type,
+        description=_text("ITEMS", item_id, raw, "description", ""),
+        slot=EQUIPMENT_SLOT_BY_TYPE.get(item_type),
+        attack_bonus=attack,
+        defense_bonus=defense,
+        max_hp_bonus=max_hp,
+        heal_amount=_number("ITEMS", item_id, raw, "heal_amount", 0),
+        skill_points_bonus=_number("ITEMS", item_id, raw, "skill_points_bonus", 0),
+        value=value,
+        power=(attack + defense + (max_hp / 3.0), attack, defense, max_hp, value),
+    )
+
+
+def _enemy_record(index: int, enemy_id: str, raw: dict) -> EnemyRecord:
+    name = _text("ENEMIES", enemy_id, raw, "name")
+    attack = _number("ENEMIES", enemy_id, raw, "attack", 1)
+    intents: List[IntentRecord] = []
+    for position, intent in enumerate(raw.get("intents", [])):
+        intent_id = f"{enemy_id}.intents[{position}]"
+        intents.append(
+            IntentRecord(
+                name=_text("ENEMIES", intent_id, intent, "name", "attack"),
+                telegraph=_text("ENEMIES", intent_id, intent, "telegraph", f"{name} prepares an attack."),
+                base_damage=_number("ENEMIES", intent_id, intent, "base_damage", attack),
+                defend_multiplier=_number("ENEMIES", intent_id, intent, "defend_multiplier", 0.5, float),
+            )
+        )
+    drops = tuple(raw.get("guaranteed_drops", []))
+    for item_id in drops:
+        if item_id not in ITEMS:
+            raise ContentError(f"ENEMIES[{enemy_id!r}] drops unknown item {item_id!r}")
+    return EnemyRecord(
+        index=index,
+        id=enemy_id,
+        name=name,
+        category=_text("ENEMIES", enemy_id, raw, "category", "normal"),
+        hp=_number("ENEMIES", enemy_id, raw, "hp", None),
+        attack=attack,
+        defense=_number("ENEMIES", enemy_id, raw, "defense", 0),
+        xp_reward=_number("ENEMIES", enemy_id, raw, "xp_reward", 0),
+        gold_reward=_number("ENEMIES", enemy_id, raw, "gold_reward", 0),
+        skill_points_reward=_number("ENEMIES", enemy_id, raw, "skill_points_reward", 0),
+        loot_table=_weighted("ENEMIES", enemy_id, raw.get("loot_table", []), ITEMS, "item"),
+        guaranteed_drops=drops,
+        pre_dialogue=_lines("ENEMIES", enemy_id, raw, "pre_dialogue"),
+        post_dialogue=_lines("ENEMIES", enemy_id, raw, "post_dialogue"),
+        intents=tuple(intents),
+        strike=IntentRecord("Strike", "", attack, 0.5),
+        special=raw.get("special"),
+    )
+
+
+def _requirement_record(location_id: str, direction: str, raw: dict) -> RequirementRecord:
+    all_flags = tuple(raw.get("all_flags", []))
+    any_flags = tuple(raw.get("any_flags", []))
+    return RequirementRecord(
+        all_flags=all_flags,
+        any_flags=any_flags,
+        message=_text("LOCATIONS", f"{location_id}.exit_requirements.{direction}", raw, "message", "That path is blocked for now."),
+        all_mask=mask_of(all_flags),
+        any_mask=mask_of(any_flags),
+    )
+
+
+def _location_record(index: int, location_id: str, raw: dict, location_index: Dict[str, int]) -> LocationRecord:
+    raw_exits = raw.get("exits", {})
+    requirements = raw.get("exit_requirements", {})
+    for direction in requirements:
+        if direction not in raw_exits:
+            raise ContentError(f"LOCATIONS[{location_id!r}] has a requirement for missing exit {direction!r}")
+    exits: List[ExitRecord] = []
+    for direction, target in raw_exits.items():
+        if target not in location_index:
+            raise ContentError(f"LOCATIONS[{location_id!r}] exit {direction!r} leads to unknown location {target!r}")
+        requirement = requirements.get(direction)
+        exits.append(
+            ExitRecord(
+                direction=direction,
+                target=target,
+                target_index=location_index[target],
+                requirement=_requirement_record(location_id, direction, requirement) if requirement else None,
+            )
+        )
+    boss_id = raw.get("boss_id")
+    if boss_id is not None and boss_id not in ENEMIES:
+        raise ContentError(f"LOCATIONS[{location_id!r}] has unknown boss {boss_id!r}")
+    npcs = tuple(raw.get("npcs", []))
+    for npc_id in npcs:
+        if npc_id not in NPCS:
+            raise ContentError(f"LOCATIONS[{location_id!r}] lists unknown NPC {npc_id!r}")
+    return LocationRecord(
+        index=index,
+        id=location_id,
+        name=_text("LOCATIONS", location_id, raw, "name"),
+        area=_text("LOCATIONS", location_id, raw, "area", ""),
+        descriptions=_lines("LOCATIONS", location_id, raw, "descriptions"),
+        exits=tuple(exits),
+        exit_list=", ".join(sorted(raw_exits)) or "none",
+        encounter_chance=_number("LOCATIONS", location_id, raw, "encounter_chance", 0.0, float),
+        encounters=_weighted("LOCATIONS", location_id, raw.get("encounters", []), ENEMIES, "enemy"),
+        skill_points_per_kill=_number("LOCATIONS", location_id, raw, "skill_points_per_kill", 0),
+        boss_id=boss_id,
+        boss_flag=raw.get("boss_flag"),
+        boss_optional=bool(raw.get("boss_optional", False)),
+        boss_require_flags=tuple(raw.get("boss_require_flags", [])),
+        boss_require_mask=mask_of(raw.get("boss_require_flags", [])),
+        sense_hint=_text("LOCATIONS", location_id, raw, "sense_hint", "Nothing unusual stands out."),
+        npcs=npcs,
+    )
+
+
+def compile_content() -> None:
+    """Validate the raw tables and rebuild every compiled record in place."""
+    items = [_item_record(index, item_id, raw) for index, (item_id, raw) in enumerate(ITEMS.items())]
+    enemies = [_enemy_record(index, enemy_id, raw) for index, (enemy_id, raw) in enumerate(ENEMIES.items())]
+    location_index = {location_id: index for index, location_id in enumerate(LOCATIONS)}
+    locations = [
+        _location_record(index, location_id, raw, location_index)
+        for index, (location_id, raw) in enumerate(LOCATIONS.items())
+    ]
+    for table_name, table in RARITY_TABLES.items():
+        _weighted("RARITY_TABLES", table_name, table, ITEMS, "item")
+
+    for records, listing, compiled in (
+        (ITEM_RECORDS, ITEM_LIST, items),
+        (ENEMY_RECORDS, ENEMY_LIST, enemies),
+        (LOCATION_RECORDS, LOCATION_LIST, locations),
+    ):
+        records.clear()
+        records.update((record.id, record) for record in compiled)
+        listing[:] = compiled
+    _MISSING_ITEMS.clear()
+
+
+def item(item_id: str) -> ItemRecord:
+    """Record for `item_id`; ids missing from ITEMS (old saves) get an inert stand-in named after the id."""
+    record = ITEM_RECORDS.get(item_id)
+    if record is None:
+        record = _MISSING_ITEMS.get(item_id)
+        if record is None:
+            record = _MISSING_ITEMS[item_id] = _item_record(-1, item_id, {})
+    return record
+
+
+compile_content()
+content.add_reload_hook(compile_content)
@@ -0,0 +1,72 @@
+"""Story flag registry: one bit per flag.
+
+`KNOWN_FLAGS` fixes the bit of every flag the game itself sets; snapshots store
+those as one integer. Append new flags to the end and never reorder it, or old
+snapshots decode with the wrong flags. Flags outside the list (added by content
+edits or plugins) get process-local bits on first use and are saved by name.
+
+Content compiles requirements to masks with `mask_of`; `game.flags.FlagSet`
+keeps the mask of live state flags up to date.
+"""
+
+from __future__ import annotations
+
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List, Tuple
+
+
+KNOWN_FLAGS: Tuple[str, ...] = (
+    "met_old_man",
+    "frog_defeated",
+    "dragon_defeated",
+    "ogre_defeated",
+    "goblin_army_defeated",
+    "goblin_pass_granted",
+    "makor_defeated",
+    "onyx_witch_defeated",
+    "elle_freed",
+    "elle_met",
+    "elle_cleansed",
+    "hoard_delivered",
+    "black_hall_cutscene_seen",
+    "ring_surge_active",
+    "victory_announced",
+)
+KNOWN_MASK = (1 << len(KNOWN_FLAGS)) - 1
+
+_BITS: Dict[str, int] = {flag: 1 << position for position, flag in enumerate(KNOWN_FLAGS)}
+_NAMES: List[str] = list(KNOWN_FLAGS)
+
+
+def bit(flag: str) -> int:
+    """The bit for `flag`, registering unknown flags on first use."""
+    value = _BITS.get(flag)
+    if value is None:
+        value = _BITS[flag] = 1 << len(_NAMES)
+        _NAMES.append(flag)
+    return value
+
+
+def mask_of(flags: Iterable[str]) -> int:
+    """OR of the bits of `flags`."""
+    mask = 0
+    for flag in flags:
+        mask |= bit(flag)
+    return mask
+
+
+def names_of(mask: int) -> FrozenSet[str]:
+    """The flags whose bits are set in `mask`."""
+    found = []
+    position = 0
+    while mask:
+        if mask & 1:
+            found.append(_NAMES[position])
+        mask >>= 1
+        position += 1
+    return frozenset(found)
+
+
+def flags_mask(flags: AbstractSet[str]) -> int:
+    """`flags.mask` for a set that tracks it (`game.flags.FlagSet`), computed for any other set of names."""
+    mask = getattr(flags, "mask", None)
+    return mask_of(flags) if mask is None else mask
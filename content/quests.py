@@ -17,41 +17,50 @@ QUEST_ORDER: List[str] = [
 ]
 
 
+# `completed_by`: setting any one of these flags finishes the stage and moves the
+# quest to the next stage in QUEST_ORDER. The last stage has none.
 QUEST_STAGES: Dict[str, dict] = {
     "awakening": {
         "title": "Awakening",
         "description": "Meet the Wise Old Man in the Old Shack and learn what must be done.",
         "hint": "Use `talk wise old man` if you have not spoken to him.",
+        "completed_by": ["met_old_man"],
     },
     "swamp_secret": {
         "title": "The Swamp Secret",
         "description": "Travel to the swamp and defeat the Giant Frog.",
         "hint": "Forest creatures can be farmed for skill points before the boss.",
+        "completed_by": ["frog_defeated"],
     },
     "mountain_flame": {
         "title": "Ash on the Peak",
         "description": "Climb Dragon Mountain, defeat the dragon, and claim its relics.",
         "hint": "The cave is optional, but dangerous treasure waits there.",
+        "completed_by": ["dragon_defeated"],
     },
     "castle_road": {
         "title": "Road of Knives",
         "description": "Survive the desolate road and deal with the Army of Goblins.",
         "hint": "You may joke, bribe, or fight.",
+        "completed_by": ["goblin_army_defeated", "goblin_pass_granted"],
     },
     "black_hall": {
         "title": "King in Rot",
         "description": "Enter Makor's keep and defeat King Makor in the dungeon.",
         "hint": "The mysterious ring awakens when the fight turns desperate.",
+        "completed_by": ["makor_defeated"],
     },
     "witch_bane": {
         "title": "Break the Curse",
         "description": "Defeat the Onyx Witch. Her black magic must be countered.",
         "hint": "The goblin riddle can break her binding spell.",
+        "completed_by": ["onyx_witch_defeated"],
     },
     "rescue_elle": {
         "title": "Rescue Elle",
         "description": "Free Elle with the crusty key and cleanse her corruption with the vial.",
         "hint": "Use `use crusty key` and `use vial of tears` at the Witch's Terrace.",
+        "completed_by": ["elle_cleansed"],
     },
     "homecoming": {
         "title": "Homecoming",
@@ -1,44 +1,215 @@
-"""Command parser for byte_world_ai CLI."""
+"""Command parser and command registry for byte_world_ai CLI.
+
+Every command is a `CommandSpec` in a `CommandRegistry`: its handler, the
+contexts it is allowed in, the message shown when a required argument is
+missing, its aliases, and a cost class. Dispatch is one dictionary lookup,
+and each dispatch is timed into per-command latency counters. The built-in
+commands are registered here when the module loads (their handlers call
+`Engine._cmd_*` by name); plugins register more with
+`REGISTRY.register(CommandSpec(...))`.
+"""
 
 from __future__ import annotations
 
-from typing import List, Tuple
-
-
-ALIASES = {
-    "n": "move north",
-    "s": "move south",
-    "e": "move east",
-    "w": "move west",
-    "u": "move up",
-    "d": "move down",
-    "north": "move north",
-    "south": "move south",
-    "east": "move east",
-    "west": "move west",
-    "up": "move up",
-    "down": "move down",
-    "farm": "hunt",
-    "grind": "hunt",
-    "i": "inventory",
-    "inv": "inventory",
-    "m": "map",
-    "q": "quit",
-    "exit": "quit",
-    "attack": "fight",
-    "atk": "fight",
-    "read": "read",
+from dataclasses import dataclass, field
+import time
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+if TYPE_CHECKING:
+    from game.state import GameState
+
+
+CONTEXT_EXPLORE = "explore"
+CONTEXT_COMBAT = "combat"
+ANY_CONTEXT = frozenset({CONTEXT_EXPLORE, CONTEXT_COMBAT})
+
+# Cost classes. Display and solver commands only describe the game, so headless turns skip them.
+COST_DISPLAY = "display"
+COST_SOLVER = "solver"
+COST_ACTION = "action"
+READ_ONLY_COSTS = frozenset({COST_DISPLAY, COST_SOLVER})
+
+BLOCKED_MESSAGES = {
+    CONTEXT_COMBAT: "You are in an encounter. Use combat commands or `run`.",
+    CONTEXT_EXPLORE: "You can only do that during an encounter.",
+}
+
+Handler = Callable[..., List[str]]
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """One command: `handler(engine, state, args)` plus how and when it may run."""
+
+    name: str
+    handler: Handler
+    contexts: FrozenSet[str] = ANY_CONTEXT
+    missing_args: str = ""
+    aliases: Mapping[str, str] = field(default_factory=dict)
+    cost: str = COST_ACTION
+
+    @property
+    def read_only(self) -> bool:
+        return self.cost in READ_ONLY_COSTS
+
+
+@dataclass
+class CommandStats:
+    """Latency counters for one command."""
+
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class CommandRegistry:
+    """Command name -> spec, with the alias table the parser reads."""
+
+    def __init__(self) -> None:
+        self.specs: Dict[str, CommandSpec] = {}
+        self.aliases: Dict[str, str] = {}
+        self.stats: Dict[str, CommandStats] = {}
+
+    def register(self, spec: CommandSpec, replace: bool = False) -> CommandSpec:
+        """Add a command; aliases map whole input lines to `name <args>`."""
+        if spec.name in self.specs and not replace:
+            raise ValueError(f"Command already registered: {spec.name}")
+        previous = self.specs.get(spec.name)
+        if previous is not None:
+            for alias in previous.aliases:
+                self.aliases.pop(alias, None)
+        self.specs[spec.name] = spec
+        for alias, alias_args in spec.aliases.items():
+            self.aliases[alias] = f"{spec.name} {alias_args}".strip()
+        return spec
+
+    def get(self, name: str) -> Optional[CommandSpec]:
+        return self.specs.get(name)
+
+    def read_only(self, name: str) -> bool:
+        spec = self.specs.get(name)
+        return spec is not None and spec.read_only
+
+    def cost(self, name: str) -> Optional[str]:
+        spec = self.specs.get(name)
+        return spec.cost if spec is not None else None
+
+    def dispatch(self, engine, state: "GameState", command: str, args: List[str]) -> List[str]:
+        """Run `command` for `state`, checking context and required arguments first."""
+        spec = self.specs.get(command)
+        context = CONTEXT_COMBAT if state.active_encounter else CONTEXT_EXPLORE
+        if spec is None:
+            if context == CONTEXT_COMBAT:
+                return [BLOCKED_MESSAGES[context]]
+            return [f"Unknown command: {command}. Type `help` for a command list."]
+        if context not in spec.contexts:
+            return [BLOCKED_MESSAGES[context]]
+        if spec.missing_args and not args:
+            return [spec.missing_args]
+
+        started = time.perf_counter()
+        try:
+            return spec.handler(engine, state, args)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = self.stats.get(command)
+            if stats is None:
+                stats = self.stats[command] = CommandStats()
+            stats.calls += 1
+            stats.total_seconds += elapsed
+            if elapsed > stats.max_seconds:
+                stats.max_seconds = elapsed
+
+    def reset_stats(self) -> None:
+        self.stats.clear()
+
+    def latency_report(self) -> List[str]:
+        """One line per dispatched command, slowest total first."""
+        lines = [f"{'command':<12} {'calls':>8} {'mean us':>10} {'max us':>10} {'total ms':>10}"]
+        for name, stats in sorted(self.stats.items(), key=lambda item: -item[1].total_seconds):
+            lines.append(
+                f"{name:<12} {stats.calls:>8} {stats.mean_seconds * 1e6:>10.1f} "
+                f"{stats.max_seconds * 1e6:>10.1f} {stats.total_seconds * 1e3:>10.2f}"
+            )
+        return lines
+
+
+def engine_handler(method: str) -> Handler:
+    """Handler calling `engine.<method>(state, args)`, so built-ins need not import `game.engine`."""
+
+    def handler(engine, state: "GameState", args: List[str]) -> List[str]:
+        return getattr(engine, method)(state, args)
+
+    handler.__name__ = method
+    return handler
+
+
+EXPLORE_ONLY = frozenset({CONTEXT_EXPLORE})
+_MOVE_ALIASES = {
+    **{direction: direction for direction in ("north", "south", "east", "west", "up", "down")},
+    **{direction[0]: direction for direction in ("north", "south", "east", "west", "up", "down")},
 }
 
+BUILTIN_COMMANDS = (
+    CommandSpec("help", engine_handler("_cmd_help"), cost=COST_DISPLAY),
+    CommandSpec("status", engine_handler("_cmd_status"), cost=COST_DISPLAY),
+    CommandSpec("look", engine_handler("_cmd_look"), EXPLORE_ONLY, cost=COST_DISPLAY),
+    CommandSpec("sense", engine_handler("_cmd_sense"), EXPLORE_ONLY, cost=COST_DISPLAY),
+    CommandSpec("map", engine_handler("_cmd_map"), aliases={"m": ""}, cost=COST_DISPLAY),
+    CommandSpec("hunt", engine_handler("_cmd_hunt"), EXPLORE_ONLY, aliases={"farm": "", "grind": ""}),
+    CommandSpec("move", engine_handler("_cmd_move"), EXPLORE_ONLY, "Move where? Example: move north", _MOVE_ALIASES),
+    CommandSpec("inventory", engine_handler("_cmd_inventory"), aliases={"i": "", "inv": ""}, cost=COST_DISPLAY),
+    CommandSpec(
+        "equip",
+        engine_handler("_cmd_equip"),
+        EXPLORE_ONLY,
+        "Equip what? Example: equip crusty sword, or use `equip all`.",
+    ),
+    CommandSpec("use", engine_handler("_cmd_use"), missing_args="Use what? Example: use minor potion"),
+    CommandSpec("read", engine_handler("_cmd_read"), missing_args="Use what? Example: use minor potion"),
+    CommandSpec("fight", engine_handler("_cmd_fight"), aliases={"attack": "", "atk": ""}),
+    CommandSpec("defend", engine_handler("_cmd_defend")),
+    CommandSpec("skill", engine_handler("_cmd_skill")),
+    CommandSpec("run", engine_handler("_cmd_run")),
+    CommandSpec("advise", engine_handler("_cmd_advise"), cost=COST_SOLVER),
+    CommandSpec("joke", engine_handler("_cmd_joke")),
+    CommandSpec("bribe", engine_handler("_cmd_bribe")),
+    CommandSpec(
+        "train",
+        engine_handler("_cmd_train"),
+        EXPLORE_ONLY,
+        "Train what? Examples: train attack 2, train all, train 3,4,3",
+    ),
+    CommandSpec("talk", engine_handler("_cmd_talk"), EXPLORE_ONLY, "Talk to whom? Example: talk wise old man"),
+    CommandSpec("quest", engine_handler("_cmd_quest"), cost=COST_DISPLAY),
+    CommandSpec("quit", engine_handler("_cmd_quit"), aliases={"q": "", "exit": ""}),
+)
+
+
+def register_builtins(registry: CommandRegistry) -> None:
+    """Register the built-in commands (handlers are `Engine._cmd_*` methods)."""
+    for spec in BUILTIN_COMMANDS:
+        registry.register(spec, replace=True)
+
+
+REGISTRY = CommandRegistry()
+register_builtins(REGISTRY)
+# Whole-input aliases ("n" -> "move north"), including the built-ins'.
+ALIASES = REGISTRY.aliases
+
 
-def parse_command(raw: str) -> Tuple[str, List[str]]:
+def parse_command(raw: str, registry: CommandRegistry = REGISTRY) -> Tuple[str, List[str]]:
     """Parse user input into (command, args)."""
     text = raw.strip().lower()
     if not text:
         return "", []
 
-    if text in ALIASES:
-        text = ALIASES[text]
+    if text in registry.aliases:
+        text = registry.aliases[text]
 
     parts = text.split()
     if not parts:
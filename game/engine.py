@@ -2,26 +2,78 @@
 
 from __future__ import annotations
 
-from collections import deque
+from collections import OrderedDict
+from dataclasses import dataclass, field
 import os
 import sys
-from typing import Callable, List
+from typing import Callable, List, Optional
 
+import content
 from content.enemies import ENEMIES
 from content.items import EQUIPMENT_SLOT_BY_TYPE, ITEMS
+from content.compiled import LOCATION_RECORDS
 from content.world import LOCATIONS, NPCS
-from game.commands import parse_command
+from game.commands import REGISTRY, CommandRegistry, parse_command
+from game.flags import mask_of
 from game.state import GameState, get_effective_stats
 from game import ui
-from systems import combat, exploration, loot, quest
+from systems import combat, combat_markov, exploration, loot, quest, routing
+
+
+# Story flags the action menus read directly (as a bitmask); exit-lock flags come from `routing.route_mask`.
+MENU_MASK = mask_of(
+    {
+        "elle_cleansed",
+        "elle_freed",
+        "elle_met",
+        "hoard_delivered",
+        "met_old_man",
+        "onyx_witch_defeated",
+        "ring_surge_active",
+    }
+)
+MENU_CACHE_SIZE = 4096
+
+# Rendered action menus keyed by `Engine._menu_fingerprint`, shared by every engine.
+_MENU_CACHE: OrderedDict[tuple, tuple[str, ...]] = OrderedDict()
+
+
+def clear_menu_cache() -> None:
+    """Forget cached action menus (content edits change their text)."""
+    _MENU_CACHE.clear()
+
+
+content.add_reload_hook(clear_menu_cache)
+
+
+@dataclass
+class TurnResult:
+    """Structured outcome of one headless turn."""
+
+    command: str
+    args: List[str] = field(default_factory=list)
+    messages: List[str] = field(default_factory=list)
+    location_id: str = ""
+    enemy_id: Optional[str] = None
+    enemy_hp: int = 0
+    player_hp: int = 0
+    quest_stage: str = ""
+    game_over: bool = False
+    victory: bool = False
 
 
 class Engine:
     """CLI engine for byte_world_ai."""
 
-    def __init__(self, input_fn: Callable[[str], str] = input, output_fn: Callable[[str], None] = print):
+    def __init__(
+        self,
+        input_fn: Callable[[str], str] = input,
+        output_fn: Callable[[str], None] = print,
+        commands: Optional[CommandRegistry] = None,
+    ):
         self.input_fn = input_fn
         self.output_fn = output_fn
+        self.commands = commands if commands is not None else REGISTRY
 
     def _emit_lines(self, messages: List[str]) -> None:
         text = ui.format_messages(messages)
@@ -47,14 +99,9 @@ class Engine:
         if command and command not in actions:
             actions[command] = description
 
-    def _exit_requirement_met(self, state: GameState, requirement: dict) -> bool:
-        all_flags = requirement.get("all_flags", [])
-        any_flags = requirement.get("any_flags", [])
-        if all_flags and any(flag not in state.flags for flag in all_flags):
-            return False
-        if any_flags and all(flag not in state.flags for flag in any_flags):
-            return False
-        return True
+    def _exit_open(self, state: GameState, direction: str) -> bool:
+        exit_record = LOCATION_RECORDS[state.current_location_id].exit(direction)
+        return exit_record is not None and (exit_record.requirement is None or exit_record.requirement.met(state.flags))
 
     def _visible_npc_names(self, state: GameState, location: dict) -> List[str]:
         names: List[str] = []
@@ -169,6 +216,24 @@ class Engine:
             return "Restore 16 HP, 4-turn cooldown."
         return "Use a learned combat skill."
 
+    def _advise(self, state: GameState) -> List[str]:
+        encounter = state.active_encounter
+        if not encounter:
+            return ["There is nothing to advise on outside a fight."]
+        ranked = combat_markov.advise(state)
+        if not ranked:
+            return ["No action can change this fight."]
+        rows = [(odds.command, odds.win, odds.expected_turns) for odds in ranked]
+        if encounter.special_phase == "negotiation":
+            return [
+                ui.format_advice(rows[:1], "Odds if you choose `fight`; `joke` or `bribe` end the ambush without one."),
+            ]
+        note = ""
+        if ranked[0].win < 0.5:
+            chance = combat.run_chance(encounter.enemy_id)
+            note = f"Odds are poor. `run` escapes about {int(chance * 100)}% of the time."
+        return [ui.format_advice(rows, note)]
+
     def _action_lines(self, actions: dict[str, str], heading: str) -> List[str]:
         lines = [f"{heading} ({len(actions)}):"]
         for command, description in actions.items():
@@ -185,43 +250,6 @@ class Engine:
             return True
         return False
 
-    def _neighbors(self, state: GameState, location_id: str, respect_locks: bool) -> List[tuple[str, str]]:
-        location = LOCATIONS[location_id]
-        exits = location.get("exits", {})
-        requirements = location.get("exit_requirements", {})
-        neighbors: List[tuple[str, str]] = []
-        for direction, next_location_id in exits.items():
-            req = requirements.get(direction)
-            if respect_locks and req and not self._exit_requirement_met(state, req):
-                continue
-            neighbors.append((direction, next_location_id))
-        return neighbors
-
-    def _shortest_direction_path(
-        self,
-        state: GameState,
-        start_location_id: str,
-        target_location_id: str,
-        respect_locks: bool,
-    ) -> List[str] | None:
-        if start_location_id == target_location_id:
-            return []
-
-        frontier: deque[tuple[str, List[str]]] = deque([(start_location_id, [])])
-        visited = {start_location_id}
-
-        while frontier:
-            location_id, path = frontier.popleft()
-            for direction, next_location_id in self._neighbors(state, location_id, respect_locks):
-                if next_location_id in visited:
-                    continue
-                next_path = [*path, direction]
-                if next_location_id == target_location_id:
-                    return next_path
-                visited.add(next_location_id)
-                frontier.append((next_location_id, next_path))
-        return None
-
     def _recommended_map_step(self, state: GameState) -> tuple[str | None, str | None]:
         target_by_stage = {
             "awakening": "old_shack",
@@ -239,30 +267,15 @@ class Engine:
         if target_id == state.current_location_id:
             return target_id, None
 
-        open_path = self._shortest_direction_path(
-            state,
-            start_location_id=state.current_location_id,
-            target_location_id=target_id,
-            respect_locks=True,
-        )
-        if open_path:
-            return target_id, open_path[0]
-
-        eventual_path = self._shortest_direction_path(
-            state,
-            start_location_id=state.current_location_id,
-            target_location_id=target_id,
-            respect_locks=False,
-        )
-        if eventual_path:
-            return target_id, eventual_path[0]
-
-        return target_id, None
+        current_id = state.current_location_id
+        direction = routing.next_step(state.flags, current_id, target_id)
+        if direction is None:
+            direction = routing.next_step(state.flags, current_id, target_id, respect_locks=False)
+        return target_id, direction
 
     def _map_direction_labels(self, state: GameState, recommended_direction: str | None) -> dict[str, str]:
         current = LOCATIONS[state.current_location_id]
         exits = current.get("exits", {})
-        requirements = current.get("exit_requirements", {})
 
         labels: dict[str, str] = {}
         for direction in ("north", "east", "south", "west", "up", "down"):
@@ -272,8 +285,7 @@ class Engine:
                 continue
 
             destination_name = LOCATIONS.get(destination_id, {}).get("name", destination_id)
-            req = requirements.get(direction)
-            if req and not self._exit_requirement_met(state, req):
+            if not self._exit_open(state, direction):
                 labels[direction] = f"{destination_name} (locked)"
             else:
                 labels[direction] = destination_name
@@ -300,25 +312,14 @@ class Engine:
                 lines.append(f"{label}: you are here.{suffix}")
                 continue
 
-            open_path = self._shortest_direction_path(
-                state,
-                start_location_id=current_id,
-                target_location_id=target_id,
-                respect_locks=True,
-            )
-            if open_path is not None:
-                first_step = open_path[0]
-                lines.append(f"{label}: go {first_step}.{suffix}")
+            open_step = routing.next_step(state.flags, current_id, target_id)
+            if open_step is not None:
+                lines.append(f"{label}: go {open_step}.{suffix}")
                 continue
 
-            eventual_path = self._shortest_direction_path(
-                state,
-                start_location_id=current_id,
-                target_location_id=target_id,
-                respect_locks=False,
-            )
-            if eventual_path is not None:
-                lines.append(f"{label}: locked now (later go {eventual_path[0]}).{suffix}")
+            eventual_step = routing.next_step(state.flags, current_id, target_id, respect_locks=False)
+            if eventual_step is not None:
+                lines.append(f"{label}: locked now (later go {eventual_step}).{suffix}")
             else:
                 lines.append(f"{label}: no route found.{suffix}")
 
@@ -369,10 +370,8 @@ class Engine:
         self._add_action(actions, "quit", "End the game session.")
 
         exits = location.get("exits", {})
-        exit_requirements = location.get("exit_requirements", {})
         for direction in sorted(exits.keys()):
-            requirement = exit_requirements.get(direction)
-            if requirement and not self._exit_requirement_met(state, requirement):
+            if not self._exit_open(state, direction):
                 continue
             destination_id = exits[direction]
             destination_name = LOCATIONS.get(destination_id, {}).get("name", destination_id)
@@ -475,15 +474,13 @@ class Engine:
         else:
             self._add_action(actions, "fight", f"Attack {enemy_name} with a basic strike.")
             self._add_action(actions, "defend", "Reduce damage from the next enemy hit.")
-            run_chance = 0.65 if enemy.get("category") == "normal" else 0.28
-            if encounter.enemy_id == "goblin_army":
-                run_chance = 0.22
             self._add_action(
                 actions,
                 "run",
-                f"Attempt to escape (about {int(run_chance * 100)}% success chance).",
+                f"Attempt to escape (about {int(combat.run_chance(encounter.enemy_id) * 100)}% success chance).",
             )
             self._add_action(actions, "map", "Show the directional world map and route hints.")
+            self._add_action(actions, "advise", "Estimate each option's win chance.")
 
             for skill_name in sorted(state.player.skills):
                 cooldown = state.player.cooldowns.get(skill_name, 0)
@@ -510,10 +507,46 @@ class Engine:
 
         return actions
 
+    def _menu_fingerprint(self, state: GameState) -> tuple:
+        """Everything the action menu text depends on, cheap to build and hash."""
+        player = state.player
+        missing_hp = max(0, player.effective_stats()["max_hp"] - player.hp)
+        key = (
+            state.current_location_id,
+            routing.route_mask(state.flags),
+            state.flags.mask & MENU_MASK,
+            player.inventory_key(),
+            missing_hp,
+        )
+        encounter = state.active_encounter
+        if not encounter:
+            return (*key, tuple(player.equipment.items()), player.skill_points)
+        cooldowns = tuple(sorted((name, turns) for name, turns in player.cooldowns.items() if turns > 0))
+        gold = player.gold if encounter.special_phase == "negotiation" else None
+        return (
+            *key,
+            encounter.enemy_id,
+            encounter.special_phase,
+            encounter.witch_barrier_active,
+            frozenset(player.skills),
+            cooldowns,
+            gold,
+        )
+
     def _build_input_hints(self, state: GameState) -> List[str]:
+        fingerprint = self._menu_fingerprint(state)
+        lines = _MENU_CACHE.get(fingerprint)
+        if lines is not None:
+            _MENU_CACHE.move_to_end(fingerprint)
+            return list(lines)
         if state.active_encounter:
-            return self._action_lines(self._encounter_actions(state), "Combat actions")
-        return self._action_lines(self._exploration_actions(state), "Available actions")
+            built = self._action_lines(self._encounter_actions(state), "Combat actions")
+        else:
+            built = self._action_lines(self._exploration_actions(state), "Available actions")
+        _MENU_CACHE[fingerprint] = tuple(built)
+        if len(_MENU_CACHE) > MENU_CACHE_SIZE:
+            _MENU_CACHE.popitem(last=False)
+        return built
 
     def _build_status_payload(self, state: GameState) -> dict:
         stats = get_effective_stats(state.player)
@@ -535,9 +568,12 @@ class Engine:
             "equipment": equipment,
         }
 
-    def _resolve_turn(self, state: GameState, command: str, args: List[str]) -> List[str]:
+    def _resolve_turn(self, state: GameState, command: str, args: List[str], headless: bool = False) -> List[str]:
         """Resolve one parsed command including quest/victory side effects."""
-        action_messages = self._handle_command(state, command, args)
+        if headless and self.commands.read_only(command):
+            action_messages: List[str] = []
+        else:
+            action_messages = self._handle_command(state, command, args)
 
         quest_messages = quest.check_and_advance(state)
         action_messages.extend(quest_messages)
@@ -583,144 +619,142 @@ class Engine:
 
     def process_raw_command(self, state: GameState, raw_command: str) -> str:
         """Parse and resolve one raw command and return rendered screen text."""
-        command, args = parse_command(raw_command)
+        command, args = parse_command(raw_command, self.commands)
         if not command:
             return self._render_screen(state)
         action_messages = self._resolve_turn(state, command, args)
         return self._render_screen(state, action_messages=action_messages)
 
+    def step(self, state: GameState, raw_command: str) -> TurnResult:
+        """Apply one raw command without rendering; for bots, replays, and simulations.
+
+        Game rules run exactly as in process_raw_command (same state changes and
+        RNG draws), but no screen, action menu, or colorized text is produced,
+        and describe-only commands return no messages.
+        """
+        command, args = parse_command(raw_command, self.commands)
+        messages = self._resolve_turn(state, command, args, headless=True) if command else []
+        encounter = state.active_encounter
+        return TurnResult(
+            command=command,
+            args=args,
+            messages=messages,
+            location_id=state.current_location_id,
+            enemy_id=encounter.enemy_id if encounter else None,
+            enemy_hp=encounter.current_hp if encounter else 0,
+            player_hp=state.player.hp,
+            quest_stage=state.quest_stage,
+            game_over=state.game_over,
+            victory=state.victory,
+        )
+
     def _handle_command(self, state: GameState, command: str, args: List[str]) -> List[str]:
+        return self.commands.dispatch(self, state, command, args)
+
+    def _cmd_help(self, state: GameState, args: List[str]) -> List[str]:
+        return [ui.help_text()]
+
+    def _cmd_status(self, state: GameState, args: List[str]) -> List[str]:
+        messages = [ui.format_status(self._build_status_payload(state))]
         if state.active_encounter:
-            allowed = {
-                "help",
-                "status",
-                "inventory",
-                "use",
-                "read",
-                "fight",
-                "defend",
-                "skill",
-                "run",
-                "quest",
-                "map",
-                "joke",
-                "bribe",
-                "quit",
-            }
-            if command not in allowed:
-                return ["You are in an encounter. Use combat commands or `run`."]
-
-        if command == "help":
-            return [ui.help_text()]
-
-        if command == "status":
-            messages = [ui.format_status(self._build_status_payload(state))]
-            if state.active_encounter:
-                messages.extend(combat.encounter_status(state))
-            return messages
-
-        if command == "look":
-            messages = exploration.look(state)
-            if state.active_encounter:
-                messages.extend(combat.encounter_status(state))
-            return messages
-
-        if command == "sense":
-            return exploration.sense(state)
-
-        if command == "map":
-            return [self._render_world_map(state)]
-
-        if command == "hunt":
-            return exploration.hunt(state)
-
-        if command == "move":
-            if not args:
-                return ["Move where? Example: move north"]
-            return exploration.move(state, args[0])
-
-        if command == "inventory":
-            return [ui.format_inventory(state.player.inventory)]
-
-        if command == "equip":
-            if not args:
-                return ["Equip what? Example: equip crusty sword, or use `equip all`."]
-            if len(args) == 1 and args[0].lower() == "all":
-                return loot.equip_best_available(state)
-            return loot.equip_item(state, " ".join(args))
-
-        if command in {"use", "read"}:
-            if not args:
-                return ["Use what? Example: use minor potion"]
-            if state.active_encounter:
-                return combat.player_action(state, command, args)
-            messages, _ = loot.use_item(state, " ".join(args))
-            return messages
-
-        if command == "fight":
-            return combat.player_action(state, "fight", args)
-
-        if command == "defend":
-            return combat.player_action(state, "defend", args)
-
-        if command == "skill":
-            return combat.player_action(state, "skill", args)
-
-        if command == "run":
-            return combat.attempt_run(state)
-
-        if command == "joke":
-            return combat.player_action(state, "joke", args)
-
-        if command == "bribe":
-            return combat.player_action(state, "bribe", args)
-
-        if command == "train":
-            if not args:
-                return ["Train what? Examples: train attack 2, train all, train 3,4,3"]
-
-            raw_train = " ".join(args).strip()
-            lowered = raw_train.lower()
-
-            if lowered == "all":
-                return loot.train_all_equally(state)
-
-            if "," in raw_train:
-                parts = [part.strip() for part in raw_train.split(",")]
-                if len(parts) != 3 or any(not part for part in parts):
-                    return ["Use format: train attack,defense,health (example: train 3,4,3)."]
-                try:
-                    attack_pts, defense_pts, health_pts = (int(parts[0]), int(parts[1]), int(parts[2]))
-                except ValueError:
-                    return ["Training allocation must be numbers. Example: train 3,4,3"]
-                return loot.train_allocation(state, attack_pts, defense_pts, health_pts)
-
-            skill_name = args[0]
-            amount = 1
-            if len(args) > 1:
-                try:
-                    amount = int(args[1])
-                except ValueError:
-                    return ["Training amount must be a number."]
-            return loot.train_skill(state, skill_name, amount)
-
-        if command == "talk":
-            if not args:
-                return ["Talk to whom? Example: talk wise old man"]
-            return exploration.talk(state, " ".join(args))
-
-        if command == "quest":
-            objective = quest.get_current_objective(state)
-            return [ui.format_quest(objective["title"], objective["description"], objective["hint"])]
-
-        if command == "quit":
-            state.game_over = True
-            return ["Game ended."]
-
-        return [f"Unknown command: {command}. Type `help` for a command list."]
-
-    def run(self, state: GameState) -> None:
-        """Run the command loop until quit."""
+            messages.extend(combat.encounter_status(state))
+        return messages
+
+    def _cmd_look(self, state: GameState, args: List[str]) -> List[str]:
+        messages = exploration.look(state)
+        if state.active_encounter:
+            messages.extend(combat.encounter_status(state))
+        return messages
+
+    def _cmd_sense(self, state: GameState, args: List[str]) -> List[str]:
+        return exploration.sense(state)
+
+    def _cmd_map(self, state: GameState, args: List[str]) -> List[str]:
+        return [self._render_world_map(state)]
+
+    def _cmd_hunt(self, state: GameState, args: List[str]) -> List[str]:
+        return exploration.hunt(state)
+
+    def _cmd_move(self, state: GameState, args: List[str]) -> List[str]:
+        return exploration.move(state, args[0])
+
+    def _cmd_inventory(self, state: GameState, args: List[str]) -> List[str]:
+        return [ui.format_inventory(state.player.inventory)]
+
+    def _cmd_equip(self, state: GameState, args: List[str]) -> List[str]:
+        if len(args) == 1 and args[0].lower() == "all":
+            return loot.equip_best_available(state)
+        return loot.equip_item(state, " ".join(args))
+
+    def _cmd_use(self, state: GameState, args: List[str], command: str = "use") -> List[str]:
+        if state.active_encounter:
+            return combat.player_action(state, command, args)
+        messages, _ = loot.use_item(state, " ".join(args))
+        return messages
+
+    def _cmd_read(self, state: GameState, args: List[str]) -> List[str]:
+        return self._cmd_use(state, args, command="read")
+
+    def _cmd_fight(self, state: GameState, args: List[str]) -> List[str]:
+        return combat.player_action(state, "fight", args)
+
+    def _cmd_defend(self, state: GameState, args: List[str]) -> List[str]:
+        return combat.player_action(state, "defend", args)
+
+    def _cmd_skill(self, state: GameState, args: List[str]) -> List[str]:
+        return combat.player_action(state, "skill", args)
+
+    def _cmd_run(self, state: GameState, args: List[str]) -> List[str]:
+        return combat.attempt_run(state)
+
+    def _cmd_advise(self, state: GameState, args: List[str]) -> List[str]:
+        return self._advise(state)
+
+    def _cmd_joke(self, state: GameState, args: List[str]) -> List[str]:
+        return combat.player_action(state, "joke", args)
+
+    def _cmd_bribe(self, state: GameState, args: List[str]) -> List[str]:
+        return combat.player_action(state, "bribe", args)
+
+    def _cmd_train(self, state: GameState, args: List[str]) -> List[str]:
+        raw_train = " ".join(args).strip()
+        lowered = raw_train.lower()
+
+        if lowered == "all":
+            return loot.train_all_equally(state)
+
+        if "," in raw_train:
+            parts = [part.strip() for part in raw_train.split(",")]
+            if len(parts) != 3 or any(not part for part in parts):
+                return ["Use format: train attack,defense,health (example: train 3,4,3)."]
+            try:
+                attack_pts, defense_pts, health_pts = (int(parts[0]), int(parts[1]), int(parts[2]))
+            except ValueError:
+                return ["Training allocation must be numbers. Example: train 3,4,3"]
+            return loot.train_allocation(state, attack_pts, defense_pts, health_pts)
+
+        skill_name = args[0]
+        amount = 1
+        if len(args) > 1:
+            try:
+                amount = int(args[1])
+            except ValueError:
+                return ["Training amount must be a number."]
+        return loot.train_skill(state, skill_name, amount)
+
+    def _cmd_talk(self, state: GameState, args: List[str]) -> List[str]:
+        return exploration.talk(state, " ".join(args))
+
+    def _cmd_quest(self, state: GameState, args: List[str]) -> List[str]:
+        objective = quest.get_current_objective(state)
+        return [ui.format_quest(objective["title"], objective["description"], objective["hint"])]
+
+    def _cmd_quit(self, state: GameState, args: List[str]) -> List[str]:
+        state.game_over = True
+        return ["Game ended."]
+
+    def run(self, state: GameState, on_command: Optional[Callable[[GameState, str], None]] = None) -> None:
+        """Run the command loop until quit; on_command sees each resolved raw command."""
         self._clear_terminal()
         self.output_fn(ui.banner())
         self._emit_action([*exploration.look(state), "Type `help` for commands."])
@@ -733,10 +767,12 @@ class Engine:
                 state.game_over = True
                 break
 
-            command, args = parse_command(raw)
+            command, args = parse_command(raw, self.commands)
             if not command:
                 continue
 
             self._clear_terminal()
             action_messages = self._resolve_turn(state, command, args)
+            if on_command is not None:
+                on_command(state, raw)
             self._emit_action(action_messages)
@@ -0,0 +1,114 @@
+"""Bitset-backed story flags.
+
+Every story flag maps to one bit (see `content.flags`). `FlagSet` is still a
+`set[str]` (so `"x" in state.flags` and iteration work unchanged), but it also keeps the
+matching integer `mask` up to date on every mutation. Requirement checks that
+were compiled with `mask_of` are then a single integer test:
+
+    (flags.mask & required) == required      # all of
+    flags.mask & any_of                      # any of
+
+The registry itself (`KNOWN_FLAGS`, `bit`, `mask_of`, ...) lives in
+`content.flags`, so compiled content can build masks without importing the
+game layer; it is re-exported here.
+
+Every mutation also ORs the bits it flipped into `changed`; that is the flag
+event stream. `take_changes()` hands the pending bits to a consumer (quest
+progression) and resets them, so turns that touch no flag cost nothing there.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+# Re-exported: game and systems modules import the registry from here.
+from content.flags import KNOWN_FLAGS, KNOWN_MASK, bit, flags_mask, mask_of, names_of
+
+
+class FlagSet(set):
+    """A set of flag names that also tracks their bitmask in `mask`.
+
+    `changed` collects the bits of flags set or cleared since the last
+    `take_changes()`. A new FlagSet counts all of its flags as changed.
+    """
+
+    __slots__ = ("mask", "changed")
+
+    def __init__(self, flags: Iterable[str] = ()):
+        super().__init__(flags)
+        self.mask = self.changed = mask_of(self)
+
+    def take_changes(self) -> int:
+        """Return the changed bits and reset them."""
+        changed, self.changed = self.changed, 0
+        return changed
+
+    def add(self, flag: str) -> None:
+        value = bit(flag)
+        if not self.mask & value:
+            super().add(flag)
+            self.mask |= value
+            self.changed |= value
+
+    def discard(self, flag: str) -> None:
+        value = bit(flag)
+        if self.mask & value:
+            super().discard(flag)
+            self.mask &= ~value
+            self.changed |= value
+
+    def remove(self, flag: str) -> None:
+        super().remove(flag)
+        value = bit(flag)
+        self.mask &= ~value
+        self.changed |= value
+
+    def pop(self) -> str:
+        flag = super().pop()
+        value = bit(flag)
+        self.mask &= ~value
+        self.changed |= value
+        return flag
+
+    def clear(self) -> None:
+        super().clear()
+        self.changed |= self.mask
+        self.mask = 0
+
+    def _resync(self) -> "FlagSet":
+        mask = mask_of(self)
+        self.changed |= self.mask ^ mask
+        self.mask = mask
+        return self
+
+    def update(self, *others: Iterable[str]) -> None:
+        super().update(*others)
+        self._resync()
+
+    def difference_update(self, *others: Iterable[str]) -> None:
+        super().difference_update(*others)
+        self._resync()
+
+    def intersection_update(self, *others: Iterable[str]) -> None:
+        super().intersection_update(*others)
+        self._resync()
+
+    def symmetric_difference_update(self, other: Iterable[str]) -> None:
+        super().symmetric_difference_update(other)
+        self._resync()
+
+    def __ior__(self, other):
+        super().__ior__(other)
+        return self._resync()
+
+    def __iand__(self, other):
+        super().__iand__(other)
+        return self._resync()
+
+    def __isub__(self, other):
+        super().__isub__(other)
+        return self._resync()
+
+    def __ixor__(self, other):
+        super().__ixor__(other)
+        return self._resync()
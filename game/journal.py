@@ -0,0 +1,312 @@
+"""Append-only command journal with periodic snapshot checkpoints.
+
+A journal file is a header (seed) followed by records:
+
+    b"C" | size | utf-8 command          one per resolved command
+    b"K" | size | snapshot bytes         a full checkpoint every K commands
+    b"R" | 0                             a session resumed after it had ended
+
+Each command costs a few bytes on disk. Restoring loads the newest checkpoint
+(or a fresh seeded state) and replays the remaining commands through the
+headless `Engine.step`, which applies the same rules as
+`Engine.process_raw_command` without rendering. A torn final record from a
+crash is ignored.
+
+Resuming a journal whose session ended (`quit`) clears `game_over` so play
+can continue; the resume record makes replay clear it at the same point.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+import os
+from typing import List, Optional, Tuple
+
+from game.engine import Engine
+from game.snapshot import DEFAULT_COMPRESSION, decode_state, encode_state
+from game.state import GameState, create_initial_state
+
+
+MAGIC = b"BWJ"
+VERSION = 1
+DEFAULT_CHECKPOINT_INTERVAL = 50
+
+_RECORD_COMMAND = b"C"[0]
+_RECORD_CHECKPOINT = b"K"[0]
+_RECORD_RESUME = b"R"[0]
+
+# Stands in for a resume record in `JournalContents.commands`.
+RESUME = None
+
+
+class JournalError(ValueError):
+    """Raised when a journal file cannot be read."""
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Return (value, next_pos); raise IndexError when the data ends mid-varint."""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _header(seed: Optional[int]) -> bytes:
+    if seed is None:
+        return MAGIC + bytes((VERSION, 0))
+    zigzag = (seed << 1) if seed >= 0 else ((-seed << 1) - 1)
+    return MAGIC + bytes((VERSION, 1)) + _varint(zigzag)
+
+
+@dataclass
+class JournalContents:
+    """Parsed journal file."""
+
+    seed: Optional[int]
+    # Raw commands in order, with RESUME where a finished session was reopened.
+    commands: List[Optional[str]] = field(default_factory=list)
+    # (number of commands applied before the checkpoint, snapshot bytes)
+    checkpoints: List[Tuple[int, bytes]] = field(default_factory=list)
+    valid_bytes: int = 0
+    truncated: bool = False
+
+
+def read_journal(path: str | os.PathLike[str]) -> JournalContents:
+    """Parse a journal, stopping cleanly at a torn final record."""
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if len(data) < 5 or data[:3] != MAGIC:
+        raise JournalError("Not a byte_world_ai journal.")
+    if data[3] != VERSION:
+        raise JournalError(f"Unsupported journal version: {data[3]}")
+
+    pos = 5
+    seed: Optional[int] = None
+    if data[4]:
+        try:
+            zigzag, pos = _read_varint(data, pos)
+        except IndexError:
+            raise JournalError("Journal header is truncated.") from None
+        seed = (zigzag >> 1) if not zigzag & 1 else -((zigzag + 1) >> 1)
+
+    contents = JournalContents(seed=seed, valid_bytes=pos)
+    while pos < len(data):
+        tag = data[pos]
+        try:
+            size, body_start = _read_varint(data, pos + 1)
+        except IndexError:
+            contents.truncated = True
+            break
+        end = body_start + size
+        if end > len(data):
+            contents.truncated = True
+            break
+        body = data[body_start:end]
+        if tag == _RECORD_COMMAND:
+            contents.commands.append(body.decode("utf-8", errors="replace"))
+        elif tag == _RECORD_CHECKPOINT:
+            contents.checkpoints.append((len(contents.commands), body))
+        elif tag == _RECORD_RESUME:
+            contents.commands.append(RESUME)
+        else:
+            raise JournalError(f"Unknown journal record type at byte {pos}.")
+        pos = end
+        contents.valid_bytes = pos
+    return contents
+
+
+def _origin_state(contents: JournalContents) -> Tuple[GameState, int]:
+    """State before the first journaled command, and the command index it sits at."""
+    if contents.checkpoints and contents.checkpoints[0][0] == 0:
+        return decode_state(contents.checkpoints[0][1]), 0
+    if contents.seed is None:
+        raise JournalError("Journal has neither a seed nor an initial checkpoint.")
+    return create_initial_state(seed=contents.seed), 0
+
+
+def replay(state: GameState, commands: List[Optional[str]], engine: Optional[Engine] = None) -> GameState:
+    """Apply raw commands to a state in order, reopening the session at each RESUME."""
+    engine = engine or Engine()
+    for raw in commands:
+        if raw is RESUME:
+            state.game_over = False
+        else:
+            engine.step(state, raw)
+    return state
+
+
+def restore_state(path: str | os.PathLike[str], engine: Optional[Engine] = None) -> GameState:
+    """Load the newest checkpoint and replay the commands written after it."""
+    contents = read_journal(path)
+    if contents.checkpoints:
+        index, blob = contents.checkpoints[-1]
+        state = decode_state(blob)
+    else:
+        state, index = _origin_state(contents)
+    return replay(state, contents.commands[index:], engine)
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of verify_journal."""
+
+    ok: bool
+    commands_replayed: int
+    checkpoints_checked: int
+    mismatch: str = ""
+
+
+def verify_journal(
+    path: str | os.PathLike[str],
+    live_state: Optional[GameState] = None,
+    engine: Optional[Engine] = None,
+) -> ReplayReport:
+    """Replay a journal from its origin and compare against every checkpoint.
+
+    When `live_state` is given the fully replayed state must also match it
+    byte for byte (compared through the snapshot encoding).
+    """
+    engine = engine or Engine()
+    contents = read_journal(path)
+    state, position = _origin_state(contents)
+    checked = 0
+    for index, blob in contents.checkpoints:
+        replay(state, contents.commands[position:index], engine)
+        position = index
+        if encode_state(state, compression=0) != encode_state(decode_state(blob), compression=0):
+            return ReplayReport(False, position, checked, f"checkpoint after command {index} differs from replay")
+        checked += 1
+    replay(state, contents.commands[position:], engine)
+    position = len(contents.commands)
+    if live_state is not None and encode_state(state, compression=0) != encode_state(live_state, compression=0):
+        return ReplayReport(False, position, checked, "replayed state differs from the live state")
+    return ReplayReport(True, position, checked)
+
+
+class CommandJournal:
+    """Append raw commands to a journal file, checkpointing every K commands."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        compression: int = DEFAULT_COMPRESSION,
+        durable: bool = False,
+    ):
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1.")
+        self.path = os.fspath(path)
+        self.checkpoint_interval = checkpoint_interval
+        self.compression = compression
+        self.durable = durable
+        self.command_count = 0
+        self._since_checkpoint = 0
+        self._handle = None
+
+    @classmethod
+    def create(
+        cls,
+        path: str | os.PathLike[str],
+        state: GameState,
+        seed: Optional[int] = None,
+        **options,
+    ) -> "CommandJournal":
+        """Start a new journal for `state`.
+
+        Pass the seed `state` was created with to skip the initial checkpoint;
+        otherwise the starting state is written as checkpoint zero.
+        """
+        journal = cls(path, **options)
+        journal._handle = open(journal.path, "wb")
+        journal._write(_header(seed))
+        if seed is None:
+            journal.checkpoint(state)
+        return journal
+
+    @classmethod
+    def resume(cls, path: str | os.PathLike[str], engine: Optional[Engine] = None, **options) -> Tuple["CommandJournal", GameState]:
+        """Reopen an existing journal, dropping any torn tail, and restore its state.
+
+        If the journaled session had ended, `game_over` is cleared and a
+        resume record is appended so replay reaches the same state.
+        """
+        journal = cls(path, **options)
+        contents = read_journal(journal.path)
+        state = restore_state(journal.path, engine)
+        journal._handle = open(journal.path, "r+b")
+        journal._handle.truncate(contents.valid_bytes)
+        journal._handle.seek(contents.valid_bytes)
+        journal.command_count = len(contents.commands)
+        last_checkpoint = contents.checkpoints[-1][0] if contents.checkpoints else 0
+        journal._since_checkpoint = journal.command_count - last_checkpoint
+        if state.game_over:
+            state.game_over = False
+            journal._write(bytes((_RECORD_RESUME, 0)))
+            journal.command_count += 1
+        return journal, state
+
+    def _write(self, data: bytes) -> None:
+        assert self._handle is not None
+        self._handle.write(data)
+        self._handle.flush()
+        if self.durable:
+            os.fsync(self._handle.fileno())
+
+    def record(self, state: GameState, raw_command: str) -> None:
+        """Append one command that has just been applied to `state`."""
+        if not raw_command.strip():
+            return
+        payload = raw_command.encode("utf-8")
+        self._write(bytes((_RECORD_COMMAND,)) + _varint(len(payload)) + payload)
+        self.command_count += 1
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_interval:
+            self.checkpoint(state)
+
+    def checkpoint(self, state: GameState) -> None:
+        """Write a full snapshot so restores replay at most K commands."""
+        blob = encode_state(state, self.compression)
+        self._write(bytes((_RECORD_CHECKPOINT,)) + _varint(len(blob)) + blob)
+        self._since_checkpoint = 0
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "CommandJournal":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Verify that a journal replays consistently with its checkpoints."""
+    parser = argparse.ArgumentParser(description="Verify a byte_world_ai command journal")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+    report = verify_journal(args.path)
+    status = "ok" if report.ok else f"MISMATCH: {report.mismatch}"
+    print(f"{args.path}: {report.commands_replayed} commands, {report.checkpoints_checked} checkpoints, {status}")
+    raise SystemExit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Shared name index for item, NPC, and enemy lookups.
+
+Every content name is normalized once. A substring index (all 1-2 character
+substrings plus trigram postings) answers "which names contain this query"
+without scanning the catalogue, and a BK-tree over the distinct words in the
+names gives typo-tolerant "did you mean" suggestions, matching the query word
+by word and counting a swap of two adjacent letters as one typo. `resolve` keeps the game's matching rules: an exact id first, then
+the first candidate (in the caller's order, e.g. inventory order) whose
+normalized name contains the query.
+"""
+
+from __future__ import annotations
+
+from itertools import filterfalse
+from typing import Collection, Container, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import content
+from content.enemies import ENEMIES
+from content.items import ITEMS
+from content.world import NPCS
+from game import startup_cache
+
+
+SHORT_QUERY = 2
+SUGGESTION_LIMIT = 3
+# Suggestions allow one typo per TYPO_SPAN characters of each query word (at least one, at most MAX_TYPOS).
+TYPO_SPAN = 3
+MAX_TYPOS = 2
+_EMPTY: Set[str] = set()
+
+
+def _intersect(ids: Set[str], within: Collection[str]) -> Set[str]:
+    """`ids` & `within`, walking whichever side is smaller."""
+    if len(ids) > len(within):
+        return ids.intersection(within)
+    return {entry_id for entry_id in ids if entry_id in within}
+
+
+def normalize_name(text: str) -> str:
+    """Normalize text for command matching."""
+    return "".join(ch for ch in text.lower().strip() if ch.isalnum() or ch.isspace())
+
+
+def typo_limit(word: str) -> int:
+    """Edits a suggestion may need to match `word`."""
+    return min(MAX_TYPOS, max(1, len(word) // TYPO_SPAN))
+
+
+def edit_distance(left: str, right: str, limit: Optional[int] = None) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent swaps as one edit).
+
+    Returns `limit + 1` as soon as the distance must exceed `limit`.
+    """
+    if len(left) < len(right):
+        left, right = right, left
+    if limit is not None and len(left) - len(right) > limit:
+        return limit + 1
+    before: List[int] = []
+    previous = list(range(len(right) + 1))
+    previous_low = 0
+    for i, left_char in enumerate(left, 1):
+        current = [i]
+        for j, right_char in enumerate(right, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (left_char != right_char))
+            if before and j > 1 and left_char == right[j - 2] and left[i - 2] == right_char:
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        low = min(current)
+        # A swap reaches back two rows, so both must be past the limit.
+        if limit is not None and low > limit and previous_low > limit:
+            return limit + 1
+        before, previous, previous_low = previous, current, low
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings under `edit_distance`."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self) -> None:
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """(distance, word) for every stored word within `max_distance`."""
+        if self._root is None:
+            return []
+        found: List[Tuple[int, str]] = []
+        pending = [self._root]
+        while pending:
+            stored, children = pending.pop()
+            # Past the longest child edge plus the radius, only "too far" matters.
+            distance = edit_distance(word, stored, max(children, default=0) + max_distance)
+            if distance <= max_distance:
+                found.append((distance, stored))
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    pending.append(child)
+        return found
+
+
+class NameIndex:
+    """Precomputed lookups over one id -> display name table."""
+
+    def __init__(self, names: Mapping[str, str]):
+        self.names: Dict[str, str] = dict(names)
+        self.normalized: Dict[str, str] = {entry_id: normalize_name(name) for entry_id, name in self.names.items()}
+        self._short: Dict[str, Set[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._terms: Dict[str, Set[str]] = {}
+        self._tree = BKTree()
+        for entry_id, normalized in self.normalized.items():
+            for size in range(1, SHORT_QUERY + 1):
+                for start in range(len(normalized) - size + 1):
+                    self._short.setdefault(normalized[start : start + size], set()).add(entry_id)
+            for start in range(len(normalized) - 2):
+                self._trigrams.setdefault(normalized[start : start + 3], set()).add(entry_id)
+            for term in set(normalized.split()):
+                if term not in self._terms:
+                    self._terms[term] = set()
+                    self._tree.add(term)
+                self._terms[term].add(entry_id)
+
+    def containing(self, query_norm: str, within: Optional[Collection[str]] = None) -> Set[str]:
+        """Ids whose normalized name contains `query_norm`, only those in `within` if given."""
+        if len(query_norm) <= SHORT_QUERY:
+            matches = self._short.get(query_norm, _EMPTY)
+            return matches if within is None else _intersect(matches, within)
+        postings = sorted(
+            (self._trigrams.get(query_norm[start : start + 3], _EMPTY) for start in range(len(query_norm) - 2)),
+            key=len,
+        )
+        if not postings[0]:
+            return _EMPTY
+        matches = set(postings[0]) if within is None else _intersect(postings[0], within)
+        for posting in postings[1:]:
+            if not matches:
+                return _EMPTY
+            matches &= posting
+        if len(query_norm) == 3:
+            return matches
+        return {entry_id for entry_id in matches if query_norm in self.normalized[entry_id]}
+
+    def resolve(self, query: str, candidates: Iterable[str]) -> Optional[str]:
+        """First candidate whose id is `query` or whose name contains it, like the original scans."""
+        query_norm = normalize_name(query)
+        if not query_norm:
+            return None
+        if not isinstance(candidates, (dict, set, frozenset)):
+            candidates = dict.fromkeys(candidates)
+        if query in candidates:
+            return query
+        if query_norm in candidates:
+            return query_norm
+        hits = self.containing(query_norm, candidates)
+        if len(hits) == 1:
+            return next(iter(hits))
+        if hits:
+            # Several owned names match: the caller's order picks, as the scans did.
+            return next(candidate for candidate in candidates if candidate in hits)
+        # Ids missing from the table (content reloaded under a save) match on the id text.
+        for candidate in filterfalse(self.normalized.__contains__, candidates):
+            if query_norm in normalize_name(candidate):
+                return candidate
+        return None
+
+    def suggest(
+        self,
+        query: str,
+        candidates: Optional[Container[str]] = None,
+        limit: int = SUGGESTION_LIMIT,
+    ) -> List[str]:
+        """Display names close to `query` (optionally only among `candidates`), closest first.
+
+        Every query word must be within `typo_limit` of some word in the name;
+        names rank by the summed distances.
+        """
+        matched: List[List[Tuple[int, str]]] = []
+        survivors: Optional[Set[str]] = None
+        for word in normalize_name(query).split():
+            found = sorted(self._tree.search(word, typo_limit(word)))
+            ids = set().union(*(self._terms[term] for _distance, term in found))
+            if survivors is None:
+                survivors = ids if candidates is None else {entry_id for entry_id in ids if entry_id in candidates}
+            else:
+                survivors &= ids
+            if not survivors:
+                return []
+            matched.append(found)
+        if not survivors:
+            return []
+        terms = self._terms
+        best = {
+            entry_id: sum(next(distance for distance, term in found if entry_id in terms[term]) for found in matched)
+            for entry_id in survivors
+        }
+        ranked = sorted(best, key=lambda entry_id: (best[entry_id], self.names[entry_id]))
+        return [self.names[entry_id] for entry_id in ranked[:limit]]
+
+
+def did_you_mean(suggestions: List[str]) -> str:
+    """' Did you mean X?' (or 'X or Y?'), empty when there is nothing to offer."""
+    if not suggestions:
+        return ""
+    if len(suggestions) == 1:
+        return f" Did you mean {suggestions[0]}?"
+    return f" Did you mean {', '.join(suggestions[:-1])} or {suggestions[-1]}?"
+
+
+ITEM_INDEX = NameIndex({})
+NPC_INDEX = NameIndex({})
+ENEMY_INDEX = NameIndex({})
+
+
+def rebuild() -> None:
+    """Re-index names after content tables change."""
+    global ITEM_INDEX, NPC_INDEX, ENEMY_INDEX
+    tables = (
+        {item_id: item.get("name", item_id) for item_id, item in ITEMS.items()},
+        {npc_id: npc.get("name", npc_id) for npc_id, npc in NPCS.items()},
+        {enemy_id: enemy.get("name", enemy_id) for enemy_id, enemy in ENEMIES.items()},
+    )
+    ITEM_INDEX, NPC_INDEX, ENEMY_INDEX = startup_cache.derive(
+        "names.indexes", tables, lambda: tuple(NameIndex(names) for names in tables)
+    )
+
+
+rebuild()
+content.add_reload_hook(rebuild)
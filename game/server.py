@@ -0,0 +1,270 @@
+"""Asyncio line-protocol game server for byte_world_ai.
+
+Clients connect over plain TCP (telnet/MUD style), send one command per line,
+and receive the rendered screen followed by a `> ` prompt. Every connection
+owns its own GameState (held in a SessionPool, so idle sessions can be
+hibernated); one shared Engine drives them all.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+import sys
+from typing import Optional
+
+from game.commands import COST_SOLVER, parse_command
+from game.engine import Engine
+from game.sessions import DirectoryStore, SessionPool
+from systems import combat_markov
+
+
+PROMPT = "> "
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 4000
+DEFAULT_MAX_LINE_BYTES = 1024
+
+_TELNET_IAC = 255
+_TELNET_SB = 250
+_TELNET_SE = 240
+_TELNET_WILL = 251
+_TELNET_DONT = 254
+
+
+@dataclass
+class ServerStats:
+    """Live counters exposed by the server."""
+
+    connections_open: int = 0
+    connections_total: int = 0
+    connections_rejected: int = 0
+    commands_processed: int = 0
+
+
+def _strip_telnet(data: bytes) -> bytes:
+    """Drop telnet negotiation sequences (IAC ...) from one input line."""
+    if _TELNET_IAC not in data:
+        return data
+    cleaned = bytearray()
+    index = 0
+    size = len(data)
+    while index < size:
+        byte = data[index]
+        if byte != _TELNET_IAC:
+            cleaned.append(byte)
+            index += 1
+            continue
+        command = data[index + 1] if index + 1 < size else None
+        if command == _TELNET_IAC:
+            cleaned.append(_TELNET_IAC)
+            index += 2
+        elif command == _TELNET_SB:
+            end = data.find(bytes([_TELNET_IAC, _TELNET_SE]), index + 2)
+            index = size if end < 0 else end + 2
+        elif command is not None and _TELNET_WILL <= command <= _TELNET_DONT:
+            index += 3
+        else:
+            index += 2
+    return bytes(cleaned)
+
+
+def _to_wire(text: str) -> bytes:
+    """Encode screen text with telnet-style CRLF line endings."""
+    return text.replace("\r\n", "\n").replace("\n", "\r\n").encode("utf-8", errors="replace")
+
+
+class GameServer:
+    """Serve one GameState per TCP connection through Engine.process_raw_command."""
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        engine: Optional[Engine] = None,
+        max_connections: int = 10000,
+        max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+        idle_timeout: Optional[float] = None,
+        pool: Optional[SessionPool] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.engine = engine or Engine()
+        self.max_connections = max_connections
+        self.max_line_bytes = max_line_bytes
+        self.idle_timeout = idle_timeout
+        self.pool = pool if pool is not None else SessionPool(capacity=max(1, max_connections))
+        self.stats = ServerStats()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Bind the listening socket and start accepting clients."""
+        self._server = await asyncio.start_server(
+            self._handle_client,
+            self.host,
+            self.port,
+            limit=self.max_line_bytes,
+            backlog=1024,
+        )
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        return self._server
+
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _run_command(self, session_id: str, raw: str) -> tuple[str, bool]:
+        """Resolve one command for a session; returns (screen, game over).
+
+        The GameState is only touched on the event loop. For solver commands
+        the pure combat solve runs first on a worker thread, from an immutable
+        snapshot of the fight, so other clients keep being served; the session
+        is fetched again afterwards (the pool may have hibernated it meanwhile)
+        and the command finds its answer cached.
+        """
+        state = self.pool.get(session_id)
+        command, _args = parse_command(raw, self.engine.commands)
+        if self.engine.commands.cost(command) == COST_SOLVER:
+            position = combat_markov.encounter_position(state)
+            del state
+            if position is not None:
+                await asyncio.to_thread(combat_markov.advise_position, *position)
+            state = self.pool.get(session_id)
+        screen = self.engine.process_raw_command(state, raw)
+        return screen, state.game_over
+
+    async def _send(self, writer: asyncio.StreamWriter, text: str) -> None:
+        writer.write(_to_wire(f"{text}\n{PROMPT}" if text else PROMPT))
+        await writer.drain()
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> Optional[bytes]:
+        """Read one line; None means the client is gone or misbehaving."""
+        try:
+            if self.idle_timeout:
+                line = await asyncio.wait_for(reader.readline(), timeout=self.idle_timeout)
+            else:
+                line = await reader.readline()
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
+        except (asyncio.LimitOverrunError, ValueError):
+            return None
+        if not line:
+            return None
+        return line
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.stats.connections_open >= self.max_connections:
+            self.stats.connections_rejected += 1
+            writer.write(b"Server is full. Try again later.\r\n")
+            try:
+                await writer.drain()
+            finally:
+                writer.close()
+            return
+
+        self.stats.connections_open += 1
+        self.stats.connections_total += 1
+        # Only the session id is held while waiting for input, so an idle
+        # connection does not keep its GameState alive once the pool hibernates it.
+        session_id, state = self.pool.create()
+        screen = self.engine.initial_screen(state)
+        del state
+        try:
+            await self._send(writer, screen)
+            while True:
+                line = await self._read_line(reader)
+                if line is None:
+                    break
+                raw = _strip_telnet(line).decode("utf-8", errors="replace").strip()
+                screen, game_over = await self._run_command(session_id, raw)
+                self.stats.commands_processed += 1
+                if game_over:
+                    writer.write(_to_wire(f"{screen}\n"))
+                    await writer.drain()
+                    break
+                await self._send(writer, screen)
+        except ConnectionError:
+            pass
+        finally:
+            self.stats.connections_open -= 1
+            self.pool.discard(session_id)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def format_stats(server: GameServer) -> str:
+    """One-line summary of connection and session-pool counters."""
+    pool_stats = server.pool.stats()
+    return (
+        f"open={server.stats.connections_open} commands={server.stats.commands_processed} "
+        f"resident={pool_stats.resident_sessions} hibernated={pool_stats.hibernated_sessions} "
+        f"({pool_stats.hibernated_bytes} B) evictions={pool_stats.evictions} hit_rate={pool_stats.hit_rate:.3f} "
+        f"thaws={pool_stats.thaws} thaw_mean_ms={pool_stats.thaw_seconds_mean * 1000:.3f} "
+        f"thaw_max_ms={pool_stats.thaw_seconds_max * 1000:.3f}"
+    )
+
+
+async def _report_stats(server: GameServer, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        print(format_stats(server), file=sys.stderr, flush=True)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    store = DirectoryStore(args.hibernate_dir) if args.hibernate_dir else None
+    pool = SessionPool(capacity=args.resident_sessions, store=store)
+    server = GameServer(
+        host=args.host,
+        port=args.port,
+        max_connections=args.max_connections,
+        idle_timeout=args.idle_timeout,
+        pool=pool,
+    )
+    await server.start()
+    print(f"byte_world_ai server listening on {server.host}:{server.port}", flush=True)
+    if args.stats_interval:
+        asyncio.get_running_loop().create_task(_report_stats(server, args.stats_interval))
+    await server.serve_forever()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the multi-session TCP server."""
+    parser = argparse.ArgumentParser(description="byte_world_ai line-protocol game server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-connections", type=int, default=10000)
+    parser.add_argument("--idle-timeout", type=float, default=None, help="Disconnect clients idle this many seconds.")
+    parser.add_argument(
+        "--resident-sessions",
+        type=int,
+        default=1000,
+        help="Live GameStates kept in memory; older idle sessions are hibernated.",
+    )
+    parser.add_argument("--hibernate-dir", default=None, help="Hibernate idle sessions to this directory instead of RAM.")
+    parser.add_argument("--stats-interval", type=float, default=0.0, help="Print pool counters every N seconds.")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        print("Server stopped.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
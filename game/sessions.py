@@ -0,0 +1,248 @@
+"""LRU-bounded pool of live GameStates with idle-session hibernation.
+
+Only the `capacity` most recently used states stay resident. Older sessions
+are serialized into a compact blob and parked in a store (memory or disk);
+the next `get()` for that session thaws it transparently.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import itertools
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+from game.snapshot import decode_state, encode_state
+from game.state import GameState, create_initial_state
+
+
+def freeze_state(state: GameState, level: int = 6) -> bytes:
+    """Serialize a state into a compact snapshot blob."""
+    return encode_state(state, compression=level)
+
+
+def thaw_state(blob: bytes) -> GameState:
+    """Rebuild a state produced by freeze_state."""
+    return decode_state(blob)
+
+
+class MemoryStore:
+    """Keep hibernated sessions as bytes in process memory."""
+
+    def __init__(self):
+        self._blobs: Dict[str, bytes] = {}
+
+    def put(self, session_id: str, blob: bytes) -> None:
+        self._blobs[session_id] = blob
+
+    def pop(self, session_id: str) -> Optional[bytes]:
+        return self._blobs.pop(session_id, None)
+
+    def discard(self, session_id: str) -> None:
+        self._blobs.pop(session_id, None)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._blobs
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def total_bytes(self) -> int:
+        return sum(len(blob) for blob in self._blobs.values())
+
+
+class DirectoryStore:
+    """Keep hibernated sessions as one file per session on disk."""
+
+    def __init__(self, directory: str | os.PathLike[str]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sizes: Dict[str, int] = {}
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.session"
+
+    def put(self, session_id: str, blob: bytes) -> None:
+        path = self._path(session_id)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_bytes(blob)
+        os.replace(temp_path, path)
+        self._sizes[session_id] = len(blob)
+
+    def pop(self, session_id: str) -> Optional[bytes]:
+        if session_id not in self._sizes:
+            return None
+        path = self._path(session_id)
+        try:
+            blob = path.read_bytes()
+        except OSError:
+            self._sizes.pop(session_id, None)
+            return None
+        path.unlink(missing_ok=True)
+        self._sizes.pop(session_id, None)
+        return blob
+
+    def discard(self, session_id: str) -> None:
+        if self._sizes.pop(session_id, None) is not None:
+            self._path(session_id).unlink(missing_ok=True)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sizes
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+
+@dataclass
+class PoolStats:
+    """Counters for sizing the resident pool."""
+
+    hits: int = 0
+    thaws: int = 0
+    creations: int = 0
+    evictions: int = 0
+    thaw_seconds_total: float = 0.0
+    thaw_seconds_max: float = 0.0
+    freeze_seconds_total: float = 0.0
+    resident_sessions: int = 0
+    hibernated_sessions: int = 0
+    hibernated_bytes: int = 0
+    resident_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.thaws
+        return self.hits / lookups if lookups else 1.0
+
+    @property
+    def thaw_seconds_mean(self) -> float:
+        return self.thaw_seconds_total / self.thaws if self.thaws else 0.0
+
+
+def _deep_sizeof(obj: object, seen: set[int]) -> int:
+    """Approximate retained bytes of a state graph, counting shared objects once."""
+    pending = [obj]
+    total = 0
+    while pending:
+        current = pending.pop()
+        marker = id(current)
+        if marker in seen:
+            continue
+        seen.add(marker)
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        elif hasattr(current, "__dict__") and not isinstance(current, type):
+            pending.append(vars(current))
+    return total
+
+
+class SessionPool:
+    """Keep the N most recently active GameStates live; hibernate the rest."""
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        store: Optional[MemoryStore | DirectoryStore] = None,
+        state_factory: Callable[[], GameState] = create_initial_state,
+        compression_level: int = 6,
+    ):
+        if capacity < 1:
+            raise ValueError("SessionPool capacity must be at least 1.")
+        self.capacity = capacity
+        self.store = store if store is not None else MemoryStore()
+        self.state_factory = state_factory
+        self.compression_level = compression_level
+        self._resident: OrderedDict[str, GameState] = OrderedDict()
+        self._ids = itertools.count(1)
+        self._stats = PoolStats()
+
+    def create(self, session_id: Optional[str] = None) -> tuple[str, GameState]:
+        """Start a new session and return (session_id, state)."""
+        if session_id is None:
+            session_id = f"s{next(self._ids)}"
+        if session_id in self:
+            raise KeyError(f"Session already exists: {session_id}")
+        state = self.state_factory()
+        self._stats.creations += 1
+        self._admit(session_id, state)
+        return session_id, state
+
+    def get(self, session_id: str) -> GameState:
+        """Return a live state, thawing it from the store when hibernated."""
+        state = self._resident.get(session_id)
+        if state is not None:
+            self._resident.move_to_end(session_id)
+            self._stats.hits += 1
+            return state
+
+        blob = self.store.pop(session_id)
+        if blob is None:
+            raise KeyError(f"Unknown session: {session_id}")
+        started = time.perf_counter()
+        state = thaw_state(blob)
+        elapsed = time.perf_counter() - started
+        self._stats.thaws += 1
+        self._stats.thaw_seconds_total += elapsed
+        self._stats.thaw_seconds_max = max(self._stats.thaw_seconds_max, elapsed)
+        self._admit(session_id, state)
+        return state
+
+    def discard(self, session_id: str) -> None:
+        """Forget a session entirely (for example on disconnect)."""
+        self._resident.pop(session_id, None)
+        self.store.discard(session_id)
+
+    def hibernate(self, session_id: str) -> None:
+        """Evict one resident session immediately."""
+        state = self._resident.pop(session_id, None)
+        if state is not None:
+            self._freeze(session_id, state)
+
+    def _admit(self, session_id: str, state: GameState) -> None:
+        self._resident[session_id] = state
+        self._resident.move_to_end(session_id)
+        while len(self._resident) > self.capacity:
+            evicted_id, evicted_state = self._resident.popitem(last=False)
+            self._freeze(evicted_id, evicted_state)
+
+    def _freeze(self, session_id: str, state: GameState) -> None:
+        started = time.perf_counter()
+        self.store.put(session_id, freeze_state(state, self.compression_level))
+        self._stats.freeze_seconds_total += time.perf_counter() - started
+        self._stats.evictions += 1
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._resident or session_id in self.store
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self.store)
+
+    def resident_ids(self) -> Iterator[str]:
+        """Resident session ids, least recently used first."""
+        return iter(list(self._resident))
+
+    def resident_bytes(self) -> int:
+        """Approximate memory retained by resident states (walks every state)."""
+        seen: set[int] = set()
+        return sum(_deep_sizeof(state, seen) for state in self._resident.values())
+
+    def stats(self, measure_resident: bool = False) -> PoolStats:
+        """Snapshot of pool counters; resident bytes are measured on request."""
+        snapshot = PoolStats(**vars(self._stats))
+        snapshot.resident_sessions = len(self._resident)
+        snapshot.hibernated_sessions = len(self.store)
+        snapshot.hibernated_bytes = self.store.total_bytes()
+        if measure_resident:
+            snapshot.resident_bytes = self.resident_bytes()
+        return snapshot
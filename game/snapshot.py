@@ -0,0 +1,652 @@
+"""Compact versioned binary snapshots of GameState.
+
+Layout (all integers are LEB128 varints, signed values zigzag-encoded):
+
+    b"BWS" | version:u8 | compression:u8 | body_size | body | rng
+
+The body starts with a string table: every id, flag, name, and title used by
+the snapshot is stored once and referenced by index afterwards. It is
+zlib-compressed when compression > 0.
+
+The RNG follows. A `GameRandom` still on its integer seed's stream (every
+game the engine creates) is stored as its seed and the number of 32-bit words
+drawn since seeding, and decoding re-seeds and draws that many words again.
+Anything else (a generator restored with `setstate`, a pending gauss value,
+or more than `SEED_REPLAY_LIMIT` words drawn) stores the Mersenne Twister
+state as 625 raw little-endian uint32 words. That is 2.5 KB of random data,
+which zlib cannot shrink.
+
+Version 2 stores the flags listed in `game.flags.KNOWN_FLAGS` as one bitmask
+varint; only other flags go through the string table. Version 3 adds the
+seeded RNG form. Version 1 snapshots, which store every flag as a string, and
+version 2 snapshots, which always store the raw twister state, still decode.
+
+The older JSON layout used by the browser build is kept here as
+`state_to_dict` / `state_from_dict` so existing saves can still be migrated.
+"""
+
+from __future__ import annotations
+
+import base64
+from collections import OrderedDict
+import os
+import pickle
+import random
+import struct
+from typing import Dict, List, Optional
+import zlib
+
+from content.enemies import ENEMIES
+from content.items import ITEMS
+from content.quests import QUEST_STAGES
+from content.world import LOCATIONS
+from game.flags import KNOWN_FLAGS, KNOWN_MASK, names_of
+from game.state import (
+    Encounter,
+    GameRandom,
+    GameState,
+    Player,
+    clamp_player_hp,
+    create_initial_state,
+    get_effective_stats,
+)
+
+
+MAGIC = b"BWS"
+VERSION = 3
+SUPPORTED_VERSIONS = (1, 2, 3)
+DEFAULT_COMPRESSION = 1
+
+# Past this many words drawn, re-drawing them on decode costs more than the raw state.
+SEED_REPLAY_LIMIT = 1 << 16
+SEED_STREAM_CACHE = 64
+
+_RNG_WORDS = struct.Struct("<625I")
+_DOUBLE = struct.Struct("<d")
+_TWISTER_WORDS = 624
+_RNG_RAW = 0
+_RNG_SEEDED = 1
+
+KNOWN_FLAG_SET = frozenset(KNOWN_FLAGS)
+
+_ENCOUNTER_DEFENDING = 1
+_ENCOUNTER_BARRIER = 2
+_STATE_GAME_OVER = 1
+_STATE_VICTORY = 2
+_STATE_HAS_ENCOUNTER = 4
+
+
+class SnapshotError(ValueError):
+    """Raised when snapshot bytes cannot be decoded."""
+
+
+def _check_ids(state: GameState) -> None:
+    """Raise SnapshotError if the state names locations, enemies or items the content does not define."""
+    player = state.player
+    unknown_items = [item_id for item_id in player.inventory if item_id not in ITEMS]
+    unknown_items.extend(item_id for item_id in player.equipment.values() if item_id and item_id not in ITEMS)
+    if unknown_items:
+        raise SnapshotError(f"Unknown item ids in snapshot: {', '.join(sorted(set(unknown_items)))}")
+    unknown_locations = [location_id for location_id in state.discovered_locations if location_id not in LOCATIONS]
+    if state.current_location_id not in LOCATIONS:
+        unknown_locations.append(state.current_location_id)
+    if unknown_locations:
+        raise SnapshotError(f"Unknown location ids in snapshot: {', '.join(sorted(set(unknown_locations)))}")
+    if state.quest_stage not in QUEST_STAGES:
+        raise SnapshotError(f"Unknown quest stage in snapshot: {state.quest_stage}")
+    if state.active_encounter and state.active_encounter.enemy_id not in ENEMIES:
+        raise SnapshotError(f"Unknown enemy id in snapshot: {state.active_encounter.enemy_id}")
+
+
+class _Writer:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.strings: Dict[str, int] = {}
+        self.string_order: List[str] = []
+
+    def uint(self, value: int) -> None:
+        if value < 0:
+            raise SnapshotError(f"Negative value where unsigned expected: {value}")
+        buffer = self.buffer
+        while value > 0x7F:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buffer.append(value)
+
+    def sint(self, value: int) -> None:
+        self.uint((value << 1) if value >= 0 else ((-value << 1) - 1))
+
+    def ref(self, text: str) -> None:
+        index = self.strings.get(text)
+        if index is None:
+            index = len(self.string_order)
+            self.strings[text] = index
+            self.string_order.append(text)
+        self.uint(index)
+
+    def optional_ref(self, text: Optional[str]) -> None:
+        if text is None:
+            self.uint(0)
+            return
+        self.uint(1)
+        self.ref(text)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+        self.strings: List[str] = []
+
+    def uint(self) -> int:
+        data = self.data
+        result = 0
+        shift = 0
+        while True:
+            try:
+                byte = data[self.pos]
+            except IndexError:
+                raise SnapshotError("Snapshot is truncated.") from None
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def sint(self) -> int:
+        value = self.uint()
+        return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+    def ref(self) -> str:
+        index = self.uint()
+        try:
+            return self.strings[index]
+        except IndexError:
+            raise SnapshotError(f"String reference out of range: {index}") from None
+
+    def optional_ref(self) -> Optional[str]:
+        return self.ref() if self.uint() else None
+
+    def raw(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.data):
+            raise SnapshotError("Snapshot is truncated.")
+        chunk = self.data[self.pos : end]
+        self.pos = end
+        return chunk
+
+
+def _encode_body(state: GameState) -> bytes:
+    writer = _Writer()
+    player = state.player
+
+    writer.ref(player.name)
+    for value in (
+        player.base_max_hp,
+        player.base_attack,
+        player.base_defense,
+        player.hp,
+        player.xp,
+        player.level,
+        player.skill_points,
+        player.gold,
+    ):
+        writer.sint(int(value))
+
+    writer.uint(len(player.inventory))
+    for item_id, qty in player.inventory.items():
+        writer.ref(item_id)
+        writer.uint(int(qty))
+    writer.uint(len(player.equipment))
+    for slot, item_id in player.equipment.items():
+        writer.ref(slot)
+        writer.optional_ref(item_id or None)
+    skills = sorted(player.skills)
+    writer.uint(len(skills))
+    for skill in skills:
+        writer.ref(skill)
+    writer.uint(len(player.cooldowns))
+    for skill, turns in player.cooldowns.items():
+        writer.ref(skill)
+        writer.sint(int(turns))
+    writer.uint(len(player.titles))
+    for title in player.titles:
+        writer.ref(title)
+    writer.uint(len(player.temporary_bonuses))
+    for stat, amount in player.temporary_bonuses.items():
+        writer.ref(stat)
+        writer.sint(int(amount))
+
+    writer.ref(state.current_location_id)
+    writer.ref(state.quest_stage)
+    writer.uint(state.flags.mask & KNOWN_MASK)
+    extra_flags = sorted(flag for flag in state.flags if flag not in KNOWN_FLAG_SET)
+    writer.uint(len(extra_flags))
+    for flag in extra_flags:
+        writer.ref(flag)
+    discovered = sorted(state.discovered_locations)
+    writer.uint(len(discovered))
+    for location_id in discovered:
+        writer.ref(location_id)
+    writer.uint(len(state.kill_counts_by_location))
+    for location_id, kills in state.kill_counts_by_location.items():
+        writer.ref(location_id)
+        writer.uint(len(kills))
+        for enemy_name, count in kills.items():
+            writer.ref(enemy_name)
+            writer.uint(max(0, int(count)))
+    writer.uint(int(state.turn_count))
+
+    encounter = state.active_encounter
+    state_bits = (
+        (_STATE_GAME_OVER if state.game_over else 0)
+        | (_STATE_VICTORY if state.victory else 0)
+        | (_STATE_HAS_ENCOUNTER if encounter else 0)
+    )
+    writer.uint(state_bits)
+    if encounter:
+        writer.ref(encounter.enemy_id)
+        writer.sint(int(encounter.current_hp))
+        writer.uint(int(encounter.intent_index))
+        writer.ref(encounter.special_phase)
+        writer.uint(int(encounter.turn_count))
+        writer.uint(
+            (_ENCOUNTER_DEFENDING if encounter.player_defending else 0)
+            | (_ENCOUNTER_BARRIER if encounter.witch_barrier_active else 0)
+        )
+
+    table = _Writer()
+    table.uint(len(writer.string_order))
+    for text in writer.string_order:
+        encoded = text.encode("utf-8")
+        table.uint(len(encoded))
+        table.buffer += encoded
+    return bytes(table.buffer + writer.buffer)
+
+
+def _decode_body(data: bytes, version: int = VERSION) -> GameState:
+    reader = _Reader(data)
+    for _ in range(reader.uint()):
+        size = reader.uint()
+        reader.strings.append(reader.raw(size).decode("utf-8"))
+
+    player = Player(name=reader.ref())
+    player.base_max_hp = reader.sint()
+    player.base_attack = reader.sint()
+    player.base_defense = reader.sint()
+    player.hp = reader.sint()
+    player.xp = reader.sint()
+    player.level = reader.sint()
+    player.skill_points = reader.sint()
+    player.gold = reader.sint()
+
+    player.inventory = {reader.ref(): reader.uint() for _ in range(reader.uint())}
+    player.equipment = {reader.ref(): reader.optional_ref() for _ in range(reader.uint())}
+    player.skills = {reader.ref() for _ in range(reader.uint())}
+    player.cooldowns = {reader.ref(): reader.sint() for _ in range(reader.uint())}
+    player.titles = [reader.ref() for _ in range(reader.uint())]
+    player.temporary_bonuses = {reader.ref(): reader.sint() for _ in range(reader.uint())}
+
+    # Skip seeding here; the saved RNG state replaces it below.
+    state = GameState(player=player, rng=GameRandom.__new__(GameRandom))
+    state.current_location_id = reader.ref()
+    state.quest_stage = reader.ref()
+    if version >= 2:
+        known = reader.uint()
+        if known & ~KNOWN_MASK:
+            raise SnapshotError(f"Unknown flag bits in snapshot: {known:#x}")
+        flags = set(names_of(known))
+    else:
+        flags = set()
+    flags.update(reader.ref() for _ in range(reader.uint()))
+    state.flags = flags
+    state.discovered_locations = {reader.ref() for _ in range(reader.uint())}
+    kill_counts: Dict[str, Dict[str, int]] = {}
+    for _ in range(reader.uint()):
+        location_id = reader.ref()
+        kill_counts[location_id] = {reader.ref(): reader.uint() for _ in range(reader.uint())}
+    state.kill_counts_by_location = kill_counts
+    state.turn_count = reader.uint()
+
+    state_bits = reader.uint()
+    state.game_over = bool(state_bits & _STATE_GAME_OVER)
+    state.victory = bool(state_bits & _STATE_VICTORY)
+    if state_bits & _STATE_HAS_ENCOUNTER:
+        encounter = Encounter(enemy_id=reader.ref(), current_hp=reader.sint())
+        encounter.intent_index = reader.uint()
+        encounter.special_phase = reader.ref()
+        encounter.turn_count = reader.uint()
+        encounter_bits = reader.uint()
+        encounter.player_defending = bool(encounter_bits & _ENCOUNTER_DEFENDING)
+        encounter.witch_barrier_active = bool(encounter_bits & _ENCOUNTER_BARRIER)
+        state.active_encounter = encounter
+
+    if reader.pos != len(data):
+        raise SnapshotError("Trailing bytes after snapshot body.")
+    _check_ids(state)
+    return state
+
+
+class _SeedStream:
+    """One seed's twister, advanced one twist (624 words) at a time as snapshots need it.
+
+    `twists` maps the hash of the key words after each twist to the twist
+    count, so a state on this stream turns back into words drawn with a lookup.
+    """
+
+    __slots__ = ("rng", "twists", "count")
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.twists: Dict[int, int] = {hash(self.rng.getstate()[1][:_TWISTER_WORDS]): 0}
+        self.count = 0
+
+    def words_drawn(self, rng_words: tuple) -> Optional[int]:
+        """Words drawn since seeding to reach `rng_words`; None past SEED_REPLAY_LIMIT."""
+        key = hash(rng_words[:_TWISTER_WORDS])
+        while key not in self.twists:
+            if (self.count + 1) * _TWISTER_WORDS > SEED_REPLAY_LIMIT:
+                return None
+            # The first word twists; the rest of the block leaves the index at the end.
+            self.rng.getrandbits(32)
+            self.rng.getrandbits(32 * (_TWISTER_WORDS - 1))
+            self.count += 1
+            self.twists[hash(self.rng.getstate()[1][:_TWISTER_WORDS])] = self.count
+        twists, index = self.twists[key], rng_words[_TWISTER_WORDS]
+        if not twists:
+            # Freshly seeded: the index starts past the end of the block.
+            return 0 if index == _TWISTER_WORDS else None
+        return (twists - 1) * _TWISTER_WORDS + index
+
+
+_SEED_STREAMS: "OrderedDict[int, _SeedStream]" = OrderedDict()
+
+
+def _words_drawn(rng: random.Random, rng_words: tuple) -> Optional[int]:
+    seed = getattr(rng, "seed_value", None)
+    if seed is None:
+        return None
+    stream = _SEED_STREAMS.get(seed)
+    if stream is None:
+        stream = _SEED_STREAMS[seed] = _SeedStream(seed)
+        if len(_SEED_STREAMS) > SEED_STREAM_CACHE:
+            _SEED_STREAMS.popitem(last=False)
+    else:
+        _SEED_STREAMS.move_to_end(seed)
+    return stream.words_drawn(rng_words)
+
+
+def _encode_rng(rng: random.Random) -> bytes:
+    writer = _Writer()
+    rng_version, rng_words, gauss_next = rng.getstate()
+    drawn = None if gauss_next is not None else _words_drawn(rng, rng_words)
+    if drawn is not None:
+        writer.uint(_RNG_SEEDED)
+        writer.sint(rng.seed_value)  # type: ignore[attr-defined]
+        writer.uint(drawn)
+        return bytes(writer.buffer)
+    writer.uint(_RNG_RAW)
+    writer.uint(rng_version)
+    writer.buffer += _RNG_WORDS.pack(*rng_words)
+    if gauss_next is None:
+        writer.uint(0)
+    else:
+        writer.uint(1)
+        writer.buffer += _DOUBLE.pack(gauss_next)
+    return bytes(writer.buffer)
+
+
+def _decode_rng(reader: _Reader, rng: random.Random, version: int = VERSION) -> None:
+    form = reader.uint() if version >= 3 else _RNG_RAW
+    if form == _RNG_SEEDED:
+        seed, drawn = reader.sint(), reader.uint()
+        if drawn > SEED_REPLAY_LIMIT:
+            raise SnapshotError(f"Seeded RNG draws too many words: {drawn}")
+        rng.seed(seed)
+        while drawn:
+            chunk = min(drawn, _TWISTER_WORDS)
+            rng.getrandbits(32 * chunk)
+            drawn -= chunk
+        return
+    if form != _RNG_RAW:
+        raise SnapshotError(f"Unknown RNG form in snapshot: {form}")
+    rng_version = reader.uint()
+    rng_words = _RNG_WORDS.unpack(reader.raw(_RNG_WORDS.size))
+    gauss_next = _DOUBLE.unpack(reader.raw(_DOUBLE.size))[0] if reader.uint() else None
+    try:
+        rng.setstate((rng_version, rng_words, gauss_next))
+    except (TypeError, ValueError) as error:
+        raise SnapshotError(f"Invalid RNG state: {error}") from None
+
+
+def encode_state(state: GameState, compression: int = DEFAULT_COMPRESSION) -> bytes:
+    """Encode a state; compression is a zlib level (0 stores the body raw)."""
+    if not 0 <= compression <= 9:
+        raise ValueError("compression must be a zlib level between 0 and 9.")
+    body = _encode_body(state)
+    if compression:
+        body = zlib.compress(body, compression)
+    header = _Writer()
+    header.buffer += MAGIC
+    header.buffer += bytes((VERSION, compression))
+    header.uint(len(body))
+    return bytes(header.buffer) + body + _encode_rng(state.rng)
+
+
+def decode_state(data: bytes) -> GameState:
+    """Decode bytes produced by encode_state."""
+    if len(data) < 5 or data[:3] != MAGIC:
+        raise SnapshotError("Not a byte_world_ai snapshot.")
+    version, compression = data[3], data[4]
+    if version not in SUPPORTED_VERSIONS:
+        raise SnapshotError(f"Unsupported snapshot version: {version}")
+    reader = _Reader(data)
+    reader.pos = 5
+    body = reader.raw(reader.uint())
+    if compression:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as error:
+            raise SnapshotError(f"Corrupt snapshot body: {error}") from None
+    try:
+        state = _decode_body(body, version)
+    except UnicodeDecodeError as error:
+        raise SnapshotError(f"Corrupt snapshot string table: {error}") from None
+    _decode_rng(reader, state.rng, version)
+    if reader.pos != len(data):
+        raise SnapshotError("Trailing bytes after snapshot.")
+    return state
+
+
+def encode_state_text(state: GameState, compression: int = DEFAULT_COMPRESSION) -> str:
+    """Encode a state as ASCII (base64) for text-only storage such as localStorage."""
+    return base64.b64encode(encode_state(state, compression)).decode("ascii")
+
+
+def decode_state_text(text: str) -> GameState:
+    """Decode text produced by encode_state_text."""
+    try:
+        data = base64.b64decode(text.encode("ascii"), validate=True)
+    except (ValueError, UnicodeEncodeError):
+        raise SnapshotError("Snapshot text is not valid base64.") from None
+    return decode_state(data)
+
+
+def save_state(state: GameState, path: str | os.PathLike[str], compression: int = DEFAULT_COMPRESSION) -> None:
+    """Atomically write a snapshot file."""
+    temp_path = f"{os.fspath(path)}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(encode_state(state, compression))
+    os.replace(temp_path, path)
+
+
+def load_state(path: str | os.PathLike[str]) -> GameState:
+    """Read a snapshot file."""
+    with open(path, "rb") as handle:
+        return decode_state(handle.read())
+
+
+def state_to_dict(state: GameState) -> dict:
+    """Legacy JSON save layout (schema_version 1) used by the first web build."""
+    encounter_payload = None
+    if state.active_encounter:
+        encounter = state.active_encounter
+        encounter_payload = {
+            "enemy_id": encounter.enemy_id,
+            "current_hp": int(encounter.current_hp),
+            "intent_index": int(encounter.intent_index),
+            "player_defending": bool(encounter.player_defending),
+            "special_phase": str(encounter.special_phase),
+            "witch_barrier_active": bool(encounter.witch_barrier_active),
+            "turn_count": int(encounter.turn_count),
+        }
+
+    player = state.player
+    return {
+        "schema_version": 1,
+        "player": {
+            "name": player.name,
+            "base_max_hp": int(player.base_max_hp),
+            "base_attack": int(player.base_attack),
+            "base_defense": int(player.base_defense),
+            "hp": int(player.hp),
+            "xp": int(player.xp),
+            "level": int(player.level),
+            "skill_points": int(player.skill_points),
+            "gold": int(player.gold),
+            "inventory": {str(k): int(v) for k, v in player.inventory.items()},
+            "equipment": {str(k): (str(v) if v else None) for k, v in player.equipment.items()},
+            "skills": sorted(str(skill) for skill in player.skills),
+            "cooldowns": {str(k): int(v) for k, v in player.cooldowns.items()},
+            "titles": [str(title) for title in player.titles],
+            "temporary_bonuses": {str(k): int(v) for k, v in player.temporary_bonuses.items()},
+        },
+        "current_location_id": str(state.current_location_id),
+        "quest_stage": str(state.quest_stage),
+        "flags": sorted(str(flag) for flag in state.flags),
+        "active_encounter": encounter_payload,
+        "discovered_locations": sorted(str(loc) for loc in state.discovered_locations),
+        "kill_counts_by_location": {
+            str(location_id): {
+                str(enemy_name): max(0, int(count))
+                for enemy_name, count in dict(enemy_counts).items()
+            }
+            for location_id, enemy_counts in dict(state.kill_counts_by_location).items()
+            if isinstance(enemy_counts, dict)
+        },
+        "turn_count": int(state.turn_count),
+        "game_over": bool(state.game_over),
+        "victory": bool(state.victory),
+        "rng_state": base64.b64encode(pickle.dumps(state.rng.getstate())).decode("ascii"),
+    }
+
+
+def _decode_legacy_rng_state(encoded: str) -> tuple | None:
+    try:
+        data = base64.b64decode(encoded.encode("ascii"))
+        return pickle.loads(data)
+    except Exception:
+        return None
+
+
+def state_from_dict(raw: dict) -> Optional[GameState]:
+    """Rebuild a state from the legacy JSON layout; None if it is unusable or names unknown content ids."""
+    try:
+        player_raw = raw.get("player")
+        if not isinstance(player_raw, dict):
+            return None
+
+        restored = create_initial_state()
+        player = restored.player
+
+        player.name = str(player_raw.get("name", player.name))
+        player.base_max_hp = int(player_raw.get("base_max_hp", player.base_max_hp))
+        player.base_attack = int(player_raw.get("base_attack", player.base_attack))
+        player.base_defense = int(player_raw.get("base_defense", player.base_defense))
+        player.hp = int(player_raw.get("hp", player.hp))
+        player.xp = int(player_raw.get("xp", player.xp))
+        player.level = int(player_raw.get("level", player.level))
+        player.skill_points = int(player_raw.get("skill_points", player.skill_points))
+        player.gold = int(player_raw.get("gold", player.gold))
+        player.inventory = {
+            str(k): max(0, int(v))
+            for k, v in dict(player_raw.get("inventory", {})).items()
+        }
+        equipment_map = dict(player.equipment)
+        for k, v in dict(player_raw.get("equipment", {})).items():
+            equipment_map[str(k)] = str(v) if v else None
+        player.equipment = equipment_map
+        player.skills = {str(skill) for skill in player_raw.get("skills", [])}
+        player.cooldowns = {
+            str(k): max(0, int(v))
+            for k, v in dict(player_raw.get("cooldowns", {})).items()
+        }
+        player.titles = [str(title) for title in player_raw.get("titles", [])]
+        player.temporary_bonuses = {
+            str(k): int(v)
+            for k, v in dict(player_raw.get("temporary_bonuses", {})).items()
+        }
+        clamp_player_hp(player)
+
+        restored.current_location_id = str(raw.get("current_location_id", restored.current_location_id))
+        if restored.current_location_id not in LOCATIONS:
+            restored.current_location_id = "old_shack"
+
+        restored.quest_stage = str(raw.get("quest_stage", restored.quest_stage))
+        if restored.quest_stage not in QUEST_STAGES:
+            restored.quest_stage = "awakening"
+        restored.flags = {str(flag) for flag in raw.get("flags", [])}
+
+        encounter_raw = raw.get("active_encounter")
+        if isinstance(encounter_raw, dict):
+            restored.active_encounter = Encounter(
+                enemy_id=str(encounter_raw.get("enemy_id", "")),
+                current_hp=max(0, int(encounter_raw.get("current_hp", 0))),
+                intent_index=max(0, int(encounter_raw.get("intent_index", 0))),
+                player_defending=bool(encounter_raw.get("player_defending", False)),
+                special_phase=str(encounter_raw.get("special_phase", "combat")),
+                witch_barrier_active=bool(encounter_raw.get("witch_barrier_active", False)),
+                turn_count=max(0, int(encounter_raw.get("turn_count", 0))),
+            )
+            if restored.active_encounter.enemy_id not in ENEMIES:
+                restored.active_encounter = None
+        else:
+            restored.active_encounter = None
+
+        discovered = {str(loc) for loc in raw.get("discovered_locations", [])}
+        if restored.current_location_id:
+            discovered.add(restored.current_location_id)
+        restored.discovered_locations = discovered
+
+        restored.kill_counts_by_location = {}
+        kill_counts_raw = raw.get("kill_counts_by_location", {})
+        if isinstance(kill_counts_raw, dict):
+            for location_id, enemy_counts in kill_counts_raw.items():
+                if not isinstance(enemy_counts, dict):
+                    continue
+                parsed_enemy_counts = {}
+                for enemy_name, count in enemy_counts.items():
+                    try:
+                        safe_count = max(0, int(count))
+                    except Exception:
+                        continue
+                    parsed_enemy_counts[str(enemy_name)] = safe_count
+                if parsed_enemy_counts:
+                    restored.kill_counts_by_location[str(location_id)] = parsed_enemy_counts
+
+        restored.turn_count = max(0, int(raw.get("turn_count", restored.turn_count)))
+        restored.game_over = bool(raw.get("game_over", False))
+        restored.victory = bool(raw.get("victory", False))
+
+        rng_state_raw = raw.get("rng_state")
+        if isinstance(rng_state_raw, str) and rng_state_raw:
+            decoded = _decode_legacy_rng_state(rng_state_raw)
+            if decoded is not None:
+                restored.rng.setstate(decoded)
+
+        max_hp = max(1, get_effective_stats(restored.player)["max_hp"])
+        restored.player.hp = max(0, min(int(restored.player.hp), max_hp))
+        _check_ids(restored)
+        return restored
+    except Exception:
+        return None
@@ -0,0 +1,149 @@
+"""Content image: derived content tables saved between runs.
+
+Building the name indexes (`game.names`) and the colorizer's overlap hazards
+(`game.ui`) from the content tables dominates engine import time. Those
+modules go through `derive(name, inputs, build)`, which returns the table
+stored in the content image when it was built from equal `inputs`, and
+otherwise builds it and saves it for the next start.
+
+The image file name carries a hash of the content sources and of the modules
+that derive from them, so editing any of them starts a fresh image; comparing
+`inputs` also covers tables edited at runtime before the first build. The
+image is read from, in order:
+
+- `game/content_image-<hash>.pickle` packed as package data (the web bundle);
+- the `game` package's bytecode cache directory (`__pycache__`, or under
+  `sys.pycache_prefix`), written on the first run like `.pyc` files.
+
+Nothing is written when bytecode writing is off (`-B`), and
+`BYTE_WORLD_AI_NO_STARTUP_CACHE=1` disables the image entirely.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+from pathlib import Path
+import pickle
+import pkgutil
+import sys
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+
+IMAGE_VERSION = 1
+SOURCE_MODULES = (
+    "content",
+    "content.enemies",
+    "content.items",
+    "content.quests",
+    "content.world",
+    "game.names",
+    "game.startup_cache",
+    "game.ui",
+)
+
+_image: Optional[Dict[str, Tuple[Any, Any]]] = None
+_key: Optional[str] = None
+_seen: Set[str] = set()
+
+
+def enabled() -> bool:
+    return os.getenv("BYTE_WORLD_AI_NO_STARTUP_CACHE") != "1"
+
+
+def _source_bytes(module_name: str) -> bytes:
+    # Through the loader, so modules imported from .pyc files in a zip hash their source too.
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.loader is None:
+        return b""
+    try:
+        source = spec.loader.get_source(module_name)
+    except (AttributeError, ImportError, OSError):
+        return b""
+    return (source or "").encode("utf-8")
+
+
+def image_key() -> str:
+    """Hash of the image format and every source the image is derived from."""
+    global _key
+    if _key is None:
+        digest = hashlib.sha256(f"content-image-v{IMAGE_VERSION}".encode("utf-8"))
+        for module_name in SOURCE_MODULES:
+            digest.update(module_name.encode("utf-8") + b"\0")
+            digest.update(_source_bytes(module_name))
+        _key = digest.hexdigest()[:16]
+    return _key
+
+
+def image_name() -> str:
+    return f"content_image-{image_key()}.pickle"
+
+
+def cache_path() -> Path:
+    """Where the CLI keeps the image: beside the `game` package's bytecode."""
+    package_pyc = importlib.util.cache_from_source(str(Path(__file__).with_name("__init__.py")))
+    return Path(package_pyc).parent / image_name()
+
+
+def _read_image() -> Optional[bytes]:
+    try:
+        data = pkgutil.get_data("game", image_name())
+    except OSError:
+        data = None
+    if data:
+        return data
+    try:
+        return cache_path().read_bytes()
+    except OSError:
+        return None
+
+
+def _load() -> Dict[str, Tuple[Any, Any]]:
+    global _image
+    if _image is None:
+        _image = {}
+        data = _read_image() if enabled() else None
+        if data:
+            try:
+                loaded = pickle.loads(data)
+            except Exception:
+                # A truncated or foreign image is rebuilt, like a bad .pyc.
+                loaded = None
+            if isinstance(loaded, dict):
+                _image = loaded
+    return _image
+
+
+def _save() -> None:
+    if not enabled() or sys.dont_write_bytecode:
+        return
+    path = cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        partial.write_bytes(dump())
+        os.replace(partial, path)
+    except OSError:
+        pass
+
+
+def derive(name: str, inputs: Any, build: Callable[[], Any]) -> Any:
+    """`build()`, or the value the image holds for `name` when it was built from equal `inputs`."""
+    image = _load()
+    first = name not in _seen
+    _seen.add(name)
+    entry = image.get(name)
+    if entry is not None and entry[0] == inputs:
+        return entry[1]
+    value = build()
+    image[name] = (inputs, value)
+    # Only startup builds are persisted; rebuilds after content reloads stay in memory.
+    if first:
+        _save()
+    return value
+
+
+def dump() -> bytes:
+    """The current image as bytes, for packing into the web bundle."""
+    return pickle.dumps(_load(), protocol=pickle.HIGHEST_PROTOCOL)
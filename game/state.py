@@ -3,10 +3,25 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+import os
 import random
 from typing import Dict, Optional
 
-from content.items import ITEMS
+import content
+from content import compiled
+from game import names
+from game.flags import FlagSet
+
+
+# Assigning any of these drops the cached effective stats (see `Player.effective_stats`).
+# Only these fields carry a write hook (`_StatField`); every other attribute is plain.
+STAT_FIELDS = frozenset({"base_max_hp", "base_attack", "base_defense", "equipment", "temporary_bonuses"})
+_stats_generation = 0
+
+
+def _bump_stats_generation() -> None:
+    global _stats_generation
+    _stats_generation += 1
 
 
 def _default_inventory() -> Dict[str, int]:
@@ -47,6 +62,90 @@ class Player:
     cooldowns: Dict[str, int] = field(default_factory=dict)
     titles: list[str] = field(default_factory=list)
     temporary_bonuses: Dict[str, int] = field(default_factory=dict)
+    _stats: Optional[Dict[str, int]] = field(default=None, init=False, repr=False, compare=False)
+    _stats_generation: int = field(default=-1, init=False, repr=False, compare=False)
+    _inventory_key: Optional[tuple[str, ...]] = field(default=None, init=False, repr=False, compare=False)
+
+    def effective_stats(self) -> Dict[str, int]:
+        """Cached effective stats; the returned dict is shared, so treat it as read-only."""
+        stats = self._stats
+        if stats is None or self._stats_generation != _stats_generation:
+            stats = self._stats = _compute_effective_stats(self)
+            self._stats_generation = _stats_generation
+        return stats
+
+    def inventory_key(self) -> tuple[str, ...]:
+        """Sorted ids of owned items, cached until `inventory_changed` is called."""
+        key = self._inventory_key
+        if key is None:
+            key = self._inventory_key = tuple(sorted(self.inventory))
+        return key
+
+    def inventory_changed(self) -> None:
+        """Drop the cached inventory key after changing which item ids are owned."""
+        self._inventory_key = None
+
+    def invalidate_stats(self) -> None:
+        """Drop cached effective stats after mutating a stat field in place."""
+        self._stats = None
+
+    def equip(self, slot: str, item_id: Optional[str]) -> None:
+        """Put an item (or None) in an equipment slot."""
+        self.equipment[slot] = item_id
+        self.invalidate_stats()
+
+    def add_temporary_bonus(self, stat: str, amount: int) -> None:
+        """Adjust a temporary stat bonus; bonuses that reach zero are removed."""
+        total = self.temporary_bonuses.get(stat, 0) + amount
+        if total == 0:
+            self.temporary_bonuses.pop(stat, None)
+        else:
+            self.temporary_bonuses[stat] = total
+        self.invalidate_stats()
+
+
+class _StatField:
+    """Write hook for one stat field: assigning it drops the player's cached stats.
+
+    There is no `__get__`, so reads skip the descriptor and find the value in
+    the instance dict, as fast as a plain attribute.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __set__(self, player: Player, value) -> None:
+        player.__dict__[self.name] = value
+        player.__dict__["_stats"] = None
+
+
+# Installed after @dataclass has read the defaults, so __init__ assigns through them.
+for _name in STAT_FIELDS:
+    setattr(Player, _name, _StatField(_name))
+del _name
+
+
+class GameRandom(random.Random):
+    """`random.Random` that remembers its integer seed, so snapshots can store (seed, words drawn).
+
+    Seeding with None picks a random 64-bit seed instead of reading 2.5 KB of
+    OS entropy. `seed_value` is None once `setstate` (or a non-integer seed)
+    puts the generator somewhere no integer seed reaches.
+    """
+
+    seed_value: Optional[int] = None
+
+    def seed(self, a=None, version: int = 2) -> None:
+        if a is None:
+            a = int.from_bytes(os.urandom(8), "little")
+        self.seed_value = a if isinstance(a, int) else None
+        super().seed(a, version)
+
+    def setstate(self, state) -> None:
+        super().setstate(state)
+        self.seed_value = None
 
 
 @dataclass
@@ -69,25 +168,44 @@ class GameState:
     player: Player
     current_location_id: str = "old_shack"
     quest_stage: str = "awakening"
-    flags: set[str] = field(default_factory=set)
+    flags: FlagSet = field(default_factory=FlagSet)
     active_encounter: Optional[Encounter] = None
     discovered_locations: set[str] = field(default_factory=set)
     kill_counts_by_location: Dict[str, Dict[str, int]] = field(default_factory=dict)
     turn_count: int = 0
     game_over: bool = False
     victory: bool = False
-    rng: random.Random = field(default_factory=random.Random)
+    rng: random.Random = field(default_factory=GameRandom)
+
+
+class _FlagsField:
+    """Write hook for `GameState.flags`: plain sets (snapshot loads, tools) become FlagSets.
+
+    Like `_StatField` it has no `__get__`, and no other attribute is hooked.
+    """
+
+    __slots__ = ()
+
+    def __set__(self, state: GameState, value) -> None:
+        state.__dict__["flags"] = value if isinstance(value, FlagSet) else FlagSet(value)
+
+
+GameState.flags = _FlagsField()  # type: ignore[assignment]
 
 
-def create_initial_state() -> GameState:
-    """Create a fresh game state for a new run."""
-    state = GameState(player=Player())
+def create_initial_state(seed: Optional[int] = None) -> GameState:
+    """Create a fresh game state for a new run; a seed makes the run reproducible."""
+    state = GameState(player=Player(), rng=GameRandom(seed))
     state.discovered_locations.add(state.current_location_id)
     return state
 
 
 def get_effective_stats(player: Player) -> Dict[str, int]:
     """Return effective combat stats after gear and temporary bonuses."""
+    return player.effective_stats()
+
+
+def _compute_effective_stats(player: Player) -> Dict[str, int]:
     attack = player.base_attack
     defense = player.base_defense
     max_hp = player.base_max_hp
@@ -95,10 +213,10 @@ def get_effective_stats(player: Player) -> Dict[str, int]:
     for item_id in player.equipment.values():
         if not item_id:
             continue
-        item = ITEMS.get(item_id, {})
-        attack += int(item.get("attack_bonus", 0))
-        defense += int(item.get("defense_bonus", 0))
-        max_hp += int(item.get("max_hp_bonus", 0))
+        item = compiled.item(item_id)
+        attack += item.attack_bonus
+        defense += item.defense_bonus
+        max_hp += item.max_hp_bonus
 
     attack += int(player.temporary_bonuses.get("attack", 0))
     defense += int(player.temporary_bonuses.get("defense", 0))
@@ -111,6 +229,9 @@ def get_effective_stats(player: Player) -> Dict[str, int]:
     }
 
 
+content.add_reload_hook(_bump_stats_generation)
+
+
 def clamp_player_hp(player: Player) -> None:
     """Clamp hp to [0, effective_max_hp]."""
     max_hp = get_effective_stats(player)["max_hp"]
@@ -129,6 +250,8 @@ def add_item(player: Player, item_id: str, qty: int = 1) -> None:
     """Add item(s) to inventory."""
     if qty <= 0:
         return
+    if item_id not in player.inventory:
+        player.inventory_changed()
     player.inventory[item_id] = player.inventory.get(item_id, 0) + qty
 
 
@@ -142,6 +265,7 @@ def remove_item(player: Player, item_id: str, qty: int = 1) -> bool:
     remaining = owned - qty
     if remaining <= 0:
         player.inventory.pop(item_id, None)
+        player.inventory_changed()
     else:
         player.inventory[item_id] = remaining
     return True
@@ -182,28 +306,6 @@ def award_xp(player: Player, amount: int) -> list[str]:
     return messages
 
 
-def normalize_name(text: str) -> str:
-    """Normalize text for command matching."""
-    return "".join(ch for ch in text.lower().strip() if ch.isalnum() or ch.isspace())
-
-
 def find_item_id_by_query(player: Player, query: str) -> Optional[str]:
     """Find an owned item by id or fuzzy name."""
-    query_norm = normalize_name(query)
-    if not query_norm:
-        return None
-
-    if query in player.inventory:
-        return query
-
-    if query_norm in player.inventory:
-        return query_norm
-
-    for item_id in player.inventory:
-        item_name = ITEMS.get(item_id, {}).get("name", item_id)
-        if normalize_name(item_name) == query_norm:
-            return item_id
-        if query_norm in normalize_name(item_name):
-            return item_id
-
-    return None
+    return names.ITEM_INDEX.resolve(query, player.inventory)
@@ -2,21 +2,31 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 import os
+import pkgutil
 import re
 import sys
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Callable, Dict, Iterable, List, Union
 
+import content
 from content.enemies import ENEMIES
 from content.items import ITEMS
 from content.world import NPCS
+from game import startup_cache
 
 
 DIVIDER = "-" * 64
+COLORIZE_CACHE_SIZE = 4096
+HEALTH_BAR_CACHE_SIZE = 2048
+MAP_CACHE_SIZE = 256
+QUEST_CACHE_SIZE = 64
 ACTION_SEPARATOR = "=" * 64
 _TITLE_TEXT_PATH = Path(__file__).resolve().parents[1] / "content" / "ascii" / "title_text.txt"
 _TITLE_TEXT_FALLBACK = "byte_world_ai :: CLI adventure"
+# A run of output text: plain, or [text, style].
+Span = Union[str, List[str]]
 
 ANSI_RESET = "\033[0m"
 ANSI_BLUE = "\033[38;5;39m"
@@ -28,6 +38,36 @@ ANSI_ITEM_GREEN = "\033[38;5;120m"
 ANSI_PURPLE = "\033[95m"
 ANSI_PINK = "\033[38;5;213m"
 
+# Semantic styles the UI paints text with, and the terminal color of each.
+STYLE_ANSI: Dict[str, str] = {
+    "end-boss": ANSI_RED,
+    "boss": ANSI_ORANGE,
+    "creature": ANSI_YELLOW,
+    "npc": ANSI_BLUE,
+    "skill": ANSI_PINK,
+    "item-rare": ANSI_PURPLE,
+    "item": ANSI_ITEM_GREEN,
+    "health": ANSI_HEALTH_GREEN,
+    "health-missing": ANSI_RED,
+}
+
+# How styled text is drawn: not at all, as ANSI escapes, or as span markup that
+# `spans()` turns into (text, style) runs and `to_ansi()` into escapes.
+OUTPUT_PLAIN = "plain"
+OUTPUT_ANSI = "ansi"
+OUTPUT_SPANS = "spans"
+OUTPUT_MODES = (OUTPUT_PLAIN, OUTPUT_ANSI, OUTPUT_SPANS)
+# Span markup mirrors an escape's shape (a control character first, a word
+# character last) so the name patterns treat painted text exactly as in ANSI mode.
+_SPAN_OPEN = {style: f"\x0e{index}m" for index, style in enumerate(STYLE_ANSI, start=1)}
+_SPAN_CLOSE = "\x0e0m"
+_SPAN_STYLE_BY_INDEX = {str(index): style for index, style in enumerate(STYLE_ANSI, start=1)}
+_SPAN_MARK = re.compile(r"\x0e(\d+)m")
+_ANSI_BY_SPAN_MARK = {
+    **{mark: STYLE_ANSI[style] for style, mark in _SPAN_OPEN.items()},
+    _SPAN_CLOSE: ANSI_RESET,
+}
+
 _END_BOSS_IDS = {"king_makor", "onyx_witch"}
 _IMPORTANT_OR_RARE_ITEM_IDS = {
     "crusty_key",
@@ -66,12 +106,64 @@ def _enable_windows_ansi() -> None:
 _enable_windows_ansi()
 _FORCE_COLOR = os.getenv("BYTE_WORLD_AI_FORCE_COLOR") == "1" or os.getenv("BYTE_WORLD_FORCE_COLOR") == "1"
 _COLOR_ENABLED = os.getenv("NO_COLOR") is None and (sys.stdout.isatty() or _FORCE_COLOR)
+_OUTPUT_MODE = OUTPUT_ANSI if _COLOR_ENABLED else OUTPUT_PLAIN
+_STYLE_OPEN: Dict[str, str] = STYLE_ANSI
+_STYLE_CLOSE = ANSI_RESET
+
+
+def output_mode() -> str:
+    return _OUTPUT_MODE
+
+
+def set_output_mode(mode: str) -> None:
+    """Draw styled text as `plain`, `ansi`, or `spans` markup from now on."""
+    global _OUTPUT_MODE, _STYLE_OPEN, _STYLE_CLOSE
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"unknown output mode: {mode!r}")
+    _OUTPUT_MODE = mode
+    if mode == OUTPUT_SPANS:
+        _STYLE_OPEN, _STYLE_CLOSE = _SPAN_OPEN, _SPAN_CLOSE
+    else:
+        _STYLE_OPEN, _STYLE_CLOSE = STYLE_ANSI, ANSI_RESET
+    # Frames and health bars are keyed by mode; cached lines are not.
+    _colorize_interactables.cache_clear()
 
 
-def _paint(text: str, color_code: str) -> str:
-    if not _COLOR_ENABLED:
+def paint(text: str, style: str) -> str:
+    """`text` drawn in a style from `STYLE_ANSI`, in the current output mode."""
+    if _OUTPUT_MODE == OUTPUT_PLAIN:
         return text
-    return f"{color_code}{text}{ANSI_RESET}"
+    return f"{_STYLE_OPEN[style]}{text}{_STYLE_CLOSE}"
+
+
+def spans(text: str) -> List[Span]:
+    """Span markup as runs: plain strings, or [text, style] for styled text.
+
+    Decoded like a terminal would: a style mark replaces the current style and
+    the close mark ends it.
+    """
+    parts = _SPAN_MARK.split(text)
+    runs: List[Span] = [parts[0]] if parts[0] else []
+    style = ""
+    for index in range(1, len(parts), 2):
+        mark = parts[index]
+        style = "" if mark == "0" else _SPAN_STYLE_BY_INDEX.get(mark, style)
+        chunk = parts[index + 1]
+        if chunk:
+            runs.append([chunk, style] if style else chunk)
+    return runs
+
+
+def to_ansi(text: str) -> str:
+    """Span markup rewritten as ANSI escapes, for a terminal sink."""
+    if "\x0e" not in text:
+        return text
+    return _SPAN_MARK.sub(lambda match: _ANSI_BY_SPAN_MARK.get(match.group(0), ""), text)
+
+
+def print_terminal(text: str) -> None:
+    """Print engine output, turning span markup into escapes."""
+    print(to_ansi(text))
 
 
 def _compile_name_pattern(names: Iterable[str]) -> re.Pattern[str] | None:
@@ -82,35 +174,20 @@ def _compile_name_pattern(names: Iterable[str]) -> re.Pattern[str] | None:
     return re.compile(r"(?<!\w)(" + "|".join(escaped) + r")(?!\w)", re.IGNORECASE)
 
 
-def _item_is_purple(item_id: str, item: dict) -> bool:
+def item_style(item_id: str) -> str:
+    """`item-rare` for quest, key, boon, and other important items, otherwise `item`."""
     if item_id in _IMPORTANT_OR_RARE_ITEM_IDS:
-        return True
-    return item.get("type") in {"quest", "key", "boon"}
+        return "item-rare"
+    return "item-rare" if ITEMS.get(item_id, {}).get("type") in {"quest", "key", "boon"} else "item"
 
 
-_NPC_NAMES = {npc.get("name", "") for npc in NPCS.values()}
-_CREATURE_NAMES = {
-    enemy.get("name", "")
-    for enemy_id, enemy in ENEMIES.items()
-    if enemy.get("category") == "normal"
-}
-_BOSS_NAMES = {
-    enemy.get("name", "")
-    for enemy_id, enemy in ENEMIES.items()
-    if enemy.get("category") == "boss" and enemy_id not in _END_BOSS_IDS
-}
-_END_BOSS_NAMES = {ENEMIES[enemy_id].get("name", "") for enemy_id in _END_BOSS_IDS if enemy_id in ENEMIES}
-_PURPLE_ITEM_NAMES = {
-    item.get("name", "")
-    for item_id, item in ITEMS.items()
-    if _item_is_purple(item_id, item)
-}
-_GREEN_ITEM_NAMES = {
-    item.get("name", "")
-    for item_id, item in ITEMS.items()
-    if not _item_is_purple(item_id, item)
-}
-_SKILL_TERMS = {
+def enemy_style(enemy_id: str) -> str:
+    if enemy_id in _END_BOSS_IDS:
+        return "end-boss"
+    return "boss" if ENEMIES.get(enemy_id, {}).get("category") == "boss" else "creature"
+
+
+SKILL_TERMS = {
     "attack",
     "defense",
     "health",
@@ -119,32 +196,168 @@ _SKILL_TERMS = {
     "second wind",
 }
 
-_COLOR_PATTERNS: list[tuple[re.Pattern[str] | None, str]] = [
-    (_compile_name_pattern(_END_BOSS_NAMES), ANSI_RED),
-    (_compile_name_pattern(_BOSS_NAMES), ANSI_ORANGE),
-    (_compile_name_pattern(_CREATURE_NAMES), ANSI_YELLOW),
-    (_compile_name_pattern(_NPC_NAMES), ANSI_BLUE),
-    (_compile_name_pattern(_SKILL_TERMS), ANSI_PINK),
-    (_compile_name_pattern(_PURPLE_ITEM_NAMES), ANSI_PURPLE),
-    (_compile_name_pattern(_GREEN_ITEM_NAMES), ANSI_ITEM_GREEN),
-]
 
+def _name_categories() -> List[tuple[set[str], str]]:
+    """Styled name sets from current content, highest precedence first."""
+    names: Dict[str, set[str]] = {style: set() for style in ("end-boss", "boss", "creature", "item-rare", "item")}
+    for enemy_id, enemy in ENEMIES.items():
+        names[enemy_style(enemy_id)].add(enemy.get("name", ""))
+    for item_id, item in ITEMS.items():
+        names[item_style(item_id)].add(item.get("name", ""))
+    npc_names = {npc.get("name", "") for npc in NPCS.values()}
+    return [
+        (names["end-boss"], "end-boss"),
+        (names["boss"], "boss"),
+        (names["creature"], "creature"),
+        (npc_names, "npc"),
+        (SKILL_TERMS, "skill"),
+        (names["item-rare"], "item-rare"),
+        (names["item"], "item"),
+    ]
 
-def _colorize_interactables(text: str) -> str:
-    if not text:
-        return text
+
+def _word_char(text: str, index: int) -> bool:
+    return 0 <= index < len(text) and (text[index].isalnum() or text[index] == "_")
+
+
+def _overlap_hazards(colors: Dict[str, str]) -> List[str]:
+    """Text that can make differently styled names overlap or abut.
+
+    Only lines containing one of these can come out differently from painting
+    one category at a time, so those lines take the per-category path.
+    """
+    names = list(colors)
+    hazards = {name for name in names if not (_word_char(name, 0) and _word_char(name, len(name) - 1))}
+    for outer in names:
+        for inner in names:
+            if outer == inner or colors[outer] == colors[inner]:
+                continue
+            index = outer.find(inner)
+            while index != -1:
+                if not _word_char(outer, index - 1) and not _word_char(outer, index + len(inner)):
+                    hazards.add(outer)
+                index = outer.find(inner, index + 1)
+            for size in range(1, min(len(outer), len(inner))):
+                if (
+                    outer[-size:] == inner[:size]
+                    and not _word_char(outer, len(outer) - size - 1)
+                    and not _word_char(inner, size)
+                ):
+                    hazards.add(outer[:-size] + inner)
+    return sorted(hazards)
+
+
+def _compile_name_trie(names: Iterable[str]) -> re.Pattern[str] | None:
+    """Case-insensitive name matcher built as a prefix trie; picks the longest name like `_compile_name_pattern`."""
+    root: Dict[str, dict] = {}
+    for name in names:
+        if not name:
+            continue
+        node = root
+        for char in name.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}
+    if not root:
+        return None
+
+    def branch(node: Dict[str, dict]) -> str:
+        options = [re.escape(char) + branch(child) for char, child in sorted(node.items()) if char]
+        if "" in node:
+            options.append(r"(?!\w)")
+        return options[0] if len(options) == 1 else "(?:" + "|".join(options) + ")"
+
+    return re.compile(r"(?<!\w)" + branch(root), re.IGNORECASE)
+
+
+def _compile_hazard_pattern(hazards: List[str]) -> re.Pattern[str] | None:
+    if not hazards:
+        return None
+    return re.compile("|".join(re.escape(text) for text in hazards), re.IGNORECASE)
+
+
+_STYLE_PATTERNS: list[tuple[re.Pattern[str] | None, str]] = []
+# Lower-cased name -> style, earliest category winning, for the single-pass colorizer.
+_NAME_STYLES: Dict[str, str] = {}
+_NAME_PATTERN: re.Pattern[str] | None = None
+_HAZARD_PATTERN: re.Pattern[str] | None = None
+
+
+def _build_color_tables() -> None:
+    global _STYLE_PATTERNS, _NAME_STYLES, _NAME_PATTERN, _HAZARD_PATTERN
+    categories = _name_categories()
+    styles: Dict[str, str] = {}
+    for names, style in categories:
+        for name in names:
+            if name:
+                styles.setdefault(name.lower(), style)
+    _STYLE_PATTERNS = [(_compile_name_pattern(names), style) for names, style in categories]
+    _NAME_STYLES = styles
+    _NAME_PATTERN = _compile_name_trie(styles)
+    _HAZARD_PATTERN = _compile_hazard_pattern(
+        startup_cache.derive("ui.overlap_hazards", styles, lambda: _overlap_hazards(styles))
+    )
+
+
+_build_color_tables()
+
+
+def _colorize_by_category(text: str) -> str:
+    """Paint one category at a time, highest precedence first."""
     rendered = text
-    for pattern, color in _COLOR_PATTERNS:
+    for pattern, style in _STYLE_PATTERNS:
         if pattern is None:
             continue
-        rendered = pattern.sub(lambda match: _paint(match.group(0), color), rendered)
+        rendered = pattern.sub(lambda match: paint(match.group(0), style), rendered)
     return rendered
 
 
+def _colorize_single_pass(text: str) -> str:
+    """Paint every name in one scan; same bytes as `_colorize_by_category`."""
+    if not text or _OUTPUT_MODE == OUTPUT_PLAIN or _NAME_PATTERN is None:
+        return text
+    if _HAZARD_PATTERN is not None and _HAZARD_PATTERN.search(text):
+        return _colorize_by_category(text)
+    pieces: List[str] = []
+    last = 0
+    for match in _NAME_PATTERN.finditer(text):
+        name = match.group(0)
+        style = _NAME_STYLES.get(name.lower())
+        if style is None:
+            return _colorize_by_category(text)
+        pieces.append(text[last : match.start()])
+        pieces.append(f"{_STYLE_OPEN[style]}{name}{_STYLE_CLOSE}")
+        last = match.end()
+    if not pieces:
+        return text
+    pieces.append(text[last:])
+    return "".join(pieces)
+
+
+_colorize_interactables = lru_cache(maxsize=COLORIZE_CACHE_SIZE)(_colorize_single_pass)
+
+
+# Fully rendered invariant screens, keyed by (name, output mode).
+_STATIC_FRAMES: Dict[tuple[str, str], str] = {}
+
+
+def _static_frame(name: str, render: Callable[[], str]) -> str:
+    key = (name, _OUTPUT_MODE)
+    frame = _STATIC_FRAMES.get(key)
+    if frame is None:
+        frame = render()
+        _STATIC_FRAMES[key] = frame
+    return frame
+
+
 def health_bar(current_hp: int, max_hp: int, width: int = 24) -> str:
     """Render an ASCII HP bar with green current HP and red missing HP."""
-    max_hp = max(1, int(max_hp))
-    current_hp = max(0, min(int(current_hp), max_hp))
+    return _health_bar(int(current_hp), int(max_hp), width, _OUTPUT_MODE)
+
+
+@lru_cache(maxsize=HEALTH_BAR_CACHE_SIZE)
+def _health_bar(current_hp: int, max_hp: int, width: int, mode: str) -> str:
+    max_hp = max(1, max_hp)
+    current_hp = max(0, min(current_hp, max_hp))
 
     filled = int(round((current_hp / max_hp) * width))
     if current_hp > 0:
@@ -155,9 +368,9 @@ def health_bar(current_hp: int, max_hp: int, width: int = 24) -> str:
     fill_text = "#" * filled
     empty_text = "-" * empty
 
-    if _COLOR_ENABLED:
-        fill_text = _paint(fill_text, ANSI_HEALTH_GREEN) if fill_text else ""
-        empty_text = _paint(empty_text, ANSI_RED) if empty_text else ""
+    if mode != OUTPUT_PLAIN:
+        fill_text = paint(fill_text, "health") if fill_text else ""
+        empty_text = paint(empty_text, "health-missing") if empty_text else ""
 
     return f"[{fill_text}{empty_text}] {current_hp}/{max_hp}"
 
@@ -183,14 +396,18 @@ def _clip_label(text: str, max_len: int = 40) -> str:
     return text[: max_len - 3] + "..."
 
 
+_MAP_DIRECTIONS = ("north", "south", "east", "west", "up", "down")
+
+
 def format_world_map(current_location_name: str, direction_labels: dict[str, str], route_lines: list[str]) -> str:
     """Render a simple local directional map."""
-    north = _clip_label(direction_labels.get("north", "---"))
-    south = _clip_label(direction_labels.get("south", "---"))
-    east = _clip_label(direction_labels.get("east", "---"))
-    west = _clip_label(direction_labels.get("west", "---"))
-    up = _clip_label(direction_labels.get("up", "---"))
-    down = _clip_label(direction_labels.get("down", "---"))
+    labels = tuple(direction_labels.get(direction, "---") for direction in _MAP_DIRECTIONS)
+    return _world_map(current_location_name, labels, tuple(route_lines))
+
+
+@lru_cache(maxsize=MAP_CACHE_SIZE)
+def _world_map(current_location_name: str, labels: tuple[str, ...], route_lines: tuple[str, ...]) -> str:
+    north, south, east, west, up, down = (_clip_label(label) for label in labels)
 
     lines = [
         DIVIDER,
@@ -219,27 +436,42 @@ def format_world_map(current_location_name: str, direction_labels: dict[str, str
 
 
 def banner() -> str:
+    return _static_frame("banner", _render_banner)
+
+
+def _load_title_text() -> str:
     title_text = _TITLE_TEXT_FALLBACK
-    for candidate in (_TITLE_TEXT_PATH, Path("content/ascii/title_text.txt")):
+    for candidate in (_TITLE_TEXT_PATH, Path("content/ascii/title_text.txt"), None):
         try:
-            loaded = candidate.read_text(encoding="utf-8")
+            if candidate is None:
+                # Imported from the web bundle zip: only the package loader can read it.
+                loaded = (pkgutil.get_data("content", "ascii/title_text.txt") or b"").decode("utf-8")
+            else:
+                loaded = candidate.read_text(encoding="utf-8")
         except OSError:
             continue
         normalized = loaded.replace("\r\n", "\n").replace("\r", "\n").strip("\n")
         if normalized.strip():
             title_text = normalized
             break
+    return title_text
+
 
+def _render_banner() -> str:
     return "\n".join(
         [
             DIVIDER,
-            title_text,
+            _load_title_text(),
             DIVIDER,
         ]
     )
 
 
 def help_text() -> str:
+    return _static_frame("help", _render_help_text)
+
+
+def _render_help_text() -> str:
     rows = [
         ("system", "help", "Show this command menu."),
         ("system", "quit", "Exit the game."),
@@ -263,6 +495,7 @@ def help_text() -> str:
         ("combat", "defend", "Reduce next incoming hit."),
         ("combat", "skill <name>", "Use a learned skill (focus strike, guard stance, second wind)."),
         ("combat", "run", "Attempt to flee an encounter."),
+        ("combat", "advise", "Estimate the win chance of each combat option."),
         ("combat*", "joke", "Goblin army only: attempt peaceful escape."),
         ("combat*", "bribe", "Goblin army only: pay gold to avoid combat."),
     ]
@@ -298,13 +531,13 @@ def help_text() -> str:
         "  - "
         + ", ".join(
             [
-                f"{_paint('NPC', ANSI_BLUE)} = talkable",
-                f"{_paint('Creature', ANSI_YELLOW)} = fightable",
-                f"{_paint('Boss', ANSI_ORANGE)} = boss fight",
-                f"{_paint('End-boss', ANSI_RED)} = Makor / Witch",
-                f"{_paint('Item', ANSI_ITEM_GREEN)} = item/equipment",
-                f"{_paint('Rare/Quest', ANSI_PURPLE)} = rare or important reward",
-                f"{_paint('Skill', ANSI_PINK)} = train/combat skill terms",
+                f"{paint('NPC', 'npc')} = talkable",
+                f"{paint('Creature', 'creature')} = fightable",
+                f"{paint('Boss', 'boss')} = boss fight",
+                f"{paint('End-boss', 'end-boss')} = Makor / Witch",
+                f"{paint('Item', 'item')} = item/equipment",
+                f"{paint('Rare/Quest', 'item-rare')} = rare or important reward",
+                f"{paint('Skill', 'skill')} = train/combat skill terms",
             ]
         )
     )
@@ -408,6 +641,7 @@ def format_encounter(enemy_name: str, enemy_hp: int, enemy_max_hp: int, intent:
     )
 
 
+@lru_cache(maxsize=QUEST_CACHE_SIZE)
 def format_quest(title: str, description: str, hint: str) -> str:
     return "\n".join(
         [
@@ -417,3 +651,35 @@ def format_quest(title: str, description: str, hint: str) -> str:
             f"Hint: {hint}",
         ]
     )
+
+
+def format_advice(rows: Iterable[tuple[str, float, float]], note: str = "") -> str:
+    """Advisor table from (command, win chance, expected turns) rows, best first."""
+    rows = list(rows)
+    width = max(len(command) for command, _, _ in rows)
+    lines = [DIVIDER, "Advisor (win chance taking this action, then the best follow-up play):"]
+    for command, win, turns in rows:
+        lines.append(f"  {command.ljust(width)}  win {win:6.1%}  ~{turns:.1f} turns")
+    if note:
+        lines.append(note)
+    return "\n".join(lines)
+
+
+def clear_render_cache() -> None:
+    """Drop pre-rendered frames and memoized fragments, and rebuild name colors from content."""
+    _STATIC_FRAMES.clear()
+    _health_bar.cache_clear()
+    _world_map.cache_clear()
+    format_quest.cache_clear()
+    _colorize_interactables.cache_clear()
+    _build_color_tables()
+
+
+def preload_static_frames() -> None:
+    """Read static assets and pre-render invariant screens for the current color mode."""
+    banner()
+    help_text()
+
+
+preload_static_frames()
+content.add_reload_hook(clear_render_cache)
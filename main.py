@@ -1,14 +1,67 @@
 """CLI entrypoint for byte_world_ai."""
 
+import argparse
+import os
+import random
+from typing import Optional
+
+from game import ui
 from game.engine import Engine
+from game.journal import CommandJournal, JournalError
+from game.snapshot import SnapshotError, load_state, save_state
 from game.state import create_initial_state
 
 
-def main() -> None:
+def main(argv: Optional[list[str]] = None) -> None:
     """Start the game loop."""
-    state = create_initial_state()
-    engine = Engine()
-    engine.run(state)
+    parser = argparse.ArgumentParser(description="byte_world_ai")
+    parser.add_argument("--save", default=None, help="Resume from and save to this snapshot file.")
+    parser.add_argument(
+        "--journal",
+        default=None,
+        help="Append every command to this journal (resumed if it exists) for crash-safe progress.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a new game's random number generator.")
+    args = parser.parse_args(argv)
+
+    # Styled text stays span markup inside the engine; escapes are added only at print time.
+    if ui.output_mode() == ui.OUTPUT_ANSI:
+        ui.set_output_mode(ui.OUTPUT_SPANS)
+    engine = Engine(output_fn=ui.print_terminal)
+    journal: Optional[CommandJournal] = None
+    seed = args.seed
+    state = None
+    if args.journal and os.path.exists(args.journal):
+        try:
+            journal, state = CommandJournal.resume(args.journal, engine=engine)
+        except (OSError, JournalError, SnapshotError) as error:
+            print(f"Could not resume journal {args.journal}: {error}")
+            return
+    elif args.save and os.path.exists(args.save):
+        try:
+            state = load_state(args.save)
+        except (OSError, SnapshotError) as error:
+            print(f"Could not load save file {args.save}: {error}")
+            return
+
+    if state is None:
+        if args.journal and seed is None:
+            seed = random.SystemRandom().randrange(1 << 63)
+        state = create_initial_state(seed=seed)
+    else:
+        # A loaded state is not reproducible from a seed; the journal checkpoints it instead.
+        seed = None
+    state.game_over = False
+    if args.journal and journal is None:
+        journal = CommandJournal.create(args.journal, state, seed=seed)
+
+    try:
+        engine.run(state, on_command=journal.record if journal else None)
+    finally:
+        if journal:
+            journal.close()
+        if args.save:
+            save_state(state, args.save)
 
 
 if __name__ == "__main__":
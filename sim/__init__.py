@@ -0,0 +1 @@
+"""Offline simulators for balancing byte_world_ai."""
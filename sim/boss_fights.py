@@ -0,0 +1,383 @@
+"""Vectorized Monte Carlo boss-fight simulator.
+
+Runs large batches of one boss fight at once with HP, cooldowns, and dice held
+in NumPy arrays. The rules mirror systems.combat: `_player_attack_damage`,
+`_enemy_attack_damage` (with intent defend multipliers), intent cycling,
+skill cooldowns, potion/bandage healing, the Onyx Witch barrier and curse,
+and the ring surge against King Makor. Every fight follows the same fixed
+`Policy`, and `play_reference_fight` plays that policy through the real combat
+system so the two can be compared. `Build` and `Policy` are shared with the
+exact solver in systems.combat_markov (`--exact` prints its odds alongside).
+
+The goblin army is simulated from the point where the player chooses `fight`.
+
+    python -m sim.boss_fights --boss dragon --fights 1000000
+
+NumPy is only needed for this module: `pip install numpy`.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import time
+from typing import Dict, List, Optional
+
+from content.compiled import ENEMY_RECORDS, ITEM_RECORDS, EnemyRecord
+from content.enemies import ENEMIES
+from game.state import GameState, create_initial_state, get_effective_stats
+from systems import combat
+from systems.combat_markov import (
+    FOCUS_COOLDOWN,
+    FOCUS_MULTIPLIER,
+    GUARD_COOLDOWN,
+    GUARD_HEAL,
+    RING_ATTACK,
+    RING_DEFENSE,
+    SECOND_WIND_COOLDOWN,
+    SECOND_WIND_HEAL,
+    WITCH_CURSE,
+    Build,
+    Policy,
+    solve,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+BOSS_IDS = ["giant_frog", "dragon", "ogre", "goblin_army", "king_makor", "onyx_witch"]
+
+_OUTCOME_LOSS = 0
+_OUTCOME_WIN = 1
+_OUTCOME_TIMEOUT = 2
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The boss-fight simulator needs NumPy (pip install numpy).")
+
+
+@dataclass
+class FightStats:
+    """Outcome distributions for one build against one boss."""
+
+    build: Build
+    boss_id: str
+    outcomes: "np.ndarray"
+    turns: "np.ndarray"
+    potions_used: "np.ndarray"
+    seconds: float = 0.0
+
+    @property
+    def fights(self) -> int:
+        return int(self.outcomes.size)
+
+    @property
+    def wins(self) -> int:
+        return int((self.outcomes == _OUTCOME_WIN).sum())
+
+    @property
+    def timeouts(self) -> int:
+        return int((self.outcomes == _OUTCOME_TIMEOUT).sum())
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.fights if self.fights else 0.0
+
+    def turns_to_kill(self, percentiles: tuple = (10, 50, 90)) -> Dict[float, float]:
+        """Percentiles of turns taken in won fights."""
+        won = self.turns[self.outcomes == _OUTCOME_WIN]
+        if not won.size:
+            return {pct: float("nan") for pct in percentiles}
+        return {pct: float(value) for pct, value in zip(percentiles, np.percentile(won, percentiles))}
+
+    def potion_histogram(self) -> Dict[int, float]:
+        """Share of all fights that consumed exactly N healing items."""
+        counts = np.bincount(self.potions_used)
+        return {used: count / self.fights for used, count in enumerate(counts) if count}
+
+    def summary(self) -> str:
+        turns = self.turns_to_kill()
+        potions = ", ".join(f"{used}:{share:.1%}" for used, share in self.potion_histogram().items())
+        return (
+            f"{self.build.name:<12} vs {self.boss_id:<12} win {self.win_rate:7.2%}"
+            f"  turns p10/p50/p90 {turns[10]:.0f}/{turns[50]:.0f}/{turns[90]:.0f}"
+            f"  timeouts {self.timeouts}"
+            f"  potions used {{{potions}}}"
+        )
+
+
+def _intent_table(enemy: EnemyRecord) -> tuple[List[int], List[float]]:
+    intents = enemy.intents or (enemy.strike,)
+    base = [intent.base_damage for intent in intents]
+    multipliers = [intent.defend_multiplier for intent in intents]
+    return base, multipliers
+
+
+def _simulate_chunk(build: Build, boss_id: str, policy: Policy, count: int, max_turns: int, rng) -> tuple:
+    enemy = ENEMY_RECORDS[boss_id]
+    base_damage, defend_multiplier = _intent_table(enemy)
+    strongest = max(base_damage)
+    ring = build.ring and boss_id == "king_makor"
+    attack = build.attack + (RING_ATTACK if ring else 0)
+    defense = build.defense + (RING_DEFENSE if ring else 0)
+    max_hp = build.max_hp
+    enemy_defense_cut = int(enemy.defense / 2)
+    player_defense_cut = int(defense / 3)
+    strike = attack - enemy_defense_cut
+    focus_strike = int(attack * FOCUS_MULTIPLIER) - enemy_defense_cut
+    heal_threshold = policy.heal_below * max_hp
+    witch = boss_id == "onyx_witch"
+    has_focus = policy.use_focus_strike and "focus strike" in build.skills
+    has_guard = policy.use_guard_stance and "guard stance" in build.skills
+    has_wind = policy.use_second_wind and "second wind" in build.skills
+    potion_heal = ITEM_RECORDS["minor_potion"].heal_amount
+    bandage_heal = ITEM_RECORDS["sturdy_bandage"].heal_amount
+
+    outcomes = np.full(count, _OUTCOME_TIMEOUT, dtype=np.int8)
+    turns_out = np.full(count, max_turns, dtype=np.int16)
+    used_out = np.zeros(count, dtype=np.int16)
+
+    # Live fights only; finished ones are compacted away each turn.
+    index = np.arange(count)
+    hp = np.full(count, build.start_hp, dtype=np.int32)
+    enemy_hp = np.full(count, enemy.hp, dtype=np.int32)
+    potions = np.full(count, build.potions, dtype=np.int16)
+    bandages = np.full(count, build.bandages, dtype=np.int16)
+    used = np.zeros(count, dtype=np.int16)
+    focus_cd = np.zeros(count, dtype=np.int8)
+    guard_cd = np.zeros(count, dtype=np.int8)
+    wind_cd = np.zeros(count, dtype=np.int8)
+    barrier = np.full(count, witch, dtype=bool)
+
+    for turn in range(max_turns):
+        if not index.size:
+            break
+        intent = turn % len(base_damage)
+        low = hp <= heal_threshold
+
+        read = barrier & build.riddle
+        free = ~read
+        wind = free & low & (wind_cd == 0) if has_wind else np.zeros_like(free)
+        free &= ~wind
+        potion = free & low & (potions > 0)
+        free &= ~potion
+        bandage = free & low & (bandages > 0)
+        free &= ~bandage
+        if has_guard and base_damage[intent] == strongest:
+            guard = free & (guard_cd == 0)
+        else:
+            guard = np.zeros_like(free)
+        free &= ~guard
+        focus = free & (focus_cd == 0) & ~barrier if has_focus else np.zeros_like(free)
+        fight = free & ~focus
+
+        barrier &= ~read
+        hp = np.where(wind, np.minimum(max_hp, hp + SECOND_WIND_HEAL), hp)
+        wind_cd[wind] = SECOND_WIND_COOLDOWN
+        hp = np.where(potion, np.minimum(max_hp, hp + potion_heal), hp)
+        potions -= potion
+        hp = np.where(bandage, np.minimum(max_hp, hp + bandage_heal), hp)
+        bandages -= bandage
+        used += potion | bandage
+        hp = np.where(guard, np.minimum(max_hp, hp + GUARD_HEAL), hp)
+        guard_cd[guard] = GUARD_COOLDOWN
+        focus_cd[focus] = FOCUS_COOLDOWN
+
+        roll = rng.integers(-2, 4, size=index.size, dtype=np.int32)
+        swing = np.where(focus, focus_strike, strike) + roll
+        attacking = (fight & ~barrier) | focus
+        enemy_hp -= np.where(attacking, np.maximum(1, swing), 0)
+
+        won = enemy_hp <= 0
+        damage = np.maximum(1, base_damage[intent] + rng.integers(-3, 4, size=index.size, dtype=np.int32) - player_defense_cut)
+        defended = np.maximum(1, (damage * defend_multiplier[intent]).astype(np.int32))
+        damage = np.where(guard, defended, damage)
+        hp = np.where(won, hp, np.clip(hp - damage, 0, max_hp))
+        if witch:
+            hp = np.where(barrier & ~won, np.maximum(0, hp - WITCH_CURSE), hp)
+        lost = (hp <= 0) & ~won
+        focus_cd = np.maximum(focus_cd - 1, 0).astype(np.int8)
+        guard_cd = np.maximum(guard_cd - 1, 0).astype(np.int8)
+        wind_cd = np.maximum(wind_cd - 1, 0).astype(np.int8)
+
+        done = won | lost
+        if done.any():
+            finished = index[done]
+            outcomes[finished] = np.where(won[done], _OUTCOME_WIN, _OUTCOME_LOSS)
+            turns_out[finished] = turn + 1
+            used_out[finished] = used[done]
+            keep = ~done
+            index, hp, enemy_hp, potions, bandages, used = (
+                index[keep], hp[keep], enemy_hp[keep], potions[keep], bandages[keep], used[keep]
+            )
+            focus_cd, guard_cd, wind_cd, barrier = focus_cd[keep], guard_cd[keep], wind_cd[keep], barrier[keep]
+
+    used_out[index] = used
+    return outcomes, turns_out, used_out
+
+
+def simulate(
+    build: Build,
+    boss_id: str,
+    fights: int = 100_000,
+    policy: Policy = Policy(),
+    seed: Optional[int] = None,
+    max_turns: int = 200,
+    chunk_size: int = 250_000,
+) -> FightStats:
+    """Run `fights` independent fights of `build` against `boss_id`."""
+    _require_numpy()
+    if boss_id not in ENEMIES:
+        raise KeyError(f"Unknown enemy: {boss_id}")
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    parts = [
+        _simulate_chunk(build, boss_id, policy, min(chunk_size, fights - offset), max_turns, rng)
+        for offset in range(0, fights, chunk_size)
+    ]
+    outcomes, turns, used = (np.concatenate(column) for column in zip(*parts))
+    return FightStats(build, boss_id, outcomes, turns, used, time.perf_counter() - started)
+
+
+def _reference_action(state: GameState, build: Build, policy: Policy, strongest: int) -> str:
+    player = state.player
+    encounter = state.active_encounter
+    assert encounter is not None
+    max_hp = get_effective_stats(player)["max_hp"]
+    low = player.hp <= policy.heal_below * max_hp
+    intent = combat._intent_payload(encounter, ENEMY_RECORDS[encounter.enemy_id])
+    cooldowns = player.cooldowns
+    if encounter.witch_barrier_active and build.riddle:
+        return "read goblin riddle"
+    if low and policy.use_second_wind and "second wind" in player.skills and not cooldowns.get("second wind"):
+        return "skill second wind"
+    if low and player.inventory.get("minor_potion"):
+        return "use minor potion"
+    if low and player.inventory.get("sturdy_bandage"):
+        return "use sturdy bandage"
+    if (
+        policy.use_guard_stance
+        and "guard stance" in player.skills
+        and intent.base_damage == strongest
+        and not cooldowns.get("guard stance")
+    ):
+        return "skill guard stance"
+    if (
+        policy.use_focus_strike
+        and "focus strike" in player.skills
+        and not cooldowns.get("focus strike")
+        and not encounter.witch_barrier_active
+    ):
+        return "skill focus strike"
+    return "fight"
+
+
+def play_reference_fight(
+    build: Build,
+    boss_id: str,
+    policy: Policy = Policy(),
+    seed: Optional[int] = None,
+    max_turns: int = 200,
+) -> tuple[int, int, int]:
+    """Play one fight through systems.combat; returns (outcome, turns, healing items used)."""
+    state = create_initial_state(seed=seed)
+    player = state.player
+    player.base_attack, player.base_defense, player.base_max_hp = build.attack, build.defense, build.max_hp
+    player.equipment = {slot: None for slot in player.equipment}
+    inventory = {"minor_potion": build.potions, "sturdy_bandage": build.bandages}
+    if build.ring:
+        inventory["mysterious_ring"] = 1
+    if build.riddle:
+        inventory["goblin_riddle"] = 1
+    player.inventory = inventory
+    player.skills = set(build.skills)
+    player.hp = build.start_hp
+    combat.start_encounter(state, boss_id)
+    if boss_id == "goblin_army":
+        combat.player_action(state, "fight")
+    strongest = max(_intent_table(ENEMY_RECORDS[boss_id])[0])
+    heals_before = build.potions + build.bandages
+
+    for turn in range(max_turns):
+        action = _reference_action(state, build, policy, strongest)
+        verb, _, rest = action.partition(" ")
+        messages = combat.player_action(state, verb, rest.split() if rest else [])
+        heals_used = heals_before - player.inventory.get("minor_potion", 0) - player.inventory.get("sturdy_bandage", 0)
+        if state.active_encounter is None:
+            won = any(message.startswith("You defeat ") for message in messages)
+            return (_OUTCOME_WIN if won else _OUTCOME_LOSS), turn + 1, heals_used
+    heals_used = heals_before - player.inventory.get("minor_potion", 0) - player.inventory.get("sturdy_bandage", 0)
+    return _OUTCOME_TIMEOUT, max_turns, heals_used
+
+
+DEFAULT_BUILDS = [
+    Build("early", attack=14, defense=9, max_hp=70, potions=2, bandages=1),
+    Build("mid", attack=22, defense=15, max_hp=110, potions=3, bandages=1, ring=True, riddle=True),
+    Build("late", attack=30, defense=21, max_hp=150, potions=4, bandages=2, ring=True, riddle=True),
+]
+
+
+def _parse_build(text: str) -> Build:
+    """NAME=ATK/DEF/HP/POTIONS[/BANDAGES][+ring][+riddle]"""
+    name, _, spec = text.partition("=")
+    extras = spec.split("+")
+    numbers = [int(part) for part in extras[0].split("/")]
+    if len(numbers) < 4:
+        raise argparse.ArgumentTypeError("Build format: NAME=ATK/DEF/HP/POTIONS[/BANDAGES][+ring][+riddle]")
+    return Build(
+        name=name or "custom",
+        attack=numbers[0],
+        defense=numbers[1],
+        max_hp=numbers[2],
+        potions=numbers[3],
+        bandages=numbers[4] if len(numbers) > 4 else 0,
+        ring="ring" in extras[1:],
+        riddle="riddle" in extras[1:],
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Monte Carlo boss-fight simulator")
+    parser.add_argument("--boss", action="append", choices=BOSS_IDS, help="Boss to simulate (repeatable; default all).")
+    parser.add_argument(
+        "--build",
+        action="append",
+        type=_parse_build,
+        help="NAME=ATK/DEF/HP/POTIONS[/BANDAGES][+ring][+riddle] (repeatable).",
+    )
+    parser.add_argument("--fights", type=int, default=100_000)
+    parser.add_argument("--heal-below", type=float, default=Policy.heal_below)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--check",
+        type=int,
+        default=0,
+        help="Also play N fights per pairing through systems.combat and print that win rate.",
+    )
+    parser.add_argument("--exact", action="store_true", help="Also print the exact Markov-chain odds.")
+    args = parser.parse_args(argv)
+
+    _require_numpy()
+    policy = Policy(heal_below=args.heal_below)
+    for boss_id in args.boss or BOSS_IDS:
+        for build in args.build or DEFAULT_BUILDS:
+            stats = simulate(build, boss_id, args.fights, policy, seed=args.seed)
+            rate = stats.fights / stats.seconds if stats.seconds else 0.0
+            print(f"{stats.summary()}  [{rate:,.0f} fights/s]")
+            if args.check:
+                wins = sum(
+                    play_reference_fight(build, boss_id, policy, seed=seed)[0] == _OUTCOME_WIN
+                    for seed in range(args.check)
+                )
+                print(f"{'':<12}    reference engine win {wins / args.check:7.2%} over {args.check} fights")
+            if args.exact:
+                odds = solve(boss_id, build, policy)
+                print(f"{'':<12}    exact win {odds.win:9.4%}  expected turns {odds.expected_turns:.2f}")
+
+
+if __name__ == "__main__":
+    main()
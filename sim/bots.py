@@ -0,0 +1,214 @@
+"""Policy bots that play full runs through the headless engine.
+
+A bot looks at the live GameState (and the previous TurnResult) and returns
+the next raw command, exactly as a player would type it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from content import compiled
+from content.compiled import ENEMY_RECORDS
+from content.world import LOCATIONS
+from game.engine import TurnResult
+from game.state import GameState, get_effective_stats
+from systems import combat_markov, routing
+
+
+GOBLIN_CHOICES = ("fight", "joke", "bribe")
+COMBAT_STYLES = ("script", "advisor")
+
+# Where each story boss is triggered, in story order.
+BOSS_LOCATIONS = {
+    "giant_frog": "swamp",
+    "dragon": "mountain_peak",
+    "ogre": "mountain_cave",
+    "goblin_army": "desolate_road",
+    "king_makor": "black_hall",
+    "onyx_witch": "witch_terrace",
+}
+
+# Hunting ground used while farming toward each boss.
+FARM_LOCATIONS = {
+    "giant_frog": "forest",
+    "dragon": "mountain_base",
+    "ogre": "abandoned_mine",
+    "goblin_army": "mountain_base",
+    "king_makor": "royal_yard",
+    "onyx_witch": "royal_yard",
+}
+
+DEFAULT_FARM_LEVELS = {
+    "giant_frog": 0,
+    "dragon": 0,
+    "ogre": 0,
+    "goblin_army": 0,
+    "king_makor": 0,
+    "onyx_witch": 0,
+}
+
+
+def path_to(state: GameState, target_id: str) -> Optional[List[str]]:
+    """Shortest list of directions to `target_id` through currently open exits."""
+    return routing.path(state.flags, state.current_location_id, target_id)
+
+
+class Bot:
+    """Base class: return one raw command per call."""
+
+    name = "bot"
+
+    def next_command(self, state: GameState, last: Optional[TurnResult]) -> str:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class StoryBotOptions:
+    """Play-style knobs for StoryBot; picklable so process pools can ship it."""
+
+    goblins: str = "fight"
+    ogre: bool = False
+    farm_levels: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_FARM_LEVELS))
+    heal_below: float = 0.35
+    rest_below: float = 0.6
+    training: str = "all"
+    combat: str = "script"
+
+    def label(self) -> str:
+        farm = "+".join(f"{boss}{level}" for boss, level in self.farm_levels.items() if level) or "nofarm"
+        return f"goblins={self.goblins} ogre={'yes' if self.ogre else 'no'} farm={farm} combat={self.combat}"
+
+    def build(self) -> "StoryBot":
+        return StoryBot(self)
+
+
+class StoryBot(Bot):
+    """Follow the main story, optionally farming levels before each boss."""
+
+    name = "story"
+
+    def __init__(self, options: StoryBotOptions = StoryBotOptions()):
+        if options.goblins not in GOBLIN_CHOICES:
+            raise ValueError(f"goblins must be one of {GOBLIN_CHOICES}")
+        if options.combat not in COMBAT_STYLES:
+            raise ValueError(f"combat must be one of {COMBAT_STYLES}")
+        self.options = options
+        self._inventory_seen: frozenset = frozenset()
+        self._bounce: Optional[str] = None
+
+    def _combat_command(self, state: GameState) -> str:
+        encounter = state.active_encounter
+        assert encounter is not None
+        if encounter.special_phase == "negotiation":
+            return self.options.goblins
+        if self.options.combat == "advisor":
+            policy = combat_markov.Policy(heal_below=self.options.heal_below)
+            return combat_markov.best_command(state, policy) or "fight"
+        player = state.player
+        enemy = ENEMY_RECORDS[encounter.enemy_id]
+        cooldowns = player.cooldowns
+        if encounter.witch_barrier_active:
+            return "read goblin riddle"
+        max_hp = get_effective_stats(player)["max_hp"]
+        if player.hp <= self.options.heal_below * max_hp:
+            if "second wind" in player.skills and not cooldowns.get("second wind"):
+                return "skill second wind"
+            if player.inventory.get("minor_potion"):
+                return "use minor potion"
+            if player.inventory.get("sturdy_bandage"):
+                return "use sturdy bandage"
+        intents = enemy.intents
+        if intents and "guard stance" in player.skills and not cooldowns.get("guard stance"):
+            intent = intents[encounter.intent_index % len(intents)]
+            if intent.base_damage == max(item.base_damage for item in intents):
+                if not enemy.is_normal:
+                    return "skill guard stance"
+        if "focus strike" in player.skills and not cooldowns.get("focus strike"):
+            return "skill focus strike"
+        return "fight"
+
+    def _next_boss(self, state: GameState) -> Optional[str]:
+        flags = state.flags
+        if "frog_defeated" not in flags:
+            return "giant_frog"
+        if "dragon_defeated" not in flags:
+            return "dragon"
+        if self.options.ogre and "ogre_defeated" not in flags:
+            return "ogre"
+        if "goblin_army_defeated" not in flags and "goblin_pass_granted" not in flags:
+            return "goblin_army"
+        if "makor_defeated" not in flags:
+            return "king_makor"
+        if "onyx_witch_defeated" not in flags:
+            return "onyx_witch"
+        return None
+
+    def _go(self, state: GameState, target_id: str) -> Optional[str]:
+        path = path_to(state, target_id)
+        if path:
+            return f"move {path[0]}"
+        return None
+
+    def _boss_location(self, state: GameState, boss_id: str) -> str:
+        if boss_id == "king_makor" and "black_hall_cutscene_seen" in state.flags:
+            return "dungeon"
+        return BOSS_LOCATIONS[boss_id]
+
+    def next_command(self, state: GameState, last: Optional[TurnResult]) -> str:
+        if state.active_encounter:
+            return self._combat_command(state)
+
+        player = state.player
+        if self._bounce:
+            direction, self._bounce = self._bounce, None
+            return f"move {direction}"
+
+        if "met_old_man" not in state.flags:
+            return self._go(state, "old_shack") or "talk wise old man"
+
+        inventory = frozenset(player.inventory)
+        if inventory != self._inventory_seen:
+            self._inventory_seen = inventory
+            if any(compiled.item(item_id).slot for item_id in inventory):
+                return "equip all"
+
+        if player.skill_points >= 3 and self.options.training == "all":
+            return "train all"
+        if player.skill_points >= 1 and self.options.training in {"attack", "defense", "health"}:
+            return f"train {self.options.training} {player.skill_points}"
+
+        max_hp = get_effective_stats(player)["max_hp"]
+        if player.hp < self.options.rest_below * max_hp:
+            if player.inventory.get("sturdy_bandage"):
+                return "use sturdy bandage"
+            if player.inventory.get("minor_potion"):
+                return "use minor potion"
+
+        if "hoard_treasure" in player.inventory and "hoard_delivered" not in state.flags:
+            return self._go(state, "old_shack") or "use hoard of treasure"
+
+        boss_id = self._next_boss(state)
+        if boss_id is None:
+            if "elle_freed" not in state.flags:
+                return self._go(state, "witch_terrace") or "use crusty key"
+            return self._go(state, "witch_terrace") or "use vial of tears"
+
+        if player.level < self.options.farm_levels.get(boss_id, 0):
+            farm_id = FARM_LOCATIONS[boss_id]
+            return self._go(state, farm_id) or "hunt"
+
+        target_id = self._boss_location(state, boss_id)
+        step = self._go(state, target_id)
+        if step:
+            return step
+        # Standing on the boss tile without a fight (e.g. after running): step out and back in.
+        exits = LOCATIONS[state.current_location_id].get("exits", {})
+        direction = next(iter(exits))
+        back = next(
+            (back_dir for back_dir, back_id in LOCATIONS[exits[direction]].get("exits", {}).items() if back_id == state.current_location_id),
+            None,
+        )
+        self._bounce = back
+        return f"move {direction}"
@@ -0,0 +1,191 @@
+"""Full-playthrough simulator: policy bots on a process pool.
+
+Each run starts from `create_initial_state(seed)` and feeds bot commands
+through the headless `Engine.step` until the quest reaches `homecoming` (or a
+turn cap). Seeds are fanned out over worker processes in batches and results
+are aggregated as they stream back.
+
+    python -m sim.playthrough --runs 2000 --goblins joke --ogre --farm dragon=6
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+import os
+import statistics
+import sys
+import time
+from typing import Iterator, List, Optional
+
+from game.engine import Engine
+from game.state import create_initial_state
+from sim.bots import COMBAT_STYLES, DEFAULT_FARM_LEVELS, GOBLIN_CHOICES, StoryBotOptions
+
+
+DEATH_MESSAGE = "You collapse and lose consciousness."
+DEFAULT_MAX_TURNS = 20_000
+
+
+@dataclass
+class RunResult:
+    """Summary of one playthrough."""
+
+    seed: int
+    finished: bool
+    turns: int
+    level: int
+    deaths: int
+    gold: int
+    kills: int
+    quest_stage: str
+
+
+def play(options: StoryBotOptions, seed: int, max_turns: int = DEFAULT_MAX_TURNS) -> RunResult:
+    """Play one seeded run to the homecoming stage (or the turn cap)."""
+    engine = Engine(output_fn=lambda _text: None)
+    state = create_initial_state(seed=seed)
+    bot = options.build()
+    last = None
+    deaths = 0
+    turns = 0
+    while turns < max_turns and state.quest_stage != "homecoming":
+        last = engine.step(state, bot.next_command(state, last))
+        turns += 1
+        if DEATH_MESSAGE in last.messages:
+            deaths += 1
+    kills = sum(sum(counts.values()) for counts in state.kill_counts_by_location.values())
+    return RunResult(
+        seed=seed,
+        finished=state.quest_stage == "homecoming",
+        turns=turns,
+        level=state.player.level,
+        deaths=deaths,
+        gold=state.player.gold,
+        kills=kills,
+        quest_stage=state.quest_stage,
+    )
+
+
+def _play_batch(options: StoryBotOptions, seeds: List[int], max_turns: int) -> List[RunResult]:
+    return [play(options, seed, max_turns) for seed in seeds]
+
+
+@dataclass
+class Aggregate:
+    """Running totals over streamed RunResults."""
+
+    results: List[RunResult] = field(default_factory=list)
+
+    def add(self, batch: List[RunResult]) -> None:
+        self.results.extend(batch)
+
+    def _column(self, name: str, finished_only: bool = True) -> List[float]:
+        return [getattr(result, name) for result in self.results if result.finished or not finished_only]
+
+    def summary(self) -> str:
+        runs = len(self.results)
+        finished = sum(result.finished for result in self.results)
+        lines = [f"runs {runs}  finished {finished} ({finished / runs:.1%})" if runs else "runs 0"]
+        for name in ("turns", "level", "deaths", "gold", "kills"):
+            values = self._column(name)
+            if not values:
+                continue
+            ordered = sorted(values)
+            p50 = ordered[len(ordered) // 2]
+            p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+            lines.append(
+                f"  {name:<7} mean {statistics.fmean(values):9.1f}  p50 {p50:7.0f}  p90 {p90:7.0f}  max {ordered[-1]:7.0f}"
+            )
+        stuck = [result for result in self.results if not result.finished]
+        if stuck:
+            stages: dict[str, int] = {}
+            for result in stuck:
+                stages[result.quest_stage] = stages.get(result.quest_stage, 0) + 1
+            lines.append("  unfinished by stage: " + ", ".join(f"{stage}={count}" for stage, count in stages.items()))
+        return "\n".join(lines)
+
+
+def run_many(
+    options: StoryBotOptions,
+    seeds: List[int],
+    workers: Optional[int] = None,
+    batch_size: int = 8,
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> Iterator[List[RunResult]]:
+    """Yield batches of results as workers finish them (completion order)."""
+    batches = [seeds[start : start + batch_size] for start in range(0, len(seeds), batch_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for batch in batches:
+            yield _play_batch(options, batch, max_turns)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending_batches = iter(batches)
+        # Keep a bounded number of batches in flight so results stream steadily.
+        in_flight = {
+            executor.submit(_play_batch, options, batch, max_turns)
+            for batch in (next(pending_batches, None) for _ in range(workers * 2))
+            if batch
+        }
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = next(pending_batches, None)
+                if batch:
+                    in_flight.add(executor.submit(_play_batch, options, batch, max_turns))
+                yield future.result()
+
+
+def _parse_farm(values: List[str]) -> dict[str, int]:
+    levels = dict(DEFAULT_FARM_LEVELS)
+    for value in values:
+        boss_id, _, level = value.partition("=")
+        if boss_id not in levels or not level.isdigit():
+            raise SystemExit(f"--farm expects BOSS=LEVEL with BOSS in {sorted(levels)}")
+        levels[boss_id] = int(level)
+    return levels
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate full byte_world_ai playthroughs with policy bots")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--batch-size", type=int, default=8, help="Seeds per task sent to a worker.")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--goblins", choices=GOBLIN_CHOICES, default="fight")
+    parser.add_argument("--ogre", action="store_true", help="Take the optional ogre cave.")
+    parser.add_argument("--farm", action="append", default=[], help="Hunt until LEVEL before BOSS (BOSS=LEVEL).")
+    parser.add_argument(
+        "--combat",
+        choices=COMBAT_STYLES,
+        default="script",
+        help="Scripted combat heuristics or the combat advisor (systems.combat_markov).",
+    )
+    parser.add_argument("--report-every", type=float, default=2.0, help="Seconds between streamed summaries.")
+    args = parser.parse_args(argv)
+
+    options = StoryBotOptions(
+        goblins=args.goblins, ogre=args.ogre, farm_levels=_parse_farm(args.farm), combat=args.combat
+    )
+    seeds = list(range(args.first_seed, args.first_seed + args.runs))
+    aggregate = Aggregate()
+    started = time.perf_counter()
+    last_report = started
+    print(f"bot: story ({options.label()})", flush=True)
+    for batch in run_many(options, seeds, args.workers, args.batch_size, args.max_turns):
+        aggregate.add(batch)
+        now = time.perf_counter()
+        if now - last_report >= args.report_every and len(aggregate.results) < len(seeds):
+            last_report = now
+            print(f"[{now - started:6.1f}s] {len(aggregate.results)}/{len(seeds)} runs", file=sys.stderr, flush=True)
+    elapsed = time.perf_counter() - started
+    print(aggregate.summary())
+    print(f"{len(seeds)} runs in {elapsed:.1f}s ({len(seeds) / elapsed:.1f} runs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1172 @@
+// Runs the Pyodide game engine off the page's main thread.
+//
+// static/app.js posts requests `{ id, type, args }` and gets back one
+// response per request, `{ id, ok, result }` or `{ id, ok: false, error }`,
+// in the order the requests were sent. Requests that arrive while Pyodide is
+// still booting wait for it. Boot progress is posted as `{ type: "status", text }`.
+//
+// Request types: ready (resolves once the engine has booted), initial,
+// process(command), reset, save, load(snapshot), replay(commands). All but
+// `ready` map to one `web_*` function of the bootstrap below and return its
+// string result.
+"use strict";
+
+const PYODIDE_JS_URL = "https://cdn.jsdelivr.net/pyodide/v0.29.3/full/pyodide.js";
+// Written by `python -m tools.build_web_bundle`; without it the loose SOURCE_FILES are fetched.
+const BUNDLE_MANIFEST_URL = "static/bundle/manifest.json";
+const BUNDLE_MOUNT_PATH = "/home/pyodide/byte_world_bundle.zip";
+// Worker URLs resolve against this script in static/; game files live at the site root.
+const SITE_ROOT = new URL("../", self.location.href);
+const SOURCE_FILES = [
+  "content/ascii/title_text.txt",
+  "content/__init__.py",
+  "content/compiled.py",
+  "content/enemies.py",
+  "content/items.py",
+  "content/quests.py",
+  "content/world.py",
+  "game/__init__.py",
+  "game/commands.py",
+  "game/engine.py",
+  "game/flags.py",
+  "game/names.py",
+  "game/snapshot.py",
+  "game/startup_cache.py",
+  "game/state.py",
+  "game/ui.py",
+  "systems/__init__.py",
+  "systems/combat.py",
+  "systems/combat_markov.py",
+  "systems/exploration.py",
+  "systems/loot.py",
+  "systems/quest.py",
+  "systems/routing.py",
+  "systems/sampling.py",
+];
+
+let pyodide = null;
+let api = null;
+let requestChain = Promise.resolve();
+
+function postStatus(text) {
+  self.postMessage({ type: "status", text });
+}
+
+function siteUrl(path) {
+  return new URL(path, SITE_ROOT).href;
+}
+
+async function fetchSource(path) {
+  const response = await fetch(siteUrl(path), { cache: "no-store" });
+  if (!response.ok) {
+    throw new Error(`Unable to load ${path}`);
+  }
+  return response.text();
+}
+
+function ensureParentDirectory(path) {
+  const slash = path.lastIndexOf("/");
+  if (slash <= 0) {
+    return;
+  }
+  const directory = path.slice(0, slash);
+  const analyzed = pyodide.FS.analyzePath(directory);
+  if (!analyzed.exists) {
+    pyodide.FS.mkdirTree(directory);
+  }
+}
+
+async function fetchBundle() {
+  let manifest;
+  try {
+    const response = await fetch(siteUrl(BUNDLE_MANIFEST_URL), { cache: "no-cache" });
+    if (!response.ok) {
+      return null;
+    }
+    manifest = await response.json();
+  } catch (error) {
+    return null;
+  }
+  if (!manifest || !manifest.bundle) {
+    return null;
+  }
+  // The file name carries the content hash, so any cached copy is current.
+  const response = await fetch(siteUrl(`static/bundle/${manifest.bundle}`), { cache: "force-cache" });
+  if (!response.ok) {
+    throw new Error(`Unable to load ${manifest.bundle}`);
+  }
+  return new Uint8Array(await response.arrayBuffer());
+}
+
+async function fetchGameSources() {
+  const bundle = await fetchBundle();
+  if (bundle) {
+    return { bundle, files: [] };
+  }
+  const sources = await Promise.all(SOURCE_FILES.map(fetchSource));
+  return { bundle: null, files: SOURCE_FILES.map((path, index) => [path, sources[index]]) };
+}
+
+function installGameSources(gameSources) {
+  if (gameSources.bundle) {
+    pyodide.FS.writeFile(BUNDLE_MOUNT_PATH, gameSources.bundle);
+    pyodide.runPython(`import sys\nsys.path.insert(0, ${JSON.stringify(BUNDLE_MOUNT_PATH)})`);
+    return;
+  }
+  for (const [sourcePath, source] of gameSources.files) {
+    ensureParentDirectory(sourcePath);
+    pyodide.FS.writeFile(sourcePath, source, { encoding: "utf8" });
+  }
+}
+
+const BOOTSTRAP_CODE = String.raw`
+import json
+import os
+
+os.environ["BYTE_WORLD_AI_NO_CLEAR"] = "1"
+
+from content.enemies import ENEMIES
+from content.items import EQUIPMENT_SLOT_BY_TYPE, ITEMS
+from content.world import LOCATIONS, NPCS
+from game.engine import Engine
+from game import ui
+from game.snapshot import SnapshotError, decode_state_text, encode_state_text, state_from_dict
+from game.state import create_initial_state, find_item_id_by_query, get_effective_stats
+from systems.exploration import find_npc_id_by_query
+
+# Styled text comes back as span markup; payloads carry it as ui.spans() runs.
+ui.set_output_mode(ui.OUTPUT_SPANS)
+
+_engine = Engine()
+_state = create_initial_state()
+_current_art_title = "Scene Art"
+_current_art_ascii = ""
+_current_art_image = ""
+_WISE_OLD_MAN_IMAGE = "content/art/wise_old_man.png"
+_GIANT_FROG_IMAGE = "content/art/giant_frog.png"
+
+_LOCATION_GLYPHS: dict[str, list[str]] = {
+    "old_shack": [
+        "           /\\",
+        "          /  \\",
+        "         /____\\",
+        "        | []  |",
+        "        |_____|",
+    ],
+    "forest": [
+        "      ^^   ^^   ^^",
+        "     ^^^  ^^^  ^^^",
+        "       ||   ||   ||",
+        "       ||   ||   ||",
+    ],
+    "swamp": [
+        "     ~~~  ~~~  ~~~",
+        "   ~~  ~~~~  ~~  ~~",
+        "      (  o_o  )",
+    ],
+    "underground_tunnel": [
+        "   ####################",
+        "  ##                  ##",
+        " ##      TUNNEL        ##",
+        "  ##                  ##",
+        "   ####################",
+    ],
+    "mountain_base": [
+        "        /\\",
+        "       /  \\   /\\",
+        "      / /\\ \\ /  \\",
+        "     /_/  \\_/ /\\ \\",
+    ],
+    "abandoned_mine": [
+        "     ||==========||",
+        "     ||   MINE   ||",
+        "     ||==========||",
+        "        /  __  /",
+    ],
+    "mountain_peak": [
+        "            /\\",
+        "           /  \\",
+        "          / /\\ \\",
+        "         /_/  \\_\\",
+    ],
+    "mountain_cave": [
+        "      _____________",
+        "   __/             \\__",
+        "  /   GOLD & BONES    \\",
+        " /_____________________\\",
+    ],
+    "desolate_road": [
+        "      ||         ||",
+        "      ||   ROAD  ||",
+        "    ==||=========||==",
+        "      ||         ||",
+    ],
+    "royal_yard": [
+        "        |>|",
+        "       /###\\",
+        "      |#####|",
+        "      |#####|",
+    ],
+    "black_hall": [
+        "     || || || || ||",
+        "     || || || || ||",
+        "     || || || || ||",
+        "       BLACK HALL",
+    ],
+    "dungeon": [
+        "     |||||||||||||||",
+        "     |  [======]   |",
+        "     |   DUNGEON   |",
+        "     |||||||||||||||",
+    ],
+    "witch_terrace": [
+        "        (  *  )",
+        "      *  (###)  *",
+        "        _/___\\_",
+        "       /  RUNE  \\",
+    ],
+}
+
+_NPC_GLYPHS: dict[str, list[str]] = {
+    "wise_old_man": [
+        "        .-''''-.",
+        "      /  .--.   \\",
+        "     |  (o  o)   |",
+        "     |    __     |",
+        "      \\  '--'   /",
+        "       '------'",
+    ],
+    "elle": [
+        "      .-''''-.",
+        "     /  .--.  \\",
+        "    |  (o  o)  |",
+        "    |   __     |",
+        "    |  /__\\    |",
+        "     \\        /",
+    ],
+}
+
+_BOSS_GLYPHS: list[str] = [
+    "      /\\  /\\  /\\",
+    "     /  \\/  \\/  \\",
+    "    |   B O S S  |",
+    "    |   HUNTER   |",
+    "     \\__________/",
+]
+
+_CREATURE_GLYPHS: list[str] = [
+    "        /\\_/\\",
+    "       ( o.o )",
+    "        > ^ <",
+    "      CREATURE",
+]
+
+_QUEST_STEPS = {
+    "awakening": "Talk to the Wise Old Man and learn the core path.",
+    "swamp_secret": "Defeat the swamp boss to recover the hidden key.",
+    "mountain_flame": "Reach Dragon Mountain and defeat the dragon.",
+    "castle_road": "Push toward Makor's Castle and survive the goblin road.",
+    "black_hall": "Defeat King Makor in the dungeon below Black Hall.",
+    "witch_bane": "Defeat the Onyx Witch and break her hold.",
+    "rescue_elle": "Free and cleanse Elle to complete the story.",
+    "homecoming": "Return to the Old Shack and close remaining threads.",
+}
+
+_NPC_STYLE_BY_NAME = {
+    npc.get("name", "").strip().lower(): "npc"
+    for npc in NPCS.values()
+    if npc.get("name")
+}
+_ENEMY_STYLE_BY_NAME = {
+    enemy.get("name", "").strip().lower(): ui.enemy_style(enemy_id)
+    for enemy_id, enemy in ENEMIES.items()
+    if enemy.get("name", "").strip()
+}
+_ITEM_STYLE_BY_NAME = {
+    item.get("name", "").strip().lower(): ui.item_style(item_id)
+    for item_id, item in ITEMS.items()
+    if item.get("name", "").strip()
+}
+
+def _color_item_name(item_id: str, item_name: str) -> str:
+    return ui.paint(item_name, ui.item_style(item_id))
+
+def _color_enemy_name(enemy_name: str) -> str:
+    value = str(enemy_name or "")
+    style = _ENEMY_STYLE_BY_NAME.get(value.strip().lower())
+    return ui.paint(value, style) if style else value
+
+def _item_stat_parts(item_id: str) -> list[str]:
+    item = ITEMS.get(item_id, {})
+    parts: list[str] = []
+    attack = int(item.get("attack_bonus", 0))
+    defense = int(item.get("defense_bonus", 0))
+    health = int(item.get("max_hp_bonus", 0))
+    heal = int(item.get("heal_amount", 0))
+    skill_points = int(item.get("skill_points_bonus", 0))
+
+    if attack:
+        parts.append(f"{ui.paint('ATK', 'skill')} {attack:+d}")
+    if defense:
+        parts.append(f"{ui.paint('DEF', 'skill')} {defense:+d}")
+    if health:
+        parts.append(f"{ui.paint('HEALTH', 'skill')} {health:+d}")
+    if heal:
+        parts.append(f"{ui.paint('HEAL', 'health')} +{heal}")
+    if skill_points:
+        parts.append(f"{ui.paint('SP', 'skill')} +{skill_points}")
+    return parts
+
+def _item_stat_suffix(item_id: str) -> str:
+    parts = _item_stat_parts(item_id)
+    if not parts:
+        return ""
+    return " [" + ", ".join(parts) + "]"
+
+def _item_drop_display(item_id: str) -> str:
+    item = ITEMS.get(item_id, {})
+    item_name = item.get("name", item_id)
+    return f"{_color_item_name(item_id, item_name)}{_item_stat_suffix(item_id)}"
+
+def _enemy_drop_summary(enemy_id: str) -> str:
+    enemy = ENEMIES.get(enemy_id, {})
+    entries: list[str] = [
+        "Healing bundle x5-10 "
+        + f"({_item_drop_display('sturdy_bandage')} / {_item_drop_display('minor_potion')})"
+    ]
+
+    seen: set[str] = set()
+    for item_id in enemy.get("guaranteed_drops", []):
+        if item_id in seen:
+            continue
+        seen.add(item_id)
+        entries.append(_item_drop_display(item_id))
+
+    for loot_row in enemy.get("loot_table", []):
+        item_id = str(loot_row[0]) if isinstance(loot_row, (list, tuple)) and loot_row else str(loot_row)
+        if not item_id or item_id in seen:
+            continue
+        seen.add(item_id)
+        entries.append(_item_drop_display(item_id))
+
+    return ", ".join(entries)
+
+def _normalize_token(text: str) -> str:
+    return "".join(ch for ch in str(text or "").strip().lower() if ch.isalnum() or ch.isspace())
+
+def _item_power_tuple(item_id: str | None) -> tuple[float, int, int, int, int]:
+    if not item_id:
+        return (-9999.0, -9999, -9999, -9999, -9999)
+    item = ITEMS.get(item_id, {})
+    attack = int(item.get("attack_bonus", 0))
+    defense = int(item.get("defense_bonus", 0))
+    max_hp = int(item.get("max_hp_bonus", 0))
+    value = int(item.get("value", 0))
+    normalized = attack + defense + (max_hp / 3.0)
+    return (normalized, attack, defense, max_hp, value)
+
+def _inventory_item_id_from_argument(argument: str) -> str | None:
+    return find_item_id_by_query(_state.player, argument)
+
+def _equipped_upgrade_for_item(item_id: str) -> bool:
+    item = ITEMS.get(item_id, {})
+    slot = EQUIPMENT_SLOT_BY_TYPE.get(item.get("type", ""))
+    if not slot:
+        return False
+    current_id = _state.player.equipment.get(slot)
+    return _item_power_tuple(item_id) > _item_power_tuple(current_id)
+
+def _is_equip_upgrade_action(action: dict) -> bool:
+    if action["verb_lower"] != "equip":
+        return False
+    arg = action["argument"].strip().lower()
+    if arg == "all":
+        return _has_any_gear_upgrade()
+    item_id = _inventory_item_id_from_argument(action["argument"])
+    if not item_id:
+        return False
+    return _equipped_upgrade_for_item(item_id)
+
+def _has_any_gear_upgrade() -> bool:
+    for item_id in _state.player.inventory:
+        item = ITEMS.get(item_id, {})
+        if item.get("type", "") not in EQUIPMENT_SLOT_BY_TYPE:
+            continue
+        if _equipped_upgrade_for_item(item_id):
+            return True
+    return False
+
+def _is_context_quest_item_action(action: dict) -> bool:
+    if action["verb_lower"] not in {"use", "read"}:
+        return False
+    arg = _normalize_token(action["argument"])
+    if arg == "goblin riddle" and _state.active_encounter and _state.active_encounter.enemy_id == "onyx_witch":
+        return bool(_state.active_encounter.witch_barrier_active)
+    if arg == "crusty key":
+        return (
+            _state.current_location_id == "witch_terrace"
+            and "onyx_witch_defeated" in _state.flags
+            and "elle_freed" not in _state.flags
+        )
+    if arg == "vial of tears":
+        return (
+            _state.current_location_id == "witch_terrace"
+            and "elle_freed" in _state.flags
+            and "elle_cleansed" not in _state.flags
+        )
+    if arg == "hoard of treasure":
+        return _state.current_location_id == "old_shack" and "hoard_delivered" not in _state.flags
+    return False
+
+def _is_heal_action(action: dict) -> bool:
+    if action["verb_lower"] != "use":
+        return False
+    item_id = _inventory_item_id_from_argument(action["argument"])
+    if not item_id:
+        return False
+    return ITEMS.get(item_id, {}).get("type") == "consumable"
+
+def _recommended_move_command() -> str | None:
+    target_id, direction = _engine._recommended_map_step(_state)
+    if not target_id or not direction:
+        return None
+    return f"move {direction}"
+
+def _boxed_art(title: str, glyph_lines: list[str]) -> str:
+    clean_title = str(title or "Unknown")
+    lines = [str(line).rstrip() for line in glyph_lines if str(line).strip()]
+    if not lines:
+        lines = ["(no art)"]
+    width = max(len(clean_title), *(len(line) for line in lines))
+    border = "+" + "-" * (width + 2) + "+"
+    output = [border, f"| {clean_title.ljust(width)} |", border]
+    for line in lines:
+        output.append(f"| {line.ljust(width)} |")
+    output.append(border)
+    return "\n".join(output)
+
+def _location_art(location_id: str) -> tuple[str, str, str]:
+    loc = LOCATIONS.get(location_id, {})
+    title = loc.get("name", str(location_id))
+    if location_id == "old_shack":
+        return title, "", _WISE_OLD_MAN_IMAGE
+    glyph = _LOCATION_GLYPHS.get(location_id)
+    if not glyph:
+        glyph = [
+            "       _________",
+            "      /  ZONE  /|",
+            "     /________/ |",
+            "     |        | |",
+            "     |________|/",
+        ]
+    return title, _boxed_art(title, glyph), ""
+
+def _npc_art(npc_id: str) -> tuple[str, str, str]:
+    npc = NPCS.get(npc_id, {})
+    title = npc.get("name", npc_id)
+    if npc_id == "wise_old_man" and _state.current_location_id == "old_shack":
+        return title, "", _WISE_OLD_MAN_IMAGE
+    glyph = _NPC_GLYPHS.get(npc_id, _NPC_GLYPHS.get("wise_old_man", []))
+    return title, _boxed_art(title, glyph), ""
+
+def _enemy_art(enemy_id: str) -> tuple[str, str, str]:
+    enemy = ENEMIES.get(enemy_id, {})
+    title = enemy.get("name", enemy_id)
+    if enemy_id == "giant_frog":
+        return title, "", _GIANT_FROG_IMAGE
+    if enemy.get("category") == "boss":
+        glyph = _BOSS_GLYPHS
+    else:
+        glyph = _CREATURE_GLYPHS
+    return title, _boxed_art(title, glyph), ""
+
+def _set_art(title: str, ascii_text: str, image_url: str = "") -> None:
+    global _current_art_title, _current_art_ascii, _current_art_image
+    _current_art_title = str(title or "Scene Art")
+    _current_art_ascii = str(ascii_text or "").strip("\n")
+    _current_art_image = str(image_url or "").strip()
+
+def _matching_npc_id_from_command(command_text: str) -> str | None:
+    if not command_text.startswith("talk "):
+        return None
+    return find_npc_id_by_query(_state, command_text[5:])
+
+def _status_panel_payload() -> dict:
+    stats = get_effective_stats(_state.player)
+    hp_bar = ui.health_bar(_state.player.hp, stats["max_hp"])
+
+    base_attack = int(_state.player.base_attack)
+    base_defense = int(_state.player.base_defense)
+    base_max_hp = int(_state.player.base_max_hp)
+    gear_attack = 0
+    gear_defense = 0
+    gear_max_hp = 0
+    equipped_details = []
+
+    for slot, item_id in _state.player.equipment.items():
+        if not item_id:
+            equipped_details.append(f"{slot.title()}: none")
+            continue
+
+        item = ITEMS.get(item_id, {})
+        item_name = item.get("name", item_id)
+        colored_item_name = _color_item_name(item_id, item_name)
+        attack_bonus = int(item.get("attack_bonus", 0))
+        defense_bonus = int(item.get("defense_bonus", 0))
+        max_hp_bonus = int(item.get("max_hp_bonus", 0))
+        gear_attack += attack_bonus
+        gear_defense += defense_bonus
+        gear_max_hp += max_hp_bonus
+
+        parts = []
+        if attack_bonus:
+            parts.append(f"+{attack_bonus} {ui.paint('ATK', 'skill')}")
+        if defense_bonus:
+            parts.append(f"+{defense_bonus} {ui.paint('DEF', 'skill')}")
+        if max_hp_bonus:
+            parts.append(f"+{max_hp_bonus} {ui.paint('HEALTH', 'skill')}")
+        detail = ", ".join(parts) if parts else "no stat bonus"
+        equipped_details.append(f"{slot.title()}: {colored_item_name} ({detail})")
+
+    overall_stats = [
+        f"{ui.paint('ATK', 'skill')}: {base_attack + gear_attack} (Base {base_attack} + Gear {gear_attack})",
+        f"{ui.paint('DEF', 'skill')}: {base_defense + gear_defense} (Base {base_defense} + Gear {gear_defense})",
+        f"{ui.paint('HEALTH', 'skill')}: {base_max_hp + gear_max_hp} (Base {base_max_hp} + Gear {gear_max_hp})",
+    ]
+
+    return {
+        "player_name": _state.player.name,
+        "level": int(_state.player.level),
+        "hp": int(_state.player.hp),
+        "max_hp": int(stats["max_hp"]),
+        "hp_bar": ui.spans(hp_bar),
+        "equipped_details": [ui.spans(line) for line in equipped_details],
+        "overall_stats": [ui.spans(line) for line in overall_stats],
+    }
+
+def _inventory_panel_payload() -> list[list]:
+    lines = []
+    inventory_items = sorted(_state.player.inventory.items())
+    max_rows = 14
+    for item_id, qty in inventory_items[:max_rows]:
+        item = ITEMS.get(item_id, {})
+        item_name = item.get("name", item_id)
+        colored_item_name = _color_item_name(item_id, item_name)
+        item_type = item.get("type", "unknown")
+        lines.append(ui.spans(f"{colored_item_name} x{qty} ({item_type}){_item_stat_suffix(item_id)}"))
+    remaining = len(inventory_items) - min(len(inventory_items), max_rows)
+    if remaining > 0:
+        lines.append([f"... +{remaining} more item stacks"])
+    return lines
+
+def _location_panel_payload() -> dict:
+    location = LOCATIONS.get(_state.current_location_id, {})
+    encounter_ids: list[str] = []
+    for row in location.get("encounters", []):
+        if isinstance(row, (list, tuple)) and row:
+            encounter_ids.append(str(row[0]))
+
+    boss_id = str(location.get("boss_id", "") or "").strip()
+    boss_flag = str(location.get("boss_flag", "") or "").strip()
+    if boss_id and boss_id in ENEMIES:
+        if not boss_flag or boss_flag not in _state.flags:
+            encounter_ids.append(boss_id)
+
+    unique_enemy_ids: list[str] = []
+    seen_enemy_ids: set[str] = set()
+    for enemy_id in encounter_ids:
+        if enemy_id in seen_enemy_ids or enemy_id not in ENEMIES:
+            continue
+        seen_enemy_ids.add(enemy_id)
+        unique_enemy_ids.append(enemy_id)
+
+    unique_enemy_ids.sort(key=lambda enemy_id: ENEMIES.get(enemy_id, {}).get("name", enemy_id))
+    creatures = []
+    for enemy_id in unique_enemy_ids:
+        enemy = ENEMIES.get(enemy_id, {})
+        enemy_name = enemy.get("name", enemy_id)
+        creatures.append(
+            {
+                "name": ui.spans(_color_enemy_name(enemy_name)),
+                "drops": ui.spans(_enemy_drop_summary(enemy_id)),
+            }
+        )
+
+    return {
+        "name": location.get("name", _state.current_location_id),
+        "creatures": creatures,
+    }
+
+def _kill_panel_payload() -> list[dict]:
+    result = []
+    kill_table = getattr(_state, "kill_counts_by_location", {})
+    if not isinstance(kill_table, dict):
+        return result
+
+    sorted_locations = sorted(
+        kill_table.items(),
+        key=lambda item: LOCATIONS.get(item[0], {}).get("name", str(item[0])),
+    )
+    for location_id, kills in sorted_locations:
+        if not isinstance(kills, dict):
+            continue
+        location_name = LOCATIONS.get(location_id, {}).get("name", str(location_id))
+        rows = []
+        total = 0
+        sorted_kills = sorted(kills.items(), key=lambda item: (-int(item[1]), str(item[0])))
+        max_enemy_rows = 6
+        for enemy_name, count in sorted_kills[:max_enemy_rows]:
+            safe_count = max(0, int(count))
+            total += safe_count
+            colored_enemy_name = _color_enemy_name(str(enemy_name))
+            rows.append({"enemy": ui.spans(colored_enemy_name), "count": safe_count})
+        remaining_enemy_types = len(sorted_kills) - min(len(sorted_kills), max_enemy_rows)
+        if remaining_enemy_types > 0:
+            rows.append({"enemy": [f"... +{remaining_enemy_types} more enemy types"], "count": 0})
+
+        if total == 0:
+            total = sum(max(0, int(value)) for value in kills.values())
+        result.append({"location": location_name, "total": total, "kills": rows})
+    return result
+
+def _resume_screen() -> str:
+    resume_messages = ["Saved game loaded from your browser."]
+    if _state.active_encounter:
+        enemy_id = _state.active_encounter.enemy_id
+        enemy_name = ENEMIES.get(enemy_id, {}).get("name", enemy_id)
+        resume_messages.append(f"Encounter in progress: {enemy_name}.")
+    else:
+        location_name = LOCATIONS.get(_state.current_location_id, {}).get("name", _state.current_location_id)
+        resume_messages.append(f"Current location: {location_name}.")
+    return _engine._render_screen(_state, action_messages=resume_messages)
+
+def _action_category(command: str) -> str:
+    verb = command.split(" ", 1)[0].strip().lower() if command else ""
+    if verb == "move":
+        return "movement"
+    if verb in {"fight", "defend", "skill", "run", "advise", "joke", "bribe", "hunt"}:
+        return "combat"
+    if verb in {"quest", "talk"}:
+        return "quest"
+    if verb in {"use", "read"} and _state.active_encounter:
+        return "combat"
+    return "player"
+
+def _argument_style(verb: str, argument: str) -> str:
+    arg = argument.strip().lower()
+    if not arg:
+        return ""
+
+    if verb == "talk":
+        return _NPC_STYLE_BY_NAME.get(arg, "npc")
+    if verb == "skill":
+        return "skill"
+    if verb == "train":
+        stat = arg.split(" ", 1)[0]
+        if stat in {"attack", "defense", "health"}:
+            return "skill"
+        return ""
+    if verb in {"use", "equip", "read"}:
+        if arg in {"all", "a,b,c"}:
+            return ""
+        return _ITEM_STYLE_BY_NAME.get(arg, "item")
+    if verb == "fight" and arg:
+        return _ENEMY_STYLE_BY_NAME.get(arg, "creature")
+
+    if arg in ui.SKILL_TERMS:
+        return "skill"
+    if arg in _NPC_STYLE_BY_NAME:
+        return "npc"
+    if arg in _ENEMY_STYLE_BY_NAME:
+        return _ENEMY_STYLE_BY_NAME[arg]
+    if arg in _ITEM_STYLE_BY_NAME:
+        return _ITEM_STYLE_BY_NAME[arg]
+    return ""
+
+def _action_priority(action: dict) -> int:
+    command = action["command"]
+    verb = action["verb_lower"]
+    score = 40
+
+    if verb == "train":
+        argument = action["argument"].strip().lower()
+        if command == "train all":
+            return 248
+        if argument.startswith("attack"):
+            return 246
+        if argument.startswith("defense"):
+            return 245
+        if argument.startswith("health"):
+            return 244
+        if command == "train a,b,c" or "," in argument:
+            return 243
+        return 242
+
+    if verb == "equip":
+        if _is_equip_upgrade_action(action):
+            if action["argument"].strip().lower() == "all":
+                return 225
+            return 215
+        return 6
+
+    if _is_context_quest_item_action(action):
+        return 205
+
+    if _state.active_encounter:
+        hp_ratio = _state.player.hp / max(1, get_effective_stats(_state.player)["max_hp"])
+        if verb == "read" and _normalize_token(action["argument"]) == "goblin riddle":
+            return 230 if _is_context_quest_item_action(action) else 85
+        if _is_heal_action(action):
+            return 210 if hp_ratio <= 0.45 else 120
+        if command == "skill focus strike":
+            return 180
+        if verb == "fight":
+            return 165
+        if verb == "defend":
+            return 120
+        if verb == "run":
+            return 160 if hp_ratio <= 0.3 else 75
+        if verb in {"joke", "bribe"}:
+            return 170
+        return 60
+
+    if command == _recommended_move_command():
+        score = max(score, 175)
+    elif verb == "move":
+        score = max(score, 55)
+
+    if command == "talk wise old man" and "met_old_man" not in _state.flags:
+        score = max(score, 185)
+
+    if verb == "hunt":
+        score = max(score, 78)
+
+    if command == "quest":
+        score = max(score, 95)
+    if command == "status":
+        score = max(score, 90)
+    if command == "look":
+        score = max(score, 70)
+    if _is_heal_action(action):
+        hp_ratio = _state.player.hp / max(1, get_effective_stats(_state.player)["max_hp"])
+        score = max(score, 120 if hp_ratio <= 0.5 else 45)
+
+    return score
+
+def _find_action(actions: list[dict], command: str) -> dict | None:
+    for action in actions:
+        if action["command"] == command:
+            return action
+    return None
+
+def _find_actions_by_prefix(actions: list[dict], prefix: str) -> list[dict]:
+    return [action for action in actions if action["command"].startswith(prefix)]
+
+def _add_hint(hints: list[dict[str, str]], seen: set[str], action: dict | None, reason: str) -> None:
+    if not action:
+        return
+    command = action["command"]
+    if command in seen:
+        return
+    seen.add(command)
+    hints.append({"command": command, "reason": reason})
+
+def _hint_recommendations(actions: list[dict]) -> list[dict[str, str]]:
+    if _state.game_over:
+        return []
+
+    hints: list[dict[str, str]] = []
+    seen: set[str] = set()
+
+    if _state.active_encounter:
+        encounter = _state.active_encounter
+        max_hp = max(1, get_effective_stats(_state.player)["max_hp"])
+        hp_ratio = _state.player.hp / max_hp
+
+        if encounter.special_phase == "negotiation":
+            _add_hint(hints, seen, _find_action(actions, "joke"), "Safest no-cost path through goblin negotiation.")
+            _add_hint(hints, seen, _find_action(actions, "bribe"), "Fallback escape if you want to avoid full combat.")
+            _add_hint(hints, seen, _find_action(actions, "fight"), "Choose if you want rewards and combat progression.")
+            return hints[:4]
+
+        if encounter.enemy_id == "onyx_witch" and encounter.witch_barrier_active:
+            _add_hint(
+                hints,
+                seen,
+                _find_action(actions, "read goblin riddle") or _find_action(actions, "use goblin riddle"),
+                "Break the witch barrier first so your attacks can land.",
+            )
+
+        if hp_ratio <= 0.45:
+            heal_actions = [action for action in actions if _is_heal_action(action)]
+            heal_actions.sort(key=lambda action: action["priority_score"], reverse=True)
+            _add_hint(hints, seen, heal_actions[0] if heal_actions else None, "Stabilize HP before taking more hits.")
+
+        _add_hint(
+            hints,
+            seen,
+            _find_action(actions, "skill focus strike"),
+            "High burst damage keeps encounters shorter.",
+        )
+        _add_hint(hints, seen, _find_action(actions, "fight"), "Maintain pressure when no special counter is needed.")
+        if hp_ratio <= 0.3:
+            _add_hint(hints, seen, _find_action(actions, "run"), "High risk state. Escape can preserve the run.")
+        return hints[:4]
+
+    if _state.player.skill_points > 0:
+        if _state.player.skill_points >= 3:
+            _add_hint(
+                hints,
+                seen,
+                _find_action(actions, "train all"),
+                "Spend points across all core stats for immediate overall scaling.",
+            )
+        _add_hint(
+            hints,
+            seen,
+            _find_action(actions, "train attack 1"),
+            "Increase base attack for faster fights and easier farming.",
+        )
+        _add_hint(
+            hints,
+            seen,
+            _find_action(actions, "train defense 1"),
+            "Raise defense to reduce incoming damage every turn.",
+        )
+        _add_hint(
+            hints,
+            seen,
+            _find_action(actions, "train health 1"),
+            "Increase max health to improve survivability and potion value.",
+        )
+
+    upgrade_actions = [action for action in actions if _is_equip_upgrade_action(action)]
+    upgrade_actions.sort(key=lambda action: action["priority_score"], reverse=True)
+    for action in upgrade_actions[:2]:
+        _add_hint(hints, seen, action, "Immediate gear upgrade available. Equip now for stronger upcoming fights.")
+
+    if "met_old_man" not in _state.flags:
+        _add_hint(
+            hints,
+            seen,
+            _find_action(actions, "talk wise old man"),
+            "This unlocks your core combat skills and main quest flow.",
+        )
+
+    for command, reason in [
+        ("use crusty key", "Unlock Elle after the witch fight."),
+        ("use vial of tears", "Cleanse Elle to finish the main storyline."),
+        ("use hoard of treasure", "Turn in treasure at the shack for bonus gold."),
+    ]:
+        action = _find_action(actions, command)
+        if action and _is_context_quest_item_action(action):
+            _add_hint(hints, seen, action, reason)
+
+    move_command = _recommended_move_command()
+    if move_command:
+        _add_hint(
+            hints,
+            seen,
+            _find_action(actions, move_command),
+            f"Recommended quest path: {_QUEST_STEPS.get(_state.quest_stage, 'Advance main progression')}",
+        )
+    _add_hint(hints, seen, _find_action(actions, "quest"), "Check objective text if you are unsure about next steps.")
+    _add_hint(hints, seen, _find_action(actions, "status"), "Review HP and stat readiness before moving on.")
+
+    return hints[:8]
+
+def _action_payload() -> tuple[str, list[dict], list[dict[str, str]]]:
+    if _state.game_over:
+        return "Available actions (0):", [], []
+
+    lines = _engine._build_input_hints(_state)
+    if not lines:
+        return "Available actions (0):", [], []
+
+    heading = str(lines[0])
+    actions: list[dict[str, str]] = []
+    for raw in lines[1:]:
+        line = str(raw).strip()
+        if not line or ":" not in line:
+            continue
+        command, description = line.split(":", 1)
+        action_command = command.strip()
+        command_parts = action_command.split(maxsplit=1)
+        verb = command_parts[0].strip() if command_parts else action_command
+        argument = command_parts[1].strip() if len(command_parts) > 1 else ""
+        verb_lower = verb.lower()
+        action = {
+            "command": action_command,
+            "description": description.strip(),
+            "category": _action_category(action_command),
+            "verb": verb,
+            "verb_lower": verb_lower,
+            "argument": argument,
+            "argument_style": _argument_style(verb_lower, argument),
+        }
+        action["priority_score"] = _action_priority(action)
+        actions.append(action)
+
+    hints = _hint_recommendations(actions)
+    cleaned_actions = [
+        {
+            "command": action["command"],
+            "description": action["description"],
+            "category": action["category"],
+            "verb": action["verb"],
+            "argument": action["argument"],
+            "argument_style": action["argument_style"],
+            "priority_score": int(action["priority_score"]),
+        }
+        for action in actions
+    ]
+    return heading, cleaned_actions, hints
+
+def _strip_hint_block(screen: str) -> str:
+    if _state.game_over:
+        return screen
+
+    hints = ui.format_messages(_engine._build_input_hints(_state))
+    if hints and screen.endswith(hints):
+        return screen[: -len(hints)].rstrip()
+    return screen
+
+def _status_inputs() -> tuple:
+    player = _state.player
+    return (
+        player.name,
+        player.level,
+        player.hp,
+        player.base_attack,
+        player.base_defense,
+        player.base_max_hp,
+        tuple(player.equipment.items()),
+    )
+
+def _inventory_inputs() -> tuple:
+    return tuple(_state.player.inventory.items())
+
+def _location_inputs() -> tuple:
+    return (_state.current_location_id, _state.flags.mask)
+
+def _kill_inputs() -> tuple:
+    kill_table = getattr(_state, "kill_counts_by_location", {})
+    if not isinstance(kill_table, dict):
+        return ()
+    return tuple(
+        (location_id, tuple(kills.items()) if isinstance(kills, dict) else kills)
+        for location_id, kills in kill_table.items()
+    )
+
+def _art_inputs() -> tuple:
+    return (_current_art_title, _current_art_ascii, _current_art_image)
+
+def _art_panel_payload() -> dict:
+    return {
+        "art_title": _current_art_title,
+        "art_ascii": _current_art_ascii,
+        "art_image": _current_art_image,
+    }
+
+def _actions_panel_payload() -> dict:
+    heading, actions, hints = _action_payload()
+    return {
+        "heading": heading,
+        "actions": actions,
+        "hints": hints,
+        "game_over": bool(_state.game_over),
+    }
+
+# Panel -> (inputs, payload builder). Inputs are cheap snapshots of what the
+# panel is built from; None means the panel is rebuilt every time (the action
+# list depends on most of the state) and compared with what was last sent.
+_PANELS = {
+    "status": (_status_inputs, _status_panel_payload),
+    "art": (_art_inputs, _art_panel_payload),
+    "inventory": (_inventory_inputs, _inventory_panel_payload),
+    "location": (_location_inputs, _location_panel_payload),
+    "kills": (_kill_inputs, _kill_panel_payload),
+    "actions": (None, _actions_panel_payload),
+}
+# Versions only ever grow, so the page can tell a panel it has already drawn.
+_panel_versions: dict[str, int] = {}
+_panels_sent: dict[str, tuple] = {}
+
+def _changed_panels(full: bool) -> dict:
+    """Panels whose content differs from what the page was last sent (all of them when full)."""
+    changed = {}
+    for name, (inputs_of, build) in _PANELS.items():
+        inputs = inputs_of() if inputs_of is not None else None
+        sent = _panels_sent.get(name)
+        if not full and sent is not None and inputs is not None and sent[0] == inputs:
+            continue
+        value = build()
+        _panels_sent[name] = (inputs, value)
+        if full or sent is None or sent[1] != value:
+            _panel_versions[name] = _panel_versions.get(name, 0) + 1
+            changed[name] = {"version": _panel_versions[name], "data": value}
+    return changed
+
+def _payload(screen: str, full: bool = False) -> dict:
+    """Screen, flags, and the panels that changed; full sends every panel (new page state)."""
+    return {
+        "screen": ui.spans(_strip_hint_block(screen)),
+        "game_over": bool(_state.game_over),
+        "in_combat": bool(_state.active_encounter),
+        "full": full,
+        "panels": _changed_panels(full),
+    }
+
+def web_initial() -> str:
+    if not _current_art_ascii and not _current_art_image:
+        location_title, location_ascii, location_image = _location_art(_state.current_location_id)
+        _set_art(location_title, location_ascii, location_image)
+    return json.dumps(_payload(_engine.initial_screen(_state), full=True))
+
+def web_process(command: str) -> str:
+    command_text = str(command or "").strip().lower()
+    previous_location = _state.current_location_id
+    previous_discovered = set(_state.discovered_locations)
+    previous_encounter_enemy = _state.active_encounter.enemy_id if _state.active_encounter else None
+
+    screen = _engine.process_raw_command(_state, command)
+
+    if _state.active_encounter and previous_encounter_enemy is None:
+        enemy_title, enemy_ascii, enemy_image = _enemy_art(_state.active_encounter.enemy_id)
+        _set_art(enemy_title, enemy_ascii, enemy_image)
+    elif command_text.startswith("talk "):
+        npc_id = _matching_npc_id_from_command(command_text)
+        if npc_id:
+            npc_title, npc_ascii, npc_image = _npc_art(npc_id)
+            _set_art(npc_title, npc_ascii, npc_image)
+    elif (
+        command_text.startswith("move ")
+        and _state.current_location_id != previous_location
+        and _state.current_location_id not in previous_discovered
+    ):
+        location_title, location_ascii, location_image = _location_art(_state.current_location_id)
+        _set_art(location_title, location_ascii, location_image)
+
+    payload = _payload(screen)
+    payload["append_only_notice"] = bool(
+        command_text.startswith("skill") and "is on cooldown for" in screen
+    )
+    return json.dumps(payload)
+
+def web_reset() -> str:
+    global _state
+    _state = create_initial_state()
+    location_title, location_ascii, location_image = _location_art(_state.current_location_id)
+    _set_art(location_title, location_ascii, location_image)
+    return json.dumps(_payload(_engine.initial_screen(_state), full=True))
+
+def web_save_state() -> str:
+    return encode_state_text(_state)
+
+def _decode_saved_state(snapshot: str):
+    text = str(snapshot or "").strip()
+    if not text.startswith("{"):
+        try:
+            return decode_state_text(text), None
+        except SnapshotError:
+            return None, "invalid_snapshot"
+
+    # Saves written before the binary snapshot format were JSON documents.
+    try:
+        payload = json.loads(text)
+    except Exception:
+        return None, "invalid_json"
+    if not isinstance(payload, dict):
+        return None, "invalid_payload"
+    state_payload = payload.get("state")
+    if not isinstance(state_payload, dict):
+        return None, "missing_state"
+    restored = state_from_dict(state_payload)
+    if restored is None:
+        return None, "restore_failed"
+    return restored, None
+
+def _restored_payload() -> dict:
+    if _state.active_encounter:
+        enemy_title, enemy_ascii, enemy_image = _enemy_art(_state.active_encounter.enemy_id)
+        _set_art(enemy_title, enemy_ascii, enemy_image)
+    else:
+        location_title, location_ascii, location_image = _location_art(_state.current_location_id)
+        _set_art(location_title, location_ascii, location_image)
+    return _payload(_resume_screen(), full=True)
+
+def web_load_state(snapshot: str) -> str:
+    global _state
+    restored, error = _decode_saved_state(snapshot)
+    if restored is None:
+        return json.dumps({"ok": False, "error": error})
+    _state = restored
+    return json.dumps({"ok": True, "payload": _restored_payload()})
+
+def web_replay(commands_json: str) -> str:
+    """Re-apply journaled commands recorded after the last checkpoint."""
+    try:
+        commands = json.loads(str(commands_json or "[]"))
+    except Exception:
+        return json.dumps({"ok": False, "error": "invalid_journal"})
+    if not isinstance(commands, list):
+        return json.dumps({"ok": False, "error": "invalid_journal"})
+    for command in commands:
+        _engine.step(_state, str(command))
+    return json.dumps({"ok": True, "payload": _restored_payload(), "replayed": len(commands)})
+`;
+
+async function bootEngine() {
+  // Game files download while the Python runtime loads.
+  const gameSources = fetchGameSources();
+  gameSources.catch(() => {});
+
+  postStatus("Loading Python runtime in browser...");
+  importScripts(PYODIDE_JS_URL);
+  pyodide = await self.loadPyodide();
+
+  postStatus("Loading game files...");
+  installGameSources(await gameSources);
+
+  postStatus("Starting game engine...");
+  await pyodide.runPythonAsync(BOOTSTRAP_CODE);
+  api = {
+    initial: pyodide.globals.get("web_initial"),
+    process: pyodide.globals.get("web_process"),
+    reset: pyodide.globals.get("web_reset"),
+    save: pyodide.globals.get("web_save_state"),
+    load: pyodide.globals.get("web_load_state"),
+    replay: pyodide.globals.get("web_replay"),
+  };
+}
+
+const REQUEST_HANDLERS = {
+  ready: () => "",
+  initial: () => api.initial(),
+  process: (command) => api.process(String(command)),
+  reset: () => api.reset(),
+  save: () => api.save(),
+  load: (snapshot) => api.load(String(snapshot)),
+  replay: (commands) => api.replay(JSON.stringify(commands || [])),
+};
+
+const engineReady = bootEngine();
+engineReady.catch(() => {});
+
+self.onmessage = (event) => {
+  const { id, type, args } = event.data || {};
+  // Chained so requests run one at a time in arrival order, even across a failure.
+  requestChain = requestChain
+    .then(async () => {
+      await engineReady;
+      const handler = REQUEST_HANDLERS[type];
+      if (!handler) {
+        throw new Error(`Unknown engine request: ${type}`);
+      }
+      return handler(...(args || []));
+    })
+    .then(
+      (result) => self.postMessage({ id, ok: true, result: String(result ?? "") }),
+      (error) => self.postMessage({ id, ok: false, error: String(error?.message || error) }),
+    );
+};
@@ -4,10 +4,9 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from content.enemies import ENEMIES
-from content.items import ITEMS
+from content.compiled import ENEMY_RECORDS, EnemyRecord, IntentRecord
 from game import ui
-from game.state import Encounter, GameState, clamp_player_hp, get_effective_stats, has_item
+from game.state import Encounter, GameState, clamp_player_hp, find_item_id_by_query, get_effective_stats, has_item
 from systems.loot import clear_ring_surge, grant_rewards, use_item
 
 
@@ -31,38 +30,37 @@ BOSS_TITLES = {
 }
 
 
-def _enemy(enemy_id: str) -> dict:
-    return ENEMIES[enemy_id]
+def _enemy(enemy_id: str) -> EnemyRecord:
+    return ENEMY_RECORDS[enemy_id]
 
 
-def _format_intent(encounter: Encounter, enemy: dict) -> str:
-    intents = enemy.get("intents", [])
+def _format_intent(encounter: Encounter, enemy: EnemyRecord) -> str:
+    intents = enemy.intents
     if not intents:
-        return f"{enemy['name']} sizes you up."
-    intent = intents[encounter.intent_index % len(intents)]
-    return intent.get("telegraph", f"{enemy['name']} prepares an attack.")
+        return f"{enemy.name} sizes you up."
+    return intents[encounter.intent_index % len(intents)].telegraph
 
 
-def _intent_payload(encounter: Encounter, enemy: dict) -> dict:
-    intents = enemy.get("intents", [])
+def _intent_payload(encounter: Encounter, enemy: EnemyRecord) -> IntentRecord:
+    intents = enemy.intents
     if not intents:
-        return {"name": "Strike", "base_damage": int(enemy.get("attack", 1)), "defend_multiplier": 0.5}
+        return enemy.strike
     return intents[encounter.intent_index % len(intents)]
 
 
-def _health_snapshot_lines(state: GameState, enemy: dict, enemy_hp: Optional[int] = None) -> List[str]:
+def _health_snapshot_lines(state: GameState, enemy: EnemyRecord, enemy_hp: Optional[int] = None) -> List[str]:
     if enemy_hp is None:
         if state.active_encounter:
             enemy_hp = state.active_encounter.current_hp
         else:
             enemy_hp = 0
     enemy_hp = max(0, int(enemy_hp))
-    enemy_max_hp = int(enemy.get("hp", max(1, enemy_hp)))
+    enemy_max_hp = enemy.hp
     player_max_hp = int(get_effective_stats(state.player)["max_hp"])
     return ui.combat_health_lines(
         player_hp=state.player.hp,
         player_max_hp=player_max_hp,
-        enemy_name=enemy.get("name", "Enemy"),
+        enemy_name=enemy.name,
         enemy_hp=enemy_hp,
         enemy_max_hp=enemy_max_hp,
     )
@@ -82,24 +80,24 @@ def start_encounter(state: GameState, enemy_id: str) -> List[str]:
         return []
 
     enemy = _enemy(enemy_id)
-    encounter = Encounter(enemy_id=enemy_id, current_hp=int(enemy["hp"]))
-    if enemy.get("special") == "goblin_negotiation":
+    encounter = Encounter(enemy_id=enemy_id, current_hp=enemy.hp)
+    if enemy.special == "goblin_negotiation":
         encounter.special_phase = "negotiation"
-    if enemy.get("special") == "witch_barrier":
+    if enemy.special == "witch_barrier":
         encounter.witch_barrier_active = True
     state.active_encounter = encounter
 
     messages: List[str] = []
-    messages.extend(enemy.get("pre_dialogue", []))
+    messages.extend(enemy.pre_dialogue)
 
     if enemy_id == "king_makor" and has_item(state.player, "mysterious_ring"):
         if "ring_surge_active" not in state.flags:
             state.flags.add("ring_surge_active")
-            state.player.temporary_bonuses["attack"] = state.player.temporary_bonuses.get("attack", 0) + 4
-            state.player.temporary_bonuses["defense"] = state.player.temporary_bonuses.get("defense", 0) + 2
+            state.player.add_temporary_bonus("attack", 4)
+            state.player.add_temporary_bonus("defense", 2)
             messages.append("The mysterious ring flares and empowers you.")
 
-    messages.append(f"Encounter started: {enemy['name']} ({encounter.current_hp} HP).")
+    messages.append(f"Encounter started: {enemy.name} ({encounter.current_hp} HP).")
     if encounter.special_phase != "negotiation":
         messages.append(_format_intent(encounter, enemy))
     return messages
@@ -110,7 +108,7 @@ def encounter_status(state: GameState) -> List[str]:
     if not state.active_encounter:
         return []
     enemy = _enemy(state.active_encounter.enemy_id)
-    lines = [f"Enemy: {enemy['name']} HP {state.active_encounter.current_hp}/{enemy['hp']}"]
+    lines = [f"Enemy: {enemy.name} HP {state.active_encounter.current_hp}/{enemy.hp}"]
     if state.active_encounter.special_phase == "negotiation":
         lines.append("Actions: joke, bribe, or fight.")
     else:
@@ -118,21 +116,19 @@ def encounter_status(state: GameState) -> List[str]:
     return lines
 
 
-def _player_attack_damage(state: GameState, enemy: dict, multiplier: float = 1.0) -> int:
+def _player_attack_damage(state: GameState, enemy: EnemyRecord, multiplier: float = 1.0) -> int:
     player_stats = get_effective_stats(state.player)
     attack_value = int(player_stats["attack"] * multiplier)
-    damage = attack_value + state.rng.randint(-2, 3) - int(enemy.get("defense", 0) / 2)
+    damage = attack_value + state.rng.randint(-2, 3) - int(enemy.defense / 2)
     return max(1, damage)
 
 
-def _enemy_attack_damage(state: GameState, enemy: dict, encounter: Encounter, payload: dict) -> int:
+def _enemy_attack_damage(state: GameState, encounter: Encounter, payload: IntentRecord) -> int:
     player_stats = get_effective_stats(state.player)
-    base = int(payload.get("base_damage", enemy.get("attack", 1)))
-    damage = base + state.rng.randint(-3, 3) - int(player_stats["defense"] / 3)
+    damage = payload.base_damage + state.rng.randint(-3, 3) - int(player_stats["defense"] / 3)
     damage = max(1, damage)
     if encounter.player_defending:
-        multiplier = float(payload.get("defend_multiplier", 0.5))
-        damage = max(1, int(damage * multiplier))
+        damage = max(1, int(damage * payload.defend_multiplier))
     return damage
 
 
@@ -152,11 +148,11 @@ def _resolve_victory(state: GameState) -> List[str]:
         return []
     enemy_id = encounter.enemy_id
     enemy = _enemy(enemy_id)
-    messages: List[str] = [f"You defeat {enemy['name']}."]
-    messages.extend(enemy.get("post_dialogue", []))
+    messages: List[str] = [f"You defeat {enemy.name}."]
+    messages.extend(enemy.post_dialogue)
 
     location_id = str(state.current_location_id or "unknown")
-    enemy_name = str(enemy.get("name", enemy_id))
+    enemy_name = enemy.name
     location_kills = state.kill_counts_by_location.setdefault(location_id, {})
     location_kills[enemy_name] = int(location_kills.get(enemy_name, 0)) + 1
 
@@ -223,11 +219,11 @@ def _enemy_turn(state: GameState) -> List[str]:
         return []
     enemy = _enemy(encounter.enemy_id)
     payload = _intent_payload(encounter, enemy)
-    damage = _enemy_attack_damage(state, enemy, encounter, payload)
+    damage = _enemy_attack_damage(state, encounter, payload)
     state.player.hp -= damage
     clamp_player_hp(state.player)
 
-    messages = [f"{enemy['name']} uses {payload.get('name', 'attack')} and deals {damage} damage."]
+    messages = [f"{enemy.name} uses {payload.name} and deals {damage} damage."]
 
     if encounter.enemy_id == "onyx_witch" and encounter.witch_barrier_active:
         curse = 4
@@ -282,6 +278,13 @@ def _handle_goblin_negotiation(state: GameState, action: str) -> List[str]:
     return ["The goblins mock you. Choose `joke`, `bribe`, or `fight`."]
 
 
+def run_chance(enemy_id: str) -> float:
+    """Chance that `run` escapes this enemy."""
+    if enemy_id == "goblin_army":
+        return 0.22
+    return 0.65 if _enemy(enemy_id).is_normal else 0.28
+
+
 def attempt_run(state: GameState) -> List[str]:
     """Attempt to flee the current encounter."""
     encounter = state.active_encounter
@@ -292,16 +295,12 @@ def attempt_run(state: GameState) -> List[str]:
     if encounter.special_phase == "negotiation":
         return ["You are tied up. Running is not an option. Choose joke, bribe, or fight."]
 
-    run_chance = 0.65 if enemy.get("category") == "normal" else 0.28
-    if encounter.enemy_id == "goblin_army":
-        run_chance = 0.22
-
-    if state.rng.random() < run_chance:
+    if state.rng.random() < run_chance(encounter.enemy_id):
         state.active_encounter = None
         clear_ring_surge(state)
-        return [f"You escape from {enemy['name']}."]
+        return [f"You escape from {enemy.name}."]
 
-    messages = [f"You fail to escape {enemy['name']}."]
+    messages = [f"You fail to escape {enemy.name}."]
     messages.extend(_enemy_turn(state))
     return messages
 
@@ -327,7 +326,7 @@ def player_action(state: GameState, action: str, args: Optional[list[str]] = Non
         else:
             damage = _player_attack_damage(state, enemy)
             encounter.current_hp -= damage
-            messages.append(f"You strike {enemy['name']} for {damage} damage.")
+            messages.append(f"You strike {enemy.name} for {damage} damage.")
             messages.extend(_health_snapshot_lines(state, enemy))
 
     elif action == "defend":
@@ -378,12 +377,7 @@ def player_action(state: GameState, action: str, args: Optional[list[str]] = Non
         messages.extend(item_messages)
 
         if encounter.enemy_id == "onyx_witch" and encounter.witch_barrier_active:
-            item_id = None
-            for owned_item_id in state.player.inventory:
-                owned_name = ITEMS.get(owned_item_id, {}).get("name", "").lower()
-                if item_query.lower() in {owned_item_id, owned_name} or item_query.lower() in owned_name:
-                    item_id = owned_item_id
-                    break
+            item_id = find_item_id_by_query(state.player, item_query)
             if item_query.lower() == "goblin riddle":
                 item_id = "goblin_riddle"
             if item_id == "goblin_riddle":
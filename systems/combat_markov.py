@@ -0,0 +1,883 @@
+"""Exact combat odds from a Markov chain over encounter states.
+
+A fight played under a fixed `Policy` is a Markov chain over (player HP,
+enemy HP, intent index, skill cooldowns, healing items left, witch barrier).
+Each turn has at most six player-damage outcomes (`randint(-2, 3)`) and seven
+enemy-damage outcomes (`randint(-3, 3)`), the same rules as systems.combat,
+so exact odds come from a memoized recursion over the reachable states only.
+
+Enemy HP never rises and cooldowns plus finite consumables force an attack
+every few turns, so the chain is acyclic. The one exception is the Onyx Witch
+barrier when the build cannot read the goblin riddle: that fight cannot be
+won, and its expected length is found by value iteration instead.
+
+Solved states are memoized per chain, up to `CHAIN_STATE_LIMIT` of them;
+past that a chain starts over. Internally a state is one int (policy phase,
+enemy HP, player HP), so each enemy hit is a subtraction and a dict lookup. Solving mutates those shared memos, so it is
+serialized on one lock and may run off the main thread (the game server
+solves `advise_position` on a worker thread).
+
+    python -m systems.combat_markov --levels 1-20
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import lru_cache
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from content.compiled import ENEMY_RECORDS, ITEM_RECORDS
+from content.enemies import ENEMIES
+from game.state import GameState, Player, get_effective_stats
+
+
+CORE_SKILLS = frozenset({"focus strike", "guard stance", "second wind"})
+
+FOCUS_MULTIPLIER = 1.8
+FOCUS_COOLDOWN = 2
+GUARD_COOLDOWN = 3
+GUARD_HEAL = 6
+SECOND_WIND_COOLDOWN = 4
+SECOND_WIND_HEAL = 16
+WITCH_CURSE = 4
+RING_ATTACK = 4
+RING_DEFENSE = 2
+
+PLAYER_ROLLS = range(-2, 4)
+ENEMY_ROLLS = range(-3, 4)
+
+# Solved states (both half-turn memos together) kept per chain.
+CHAIN_STATE_LIMIT = 200_000
+
+_SOLVE_LOCK = threading.RLock()
+
+
+@dataclass(frozen=True)
+class Build:
+    """Player numbers going into a fight (effective stats, before the ring surge)."""
+
+    name: str = "custom"
+    attack: int = 8
+    defense: int = 5
+    max_hp: int = 50
+    hp: Optional[int] = None
+    potions: int = 0
+    bandages: int = 0
+    skills: frozenset = CORE_SKILLS
+    ring: bool = False
+    riddle: bool = False
+
+    @property
+    def start_hp(self) -> int:
+        return self.max_hp if self.hp is None else max(1, min(self.hp, self.max_hp))
+
+    @classmethod
+    def from_player(cls, player: Player, name: str = "player") -> "Build":
+        """Capture a live player's effective stats and combat consumables."""
+        stats = get_effective_stats(player)
+        return cls(
+            name=name,
+            attack=stats["attack"],
+            defense=stats["defense"],
+            max_hp=stats["max_hp"],
+            hp=player.hp,
+            potions=int(player.inventory.get("minor_potion", 0)),
+            bandages=int(player.inventory.get("sturdy_bandage", 0)),
+            skills=frozenset(player.skills),
+            ring=bool(player.inventory.get("mysterious_ring", 0)),
+            riddle=bool(player.inventory.get("goblin_riddle", 0)),
+        )
+
+    @classmethod
+    def for_level(cls, level: int, potions: int = 2, bandages: int = 1) -> "Build":
+        """Level-up stats only, with the starting blade and coat and no training."""
+        gained = max(0, level - 1)
+        return cls(
+            name=f"level {level}",
+            attack=8 + gained + 1,
+            defense=5 + gained + 1,
+            max_hp=50 + gained * 6 + 2,
+            potions=potions,
+            bandages=bandages,
+        )
+
+
+@dataclass(frozen=True)
+class Policy:
+    """Fixed decision rule applied every turn, highest priority first.
+
+    1. read the goblin riddle while the witch barrier is up,
+    2. at or below `heal_below` of max HP: second wind, then a potion, then a bandage,
+    3. guard stance when the enemy is about to use its strongest intent,
+    4. focus strike when off cooldown,
+    5. fight.
+    """
+
+    heal_below: float = 0.35
+    use_focus_strike: bool = True
+    use_guard_stance: bool = True
+    use_second_wind: bool = True
+
+
+# (hp, enemy_hp, intent, focus_cd, guard_cd, wind_cd, potions, bandages, barrier)
+CombatState = Tuple[int, int, int, int, int, int, int, int, bool]
+# The same state without the two HPs.
+Phase = Tuple[int, int, int, int, int, int, bool]
+
+
+@dataclass(frozen=True)
+class Odds:
+    """Exact outcome of one build against one enemy under one policy."""
+
+    enemy_id: str
+    build: Build
+    policy: Policy
+    win: float
+    expected_turns: float
+    expected_hp_loss: float
+    expected_heals: float
+    # States newly solved for this fight; the rest were already on the shared chain.
+    states: int
+
+    @property
+    def loss(self) -> float:
+        return 1.0 - self.win
+
+    def summary(self) -> str:
+        return (
+            f"{self.build.name:<12} vs {self.enemy_id:<20} win {self.win:8.4%}"
+            f"  turns {self.expected_turns:6.2f}  hp lost {self.expected_hp_loss:6.1f}"
+            f"  heals {self.expected_heals:4.2f}  ({self.states} states)"
+        )
+
+
+def _spread(center: int) -> List[Tuple[int, int]]:
+    """(damage, ways) for `max(1, center + roll)` over the player's six rolls."""
+    counts: Dict[int, int] = {}
+    for roll in PLAYER_ROLLS:
+        damage = max(1, center + roll)
+        counts[damage] = counts.get(damage, 0) + 1
+    return sorted(counts.items())
+
+
+def _enemy_hits(base: int, defense_cut: int, multiplier: Optional[float]) -> List[Tuple[int, float]]:
+    counts: Dict[int, int] = {}
+    for roll in ENEMY_ROLLS:
+        damage = max(1, base + roll - defense_cut)
+        if multiplier is not None:
+            damage = max(1, int(damage * multiplier))
+        counts[damage] = counts.get(damage, 0) + 1
+    return [(damage, ways / len(ENEMY_ROLLS)) for damage, ways in sorted(counts.items())]
+
+
+class CombatChain:
+    """Transition function of one (enemy, build, policy) fight."""
+
+    def __init__(self, enemy_id: str, build: Build, policy: Policy = Policy()):
+        enemy = ENEMY_RECORDS[enemy_id]
+        intents = enemy.intents or (enemy.strike,)
+        ring = build.ring and enemy_id == "king_makor"
+        attack = build.attack + (RING_ATTACK if ring else 0)
+        defense = build.defense + (RING_DEFENSE if ring else 0)
+        enemy_cut = int(enemy.defense / 2)
+        player_cut = int(defense / 3)
+        base = [intent.base_damage for intent in intents]
+        multipliers = [intent.defend_multiplier for intent in intents]
+
+        self.enemy_id = enemy_id
+        self.build = build
+        self.policy = policy
+        self.max_hp = build.max_hp
+        self.enemy_hp = enemy.hp
+        self.intents = len(intents)
+        self.strongest = [damage == max(base) for damage in base]
+        self.hits = [_enemy_hits(damage, player_cut, None) for damage in base]
+        self.defended_hits = [_enemy_hits(damage, player_cut, mult) for damage, mult in zip(base, multipliers)]
+        ways = len(PLAYER_ROLLS)
+        self.strike = [(damage, count / ways) for damage, count in _spread(attack - enemy_cut)]
+        self.focus = [(damage, count / ways) for damage, count in _spread(int(attack * FOCUS_MULTIPLIER) - enemy_cut)]
+        self.heal_threshold = policy.heal_below * build.max_hp
+        self.has_focus = policy.use_focus_strike and "focus strike" in build.skills
+        self.has_guard = policy.use_guard_stance and "guard stance" in build.skills
+        self.has_wind = policy.use_second_wind and "second wind" in build.skills
+        self.potion_heal = ITEM_RECORDS["minor_potion"].heal_amount
+        self.bandage_heal = ITEM_RECORDS["sturdy_bandage"].heal_amount
+        self.witch = enemy_id == "onyx_witch"
+        # State keys are (phase id * enemy_stride + enemy HP) * hp_stride + HP.
+        self.hp_stride = build.max_hp + 1
+        self.enemy_stride = max(record.hp for record in ENEMY_RECORDS.values()) + 1
+        self.phases: List[Phase] = []
+        self.phase_ids: Dict[Phase, int] = {}
+        self.plans: Dict[Tuple[int, bool], tuple] = {}
+        # Solved (win, turns, hp left, heals used) per state key, kept across
+        # solves until there are CHAIN_STATE_LIMIT of them.
+        self.values: Dict[int, object] = {}
+        self.after_swing: Dict[int, Tuple[float, float, float, float]] = {}
+
+    def start(self, build: Optional[Build] = None, enemy_hp: Optional[int] = None) -> CombatState:
+        """Opening state of a fight with `build`'s HP and consumables."""
+        build = build or self.build
+        return (
+            build.start_hp,
+            self.enemy_hp if enemy_hp is None else enemy_hp,
+            0,
+            0,
+            0,
+            0,
+            build.potions,
+            build.bandages,
+            self.witch,
+        )
+
+    def legal_actions(self, state: CombatState) -> List[str]:
+        """Every action worth considering in `state` (ignoring `Policy` toggles).
+
+        Striking into the witch barrier is left out: defending is never worse.
+        """
+        _hp, _enemy_hp, _intent, focus_cd, guard_cd, wind_cd, potions, bandages, barrier = state
+        skills = self.build.skills
+        actions: List[str] = []
+        if barrier:
+            if self.build.riddle:
+                actions.append("read")
+        else:
+            actions.append("fight")
+            if "focus strike" in skills and not focus_cd:
+                actions.append("focus")
+        actions.append("defend")
+        if "guard stance" in skills and not guard_cd:
+            actions.append("guard")
+        if "second wind" in skills and not wind_cd:
+            actions.append("wind")
+        if potions:
+            actions.append("potion")
+        if bandages:
+            actions.append("bandage")
+        return actions
+
+    def choose(self, state: CombatState) -> str:
+        """The policy's action in `state`."""
+        hp, _enemy_hp, intent, focus_cd, guard_cd, wind_cd, potions, bandages, barrier = state
+        low = hp <= self.heal_threshold
+        if barrier and self.build.riddle:
+            return "read"
+        if low and self.has_wind and not wind_cd:
+            return "wind"
+        if low and potions:
+            return "potion"
+        if low and bandages:
+            return "bandage"
+        if self.has_guard and self.strongest[intent] and not guard_cd:
+            return "guard"
+        if self.has_focus and not focus_cd and not barrier:
+            return "focus"
+        return "fight"
+
+    def act(self, state: CombatState, action: str) -> Tuple[int, CombatState, bool, Optional[List[Tuple[int, float]]]]:
+        """Apply the player's half of a turn.
+
+        Returns (heals used, state before the swing lands, defending, swing
+        distribution or None when the action deals no damage).
+        """
+        hp, enemy_hp, intent, focus_cd, guard_cd, wind_cd, potions, bandages, barrier = state
+        max_hp = self.max_hp
+        heals = 0
+        defending = False
+        swings = None
+        if action == "read":
+            barrier = False
+        elif action == "wind":
+            hp = min(max_hp, hp + SECOND_WIND_HEAL)
+            wind_cd = SECOND_WIND_COOLDOWN
+        elif action == "potion":
+            hp = min(max_hp, hp + self.potion_heal)
+            potions -= 1
+            heals = 1
+        elif action == "bandage":
+            hp = min(max_hp, hp + self.bandage_heal)
+            bandages -= 1
+            heals = 1
+        elif action == "guard":
+            hp = min(max_hp, hp + GUARD_HEAL)
+            guard_cd = GUARD_COOLDOWN
+            defending = True
+        elif action == "defend":
+            defending = True
+        elif action == "focus":
+            focus_cd = FOCUS_COOLDOWN
+            if not barrier:
+                swings = self.focus
+        elif not barrier:
+            swings = self.strike
+        return heals, (hp, enemy_hp, intent, focus_cd, guard_cd, wind_cd, potions, bandages, barrier), defending, swings
+
+    def enemy_turn(self, state: CombatState, defending: bool) -> List[Tuple[float, CombatState]]:
+        """Surviving outcomes of the enemy's half of a turn (defeats are dropped)."""
+        hp, enemy_hp, intent, focus_cd, guard_cd, wind_cd, potions, bandages, barrier = state
+        curse = WITCH_CURSE if barrier else 0
+        hits = self.defended_hits[intent] if defending else self.hits[intent]
+        next_intent = (intent + 1) % self.intents
+        focus_cd, guard_cd, wind_cd = max(focus_cd - 1, 0), max(guard_cd - 1, 0), max(wind_cd - 1, 0)
+        return [
+            (chance, (hp - damage - curse, enemy_hp, next_intent, focus_cd, guard_cd, wind_cd, potions, bandages, barrier))
+            for damage, chance in hits
+            if hp - damage - curse > 0
+        ]
+
+    def resolve(self, state: CombatState, action: str) -> Tuple[int, List[Tuple[float, int]], Dict[CombatState, float]]:
+        """One full turn: (heals used, [(p, hp) wins], {next state: p})."""
+        heals, mid, defending, swings = self.act(state, action)
+        hp, enemy_hp = mid[0], mid[1]
+        wins: List[Tuple[float, int]] = []
+        nexts: Dict[CombatState, float] = {}
+        for damage, chance in swings or [(0, 1.0)]:
+            if enemy_hp - damage <= 0:
+                wins.append((chance, hp))
+                continue
+            for hit_chance, next_state in self.enemy_turn((hp, enemy_hp - damage, *mid[2:]), defending):
+                nexts[next_state] = nexts.get(next_state, 0.0) + chance * hit_chance
+        return heals, wins, nexts
+
+    def step(self, state: CombatState) -> Tuple[int, List[Tuple[float, int]], Dict[CombatState, float]]:
+        """One policy turn."""
+        return self.resolve(state, self.choose(state))
+
+    def phase_id(self, phase: Phase) -> int:
+        phase_id = self.phase_ids.get(phase)
+        if phase_id is None:
+            phase_id = self.phase_ids[phase] = len(self.phases)
+            self.phases.append(phase)
+        return phase_id
+
+    def key(self, state: CombatState) -> int:
+        """Memo key of `state`."""
+        if not 0 < state[1] < self.enemy_stride:
+            raise ValueError(f"Enemy HP out of range: {state[1]}")
+        return (self.phase_id(state[2:]) * self.enemy_stride + state[1]) * self.hp_stride + state[0]
+
+    def plan(self, phase_id: int, low: bool) -> tuple:
+        """The policy's turn from a phase, for HP at or below (`low`) or above the heal threshold.
+
+        Returns (heals used, HP healed, swing distribution or None, after-swing
+        tag, key offset of the phase after the enemy turn, curse, enemy hits).
+        `choose` and `act` only look at HP through the threshold and the heal.
+        """
+        phase = self.phases[phase_id]
+        hp = int(self.heal_threshold) if low else self.max_hp
+        heals, mid, defending, swings = self.act((0, 0, *phase), self.choose((hp, 0, *phase)))
+        intent, focus_cd, guard_cd, wind_cd, potions, bandages, barrier = mid[2:]
+        after = (
+            (intent + 1) % self.intents,
+            max(focus_cd - 1, 0),
+            max(guard_cd - 1, 0),
+            max(wind_cd - 1, 0),
+            potions,
+            bandages,
+            barrier,
+        )
+        plan = (
+            heals,
+            mid[0],
+            swings,
+            self.phase_id(mid[2:]) * 2 + defending,
+            self.phase_id(after) * self.enemy_stride * self.hp_stride,
+            WITCH_CURSE if barrier else 0,
+            self.defended_hits[intent] if defending else self.hits[intent],
+        )
+        self.plans[phase_id, low] = plan
+        return plan
+
+
+_PENDING = object()
+
+
+def _solve_acyclic(chain: CombatChain, root: CombatState) -> Tuple[float, float, float, float]:
+    # Memoized over both half-turns so each state fans out to at most six
+    # swing outcomes and each post-swing state to at most seven hits. Memo
+    # hits are checked inline because most edges land on solved states.
+    values, after_swing, plans, plan = chain.values, chain.after_swing, chain.plans, chain.plan
+    max_hp, threshold = chain.max_hp, chain.heal_threshold
+    hp_stride, enemy_stride = chain.hp_stride, chain.enemy_stride
+
+    def enemy(next_base: int, hp: int, hits: List[Tuple[int, float]]) -> Tuple[float, float, float, float]:
+        win = turns = hp_left = used = 0.0
+        for damage, chance in hits:
+            if hp <= damage:
+                break
+            next_key = next_base + hp - damage
+            solved = values.get(next_key) or value(next_key)
+            if solved is _PENDING:
+                raise ValueError(f"Combat chain against {chain.enemy_id} has a cycle at key {next_key}.")
+            next_win, next_turns, next_hp, next_used = solved  # type: ignore[misc]
+            win += chance * next_win
+            turns += chance * next_turns
+            hp_left += chance * next_hp
+            used += chance * next_used
+        return win, turns, hp_left, used
+
+    def value(key: int) -> Tuple[float, float, float, float]:
+        values[key] = _PENDING
+        hp = key % hp_stride
+        rest = key // hp_stride
+        enemy_hp = rest % enemy_stride
+        phase_id = rest // enemy_stride
+        low = hp <= threshold
+        heals, healed, swings, tag, next_offset, curse, hits = plans.get((phase_id, low)) or plan(phase_id, low)
+        if healed:
+            hp = min(max_hp, hp + healed)
+        if swings is None:
+            after_key = (tag * enemy_stride + enemy_hp) * hp_stride + hp
+            solved = after_swing.get(after_key)
+            if solved is None:
+                solved = after_swing[after_key] = enemy(next_offset + enemy_hp * hp_stride, hp - curse, hits)
+            win, turns, hp_left, used = solved
+        else:
+            win = turns = hp_left = used = 0.0
+            for damage, chance in swings:
+                if enemy_hp <= damage:
+                    win += chance
+                    hp_left += chance * hp
+                    continue
+                left = enemy_hp - damage
+                after_key = (tag * enemy_stride + left) * hp_stride + hp
+                solved = after_swing.get(after_key)
+                if solved is None:
+                    solved = after_swing[after_key] = enemy(next_offset + left * hp_stride, hp - curse, hits)
+                next_win, next_turns, next_hp, next_used = solved
+                win += chance * next_win
+                turns += chance * next_turns
+                hp_left += chance * next_hp
+                used += chance * next_used
+        result = (win, 1.0 + turns, hp_left, heals + used)
+        values[key] = result
+        return result
+
+    root_key = chain.key(root)
+    solved = values.get(root_key)
+    if solved is not None:
+        return solved  # type: ignore[return-value]
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 20_000))
+    try:
+        return value(root_key)
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def _solve_cyclic(chain: CombatChain, root: CombatState, tolerance: float = 1e-10) -> Tuple[float, float, float, float]:
+    """Value iteration for chains that can revisit a state (no wins possible)."""
+    solved = chain.values.get(chain.key(root))
+    if solved is not None:
+        return solved  # type: ignore[return-value]
+    transitions: Dict[CombatState, Tuple[int, Dict[CombatState, float]]] = {}
+    frontier = [root]
+    while frontier:
+        state = frontier.pop()
+        if state in transitions:
+            continue
+        heals, wins, nexts = chain.step(state)
+        if wins:
+            raise ValueError(f"Combat chain against {chain.enemy_id} is not a pure loss chain.")
+        transitions[state] = (heals, nexts)
+        frontier.extend(next_state for next_state in nexts if next_state not in transitions)
+
+    turns = {state: 0.0 for state in transitions}
+    used = {state: 0.0 for state in transitions}
+    while True:
+        delta = 0.0
+        for state, (heals, nexts) in transitions.items():
+            new_turns = 1.0 + sum(chance * turns[next_state] for next_state, chance in nexts.items())
+            new_used = heals + sum(chance * used[next_state] for next_state, chance in nexts.items())
+            delta = max(delta, abs(new_turns - turns[state]), abs(new_used - used[state]))
+            turns[state] = new_turns
+            used[state] = new_used
+        if delta < tolerance:
+            break
+    for state in transitions:
+        chain.values[chain.key(state)] = (0.0, turns[state], 0.0, used[state])
+    return chain.values[chain.key(root)]  # type: ignore[return-value]
+
+
+def _chain_build(build: Build) -> Build:
+    """The part of a build that shapes the chain; HP and consumables live in the state."""
+    return replace(build, name="", hp=None, potions=0, bandages=0)
+
+
+def combat_profile(enemy_id: str) -> tuple:
+    """Everything about an enemy that shapes its chain except max HP.
+
+    Enemy HP only falls, so one chain serves every enemy with the same
+    profile: a weaker variant's fight starts lower down the same states.
+    """
+    enemy = ENEMY_RECORDS[enemy_id]
+    intents = enemy.intents or (enemy.strike,)
+    return (
+        int(enemy.defense / 2),
+        tuple((intent.base_damage, intent.defend_multiplier) for intent in intents),
+        enemy_id == "king_makor",
+        enemy_id == "onyx_witch",
+    )
+
+
+@lru_cache(maxsize=None)
+def _profile_owner(profile: tuple) -> str:
+    """The first enemy with `profile`; its chain is shared by the rest."""
+    return next(enemy_id for enemy_id in ENEMIES if combat_profile(enemy_id) == profile)
+
+
+@lru_cache(maxsize=16)
+def _cached_chain(enemy_id: str, build: Build, policy: Policy) -> CombatChain:
+    return CombatChain(enemy_id, build, policy)
+
+
+def chain_for(enemy_id: str, build: Build, policy: Policy = Policy()) -> CombatChain:
+    """Shared chain (and its solved states) for this enemy's profile, build, and policy."""
+    if enemy_id not in ENEMIES:
+        raise KeyError(f"Unknown enemy: {enemy_id}")
+    return _cached_chain(_profile_owner(combat_profile(enemy_id)), _chain_build(build), policy)
+
+
+def state_value(chain: CombatChain, state: CombatState) -> Tuple[float, float, float, float]:
+    """(win, expected turns, expected HP left, expected heals) from `state` under the chain's policy."""
+    with _SOLVE_LOCK:
+        _trim(chain)
+        return _policy_value(chain, state)
+
+
+def _trim(chain: CombatChain) -> None:
+    """Drop the chain's memo once it outgrows CHAIN_STATE_LIMIT. Caller holds _SOLVE_LOCK."""
+    if len(chain.values) + len(chain.after_swing) > CHAIN_STATE_LIMIT:
+        chain.values.clear()
+        chain.after_swing.clear()
+
+
+def _policy_value(chain: CombatChain, state: CombatState) -> Tuple[float, float, float, float]:
+    """`state_value` without the lock or the trim, for callers valuing many states in one pass."""
+    if state[-1] and not chain.build.riddle:
+        return _solve_cyclic(chain, state)
+    return _solve_acyclic(chain, state)
+
+
+@lru_cache(maxsize=4096)
+def solve(enemy_id: str, build: Build, policy: Policy = Policy()) -> Odds:
+    """Exact win probability, expected turns, HP loss and heals for one fight.
+
+    The goblin army is solved from the point where the player chooses `fight`.
+    HP loss counts a defeat as losing all starting HP and ignores the victory
+    recovery heal.
+    """
+    chain = chain_for(enemy_id, build, policy)
+    known = len(chain.values)
+    win, turns, hp_left, used = state_value(chain, chain.start(build, ENEMY_RECORDS[enemy_id].hp))
+    solved = len(chain.values)
+    return Odds(
+        enemy_id=enemy_id,
+        build=build,
+        policy=policy,
+        win=win,
+        expected_turns=turns,
+        expected_hp_loss=build.start_hp - hp_left,
+        expected_heals=used,
+        states=solved - known if solved >= known else solved,
+    )
+
+
+ADVICE_ITEM_CAP = 3
+# States the advisor's value iteration expands per position; the rest take policy values.
+ADVICE_STATE_LIMIT = 100
+
+ACTION_COMMANDS = {
+    "fight": "fight",
+    "focus": "skill focus strike",
+    "defend": "defend",
+    "guard": "skill guard stance",
+    "wind": "skill second wind",
+    "potion": "use minor potion",
+    "bandage": "use sturdy bandage",
+    "read": "read goblin riddle",
+}
+
+_HEALING_ACTIONS = frozenset({"guard", "wind", "potion", "bandage"})
+
+
+@dataclass(frozen=True)
+class ActionOdds:
+    """Outcome of taking `action` now and playing the advisor's policy afterwards."""
+
+    action: str
+    command: str
+    win: float
+    expected_turns: float
+    expected_hp_left: float
+    expected_heals: float
+
+
+def advice_key(win: float, turns: float, heals: float) -> tuple:
+    """Sort key, largest best: win chance, then fewest heals, then fewest turns.
+
+    When nothing can win, surviving longer is better (more turns to run).
+    """
+    if win < 1e-9:
+        return (0.0, 0.0, turns)
+    return (round(win, 9), -round(heals, 9), -turns)
+
+
+def advice_actions(chain: CombatChain, state: CombatState) -> List[str]:
+    """`legal_actions` without healing at full HP: defending is never worse."""
+    actions = chain.legal_actions(state)
+    if state[0] >= chain.max_hp:
+        actions = [action for action in actions if action not in _HEALING_ACTIONS]
+    return actions
+
+
+# Per action: (action, heals used, win chance, win chance * HP left, [(next state, chance)]).
+_Row = Tuple[str, int, float, float, List[Tuple[CombatState, float]]]
+
+
+def _advice_rows(chain: CombatChain, state: CombatState) -> List[_Row]:
+    rows = []
+    for action in advice_actions(chain, state):
+        heals, wins, nexts = chain.resolve(state, action)
+        win = sum(chance for chance, _hp in wins)
+        hp_left = sum(chance * hp for chance, hp in wins)
+        rows.append((action, heals, win, hp_left, list(nexts.items())))
+    return rows
+
+
+def _row_value(row: _Row, values: Dict[CombatState, Tuple[float, float, float, float]]) -> Tuple[float, float, float, float]:
+    _action, heals, win, hp_left, nexts = row
+    turns = 1.0
+    used = float(heals)
+    for next_state, chance in nexts:
+        next_win, next_turns, next_hp, next_used = values[next_state]
+        win += chance * next_win
+        turns += chance * next_turns
+        hp_left += chance * next_hp
+        used += chance * next_used
+    return win, turns, hp_left, used
+
+
+def _best_value(rows: List[_Row], values: Dict[CombatState, Tuple[float, float, float, float]]) -> Tuple[float, float, float, float]:
+    best = None
+    best_key = None
+    for row in rows:
+        value = _row_value(row, values)
+        key = advice_key(value[0], value[1], value[3])
+        if best_key is None or key > best_key:
+            best, best_key = value, key
+    return best  # type: ignore[return-value]
+
+
+def rank_actions(
+    chain: CombatChain,
+    state: CombatState,
+    limit: int = ADVICE_STATE_LIMIT,
+    tolerance: float = 1e-10,
+) -> List[ActionOdds]:
+    """Every sensible action in `state`, best first by `advice_key`.
+
+    Value iteration over all legal actions (healing at full HP left out) on
+    the states reachable from `state`, expanded breadth first up to `limit`
+    of them; states past the limit are valued under the chain's fixed
+    policy. When the rest of the fight fits in `limit` states the ranking is
+    that of an optimal policy; otherwise it plays optimally for the next few
+    turns and then follows the policy, which is never worse than the policy.
+    Enemy HP never rises, so the states are solved one enemy-HP layer at a
+    time, lowest first; guard stance and second wind can cycle within a layer,
+    so each layer is swept until it settles.
+    """
+    with _SOLVE_LOCK:
+        rows: Dict[CombatState, List[_Row]] = {}
+        order = [state]
+        seen = {state}
+        for current in order:
+            if len(rows) >= limit:
+                break
+            rows[current] = current_rows = _advice_rows(chain, current)
+            for *_, nexts in current_rows:
+                for next_state, _chance in nexts:
+                    if next_state not in seen:
+                        seen.add(next_state)
+                        order.append(next_state)
+
+        # Trim once up front: clearing between frontier states would re-solve shared tails.
+        _trim(chain)
+        values: Dict[CombatState, Tuple[float, float, float, float]] = {
+            other: _policy_value(chain, other) for other in order if other not in rows
+        }
+        layers: Dict[int, List[CombatState]] = {}
+        for current in rows:
+            layers.setdefault(current[1], []).append(current)
+            values[current] = (0.0, 0.0, 0.0, 0.0)
+        for enemy_hp in sorted(layers):
+            layer = layers[enemy_hp]
+            while True:
+                delta = 0.0
+                for current in layer:
+                    new = _best_value(rows[current], values)
+                    old = values[current]
+                    delta = max(delta, abs(new[0] - old[0]), abs(new[1] - old[1]), abs(new[3] - old[3]))
+                    values[current] = new
+                if delta < tolerance:
+                    break
+
+        ranked = [
+            ActionOdds(row[0], ACTION_COMMANDS[row[0]], *_row_value(row, values)) for row in rows[state]
+        ]
+    ranked.sort(key=lambda odds: advice_key(odds.win, odds.expected_turns, odds.expected_heals), reverse=True)
+    return ranked
+
+
+def encounter_position(state: GameState) -> Optional[Tuple[str, Build, CombatState]]:
+    """(enemy id, build, chain state) for the live fight, or None outside combat.
+
+    During the goblin negotiation the position is the fight that `fight` starts.
+    """
+    encounter = state.active_encounter
+    if encounter is None:
+        return None
+    enemy = ENEMY_RECORDS[encounter.enemy_id]
+    build = Build.from_player(state.player)
+    if "ring_surge_active" in state.flags:
+        # The surge is already part of the effective stats.
+        build = replace(build, ring=False)
+    cooldowns = state.player.cooldowns
+    position = (
+        state.player.hp,
+        encounter.current_hp,
+        encounter.intent_index % max(1, len(enemy.intents)),
+        cooldowns.get("focus strike", 0),
+        cooldowns.get("guard stance", 0),
+        cooldowns.get("second wind", 0),
+        build.potions,
+        build.bandages,
+        encounter.witch_barrier_active,
+    )
+    return encounter.enemy_id, build, position
+
+
+def advise(state: GameState, policy: Policy = Policy(), item_cap: int = ADVICE_ITEM_CAP) -> List[ActionOdds]:
+    """Ranked combat actions for the live encounter (empty outside combat).
+
+    Potions and bandages beyond `item_cap` each are left out: every extra item
+    multiplies the states to solve, while the advice barely changes.
+    """
+    position = encounter_position(state)
+    if position is None:
+        return []
+    return list(advise_position(*position, policy, item_cap))
+
+
+def advise_position(
+    enemy_id: str,
+    build: Build,
+    combat_state: CombatState,
+    policy: Policy = Policy(),
+    item_cap: int = ADVICE_ITEM_CAP,
+) -> Tuple[ActionOdds, ...]:
+    """`advise` for an `encounter_position`, memoized.
+
+    Takes no GameState, so the game server solves it on a worker thread and
+    then runs the `advise` command on its event loop, which finds it cached.
+    """
+    potions, bandages = combat_state[6:8]
+    combat_state = (*combat_state[:6], min(potions, item_cap), min(bandages, item_cap), combat_state[8])
+    return _ranked(enemy_id, build, combat_state, policy)
+
+
+@lru_cache(maxsize=256)
+def _ranked(enemy_id: str, build: Build, combat_state: CombatState, policy: Policy) -> Tuple[ActionOdds, ...]:
+    return tuple(rank_actions(chain_for(enemy_id, build, policy), combat_state))
+
+
+def best_command(state: GameState, policy: Policy = Policy()) -> Optional[str]:
+    """Raw command for the top-ranked action, or None outside combat."""
+    ranked = advise(state, policy)
+    return ranked[0].command if ranked else None
+
+
+def _solve_many(jobs: List[Tuple[str, Build, Policy]]) -> List[Odds]:
+    """Solve jobs grouped by combat profile, so each shared chain is filled in one go."""
+    results: List[Optional[Odds]] = [None] * len(jobs)
+    for index in sorted(range(len(jobs)), key=lambda index: combat_profile(jobs[index][0])):
+        results[index] = solve(*jobs[index])
+    return results  # type: ignore[return-value]
+
+
+def solve_table(
+    levels: range,
+    policy: Policy = Policy(),
+    enemy_ids: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+) -> List[Odds]:
+    """Solve every enemy (default: all of ENEMIES) against `Build.for_level` at each level.
+
+    The fights are fanned out over `workers` processes (default: CPU count),
+    one task per (level, combat profile) so each shared chain stays in one process.
+    """
+    enemy_ids = enemy_ids or list(ENEMIES)
+    jobs = [(enemy_id, Build.for_level(level), policy) for level in levels for enemy_id in enemy_ids]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return _solve_many(jobs)
+    groups: Dict[tuple, List[int]] = {}
+    for index, (enemy_id, build, _policy) in enumerate(jobs):
+        groups.setdefault((build, combat_profile(enemy_id)), []).append(index)
+    tasks = list(groups.values())
+    results: List[Optional[Odds]] = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        batches = executor.map(_solve_many, [[jobs[index] for index in task] for task in tasks], chunksize=4)
+        for task, batch in zip(tasks, batches):
+            for index, odds in zip(task, batch):
+                results[index] = odds
+    return results  # type: ignore[return-value]
+
+
+DEFAULT_LEVELS = range(1, 21)
+
+
+def _parse_levels(text: str) -> range:
+    first, _, last = text.partition("-")
+    if not first.isdigit() or (last and not last.isdigit()):
+        raise argparse.ArgumentTypeError("Levels look like 5 or 1-20")
+    return range(int(first), int(last or first) + 1)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Exact combat odds for every enemy and level")
+    parser.add_argument(
+        "--levels", type=_parse_levels, default=DEFAULT_LEVELS, help="Level or range, e.g. 12-20 (default 1-20)."
+    )
+    parser.add_argument("--enemy", action="append", choices=sorted(ENEMIES), help="Enemy to solve (repeatable; default all).")
+    parser.add_argument("--heal-below", type=float, default=Policy.heal_below)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--verbose", action="store_true", help="Print every (level, enemy) row.")
+    args = parser.parse_args(argv)
+
+    policy = Policy(heal_below=args.heal_below)
+    started = time.perf_counter()
+    table = solve_table(args.levels, policy, args.enemy, args.workers)
+    elapsed = time.perf_counter() - started
+
+    for level in args.levels:
+        rows = [odds for odds in table if odds.build.name == f"level {level}"]
+        if args.verbose:
+            for odds in rows:
+                print(odds.summary())
+            continue
+        risky = [odds for odds in rows if odds.win < 0.99]
+        print(f"level {level:>2}: {len(rows) - len(risky)}/{len(rows)} enemies won at >= 99%")
+        for odds in sorted(risky, key=lambda item: item.win):
+            print(f"    {odds.enemy_id:<20} win {odds.win:8.4%}  turns {odds.expected_turns:6.2f}")
+    states = sum(odds.states for odds in table)
+    print(f"{len(table)} fights solved in {elapsed:.2f}s ({states:,} states)")
+
+
+if __name__ == "__main__":
+    main()
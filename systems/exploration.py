@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 
-from content.world import LOCATIONS, NPCS
+from content.compiled import LOCATION_RECORDS, LocationRecord
+from content.world import NPCS
+from game import names
 from game.state import GameState
 from systems import combat
 from systems.loot import ensure_core_skills
+from systems.sampling import weighted_pick
 
 
 DIRECTION_ALIASES = {
@@ -20,13 +23,13 @@ DIRECTION_ALIASES = {
 }
 
 
-def _location(state: GameState) -> dict:
-    return LOCATIONS[state.current_location_id]
+def _location(state: GameState) -> LocationRecord:
+    return LOCATION_RECORDS[state.current_location_id]
 
 
 def _describe_location(state: GameState) -> str:
     location = _location(state)
-    descriptions = location.get("descriptions", [])
+    descriptions = location.descriptions
     if not descriptions:
         return "You stand in a quiet place."
     return descriptions[state.turn_count % len(descriptions)]
@@ -34,7 +37,7 @@ def _describe_location(state: GameState) -> str:
 
 def _npc_names_for_location(location_id: str, state: GameState) -> List[str]:
     names: List[str] = []
-    for npc_id in LOCATIONS[location_id].get("npcs", []):
+    for npc_id in LOCATION_RECORDS[location_id].npcs:
         if npc_id == "elle" and "onyx_witch_defeated" not in state.flags:
             continue
         names.append(NPCS.get(npc_id, {}).get("name", npc_id))
@@ -44,11 +47,10 @@ def _npc_names_for_location(location_id: str, state: GameState) -> List[str]:
 def look(state: GameState) -> List[str]:
     """Return a full location look message."""
     location = _location(state)
-    exits = ", ".join(sorted(location.get("exits", {}).keys())) or "none"
     messages = [
-        f"{location['name']} [{location['area']}]",
+        f"{location.name} [{location.area}]",
         _describe_location(state),
-        f"Exits: {exits}",
+        f"Exits: {location.exit_list}",
     ]
     npc_names = _npc_names_for_location(state.current_location_id, state)
     if npc_names:
@@ -59,7 +61,7 @@ def look(state: GameState) -> List[str]:
 def sense(state: GameState) -> List[str]:
     """Return hint text for current area."""
     location = _location(state)
-    messages = [location.get("sense_hint", "Nothing unusual stands out.")]
+    messages = [location.sense_hint]
 
     if state.current_location_id == "old_shack" and "met_old_man" not in state.flags:
         messages.append("A patient voice waits inside. Maybe you should talk first.")
@@ -75,39 +77,16 @@ def sense(state: GameState) -> List[str]:
     return messages
 
 
-def _check_exit_requirement(state: GameState, requirement: dict) -> bool:
-    all_flags = requirement.get("all_flags", [])
-    any_flags = requirement.get("any_flags", [])
-    if all_flags and any(flag not in state.flags for flag in all_flags):
-        return False
-    if any_flags and all(flag not in state.flags for flag in any_flags):
-        return False
-    return True
-
-
-def _roll_random_enemy_id(state: GameState, encounters: list[tuple[str, int]]) -> Optional[str]:
-    if not encounters:
-        return None
-    total = sum(weight for _, weight in encounters)
-    if total <= 0:
-        return None
-    roll = state.rng.randint(1, total)
-    cursor = 0
-    selected_enemy = encounters[0][0]
-    for enemy_id, weight in encounters:
-        cursor += weight
-        if roll <= cursor:
-            selected_enemy = enemy_id
-            break
-    return selected_enemy
+def _roll_random_enemy_id(state: GameState, encounters: Sequence[Tuple[str, int]]) -> Optional[str]:
+    return weighted_pick(state.rng, encounters)
 
 
 def _maybe_spawn_random_encounter(state: GameState) -> List[str]:
     location = _location(state)
     if state.active_encounter:
         return []
-    chance = float(location.get("encounter_chance", 0.0))
-    encounters = location.get("encounters", [])
+    chance = location.encounter_chance
+    encounters = location.encounters
     if chance <= 0 or not encounters:
         return []
     if state.rng.random() >= chance:
@@ -119,9 +98,9 @@ def _maybe_spawn_random_encounter(state: GameState) -> List[str]:
     return combat.start_encounter(state, selected_enemy)
 
 
-def _requirements_met(state: GameState, location: dict) -> bool:
-    req_flags = location.get("boss_require_flags", [])
-    return all(flag in state.flags for flag in req_flags)
+def _requirements_met(state: GameState, location: LocationRecord) -> bool:
+    required = location.boss_require_mask
+    return (state.flags.mask & required) == required
 
 
 def _handle_entry_events(state: GameState) -> List[str]:
@@ -139,8 +118,8 @@ def _handle_entry_events(state: GameState) -> List[str]:
             messages.extend(combat.start_encounter(state, "king_makor"))
             return messages
 
-    boss_id = location.get("boss_id")
-    boss_flag = location.get("boss_flag")
+    boss_id = location.boss_id
+    boss_flag = location.boss_flag
     if boss_id and boss_flag not in state.flags and _requirements_met(state, location):
         messages.extend(combat.start_encounter(state, boss_id))
         return messages
@@ -157,16 +136,15 @@ def move(state: GameState, direction: str) -> List[str]:
     direction = direction.lower().strip()
     direction = DIRECTION_ALIASES.get(direction, direction)
 
-    location = _location(state)
-    exits = location.get("exits", {})
-    if direction not in exits:
+    exit_record = _location(state).exit(direction)
+    if exit_record is None:
         return [f"You cannot move {direction} from here."]
 
-    requirements = location.get("exit_requirements", {}).get(direction)
-    if requirements and not _check_exit_requirement(state, requirements):
-        return [requirements.get("message", "That path is blocked for now.")]
+    requirement = exit_record.requirement
+    if requirement is not None and not requirement.met(state.flags):
+        return [requirement.message]
 
-    state.current_location_id = exits[direction]
+    state.current_location_id = exit_record.target
     state.turn_count += 1
     state.discovered_locations.add(state.current_location_id)
 
@@ -180,8 +158,7 @@ def hunt(state: GameState) -> List[str]:
     if state.active_encounter:
         return ["You are already in an encounter."]
 
-    location = _location(state)
-    encounters = location.get("encounters", [])
+    encounters = _location(state).encounters
     if not encounters:
         return ["No roaming creatures can be hunted here right now."]
 
@@ -194,18 +171,18 @@ def hunt(state: GameState) -> List[str]:
     return messages
 
 
-def _npc_id_from_query(state: GameState, query: str) -> Optional[str]:
-    query = query.lower().strip()
-    location = _location(state)
-    for npc_id in location.get("npcs", []):
-        npc = NPCS.get(npc_id, {})
-        if npc_id == "elle" and "onyx_witch_defeated" not in state.flags:
-            continue
-        if query in {npc_id, npc.get("name", "").lower()}:
-            return npc_id
-        if query and query in npc.get("name", "").lower():
-            return npc_id
-    return None
+def visible_npc_ids(state: GameState) -> List[str]:
+    """NPCs at the current location that can be addressed right now."""
+    return [
+        npc_id
+        for npc_id in _location(state).npcs
+        if npc_id != "elle" or "onyx_witch_defeated" in state.flags
+    ]
+
+
+def find_npc_id_by_query(state: GameState, query: str) -> Optional[str]:
+    """Find a visible NPC by id or fuzzy name."""
+    return names.NPC_INDEX.resolve(query.lower().strip(), visible_npc_ids(state))
 
 
 def talk(state: GameState, npc_query: str) -> List[str]:
@@ -213,9 +190,10 @@ def talk(state: GameState, npc_query: str) -> List[str]:
     if state.active_encounter:
         return ["You cannot talk while fighting."]
 
-    npc_id = _npc_id_from_query(state, npc_query)
+    npc_id = find_npc_id_by_query(state, npc_query)
     if not npc_id:
-        return [f"No one named '{npc_query}' is here."]
+        suggestions = names.NPC_INDEX.suggest(npc_query, visible_npc_ids(state))
+        return [f"No one named '{npc_query}' is here.{names.did_you_mean(suggestions)}"]
 
     npc = NPCS[npc_id]
     messages: List[str] = []
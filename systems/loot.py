@@ -4,9 +4,10 @@ from __future__ import annotations
 
 from typing import List, Optional, Tuple
 
-from content.enemies import ENEMIES, RARITY_TABLES
-from content.items import EQUIPMENT_SLOT_BY_TYPE, ITEMS
-from content.world import LOCATIONS
+from content import compiled
+from content.compiled import ENEMY_RECORDS, ITEM_RECORDS, LOCATION_RECORDS
+from content.enemies import RARITY_TABLES
+from game import names
 from game.state import (
     GameState,
     add_item,
@@ -17,25 +18,15 @@ from game.state import (
     heal_player,
     remove_item,
 )
+from systems.sampling import weighted_pick
 
 
-def _weighted_pick(rng, weighted_items: list[tuple[str, int]]) -> Optional[str]:
-    if not weighted_items:
-        return None
-    total = sum(max(0, weight) for _, weight in weighted_items)
-    if total <= 0:
-        return None
-    roll = rng.randint(1, total)
-    cursor = 0
-    for item_id, weight in weighted_items:
-        cursor += max(0, weight)
-        if roll <= cursor:
-            return item_id
-    return weighted_items[-1][0]
+def _item_name(item_id: str) -> str:
+    return compiled.item(item_id).name
 
 
-def _item_name(item_id: str) -> str:
-    return ITEMS.get(item_id, {}).get("name", item_id)
+def _owned_suggestions(state: GameState, item_query: str) -> str:
+    return names.did_you_mean(names.ITEM_INDEX.suggest(item_query, state.player.inventory))
 
 
 def _grant_healing_supplies(state: GameState) -> str:
@@ -64,59 +55,52 @@ def _item_power_tuple(item_id: Optional[str]) -> tuple[float, int, int, int, int
     """Comparable combat value tuple for best-in-slot selection."""
     if not item_id:
         return (-9999.0, -9999, -9999, -9999, -9999)
-    item = ITEMS.get(item_id, {})
-    attack = int(item.get("attack_bonus", 0))
-    defense = int(item.get("defense_bonus", 0))
-    max_hp = int(item.get("max_hp_bonus", 0))
-    value = int(item.get("value", 0))
-    # Normalize HP into "stat points" using the same 3 HP ~= 1 training point convention.
-    normalized = attack + defense + (max_hp / 3.0)
-    return (normalized, attack, defense, max_hp, value)
+    return compiled.item(item_id).power
 
 
 def grant_rewards(state: GameState, enemy_id: str) -> List[str]:
     """Grant xp, gold, skill points, and drops for a defeated enemy."""
-    enemy = ENEMIES[enemy_id]
-    location = LOCATIONS.get(state.current_location_id, {})
+    enemy = ENEMY_RECORDS[enemy_id]
+    location = LOCATION_RECORDS.get(state.current_location_id)
+    skill_density = location.skill_points_per_kill if location else 0
     messages: List[str] = []
 
-    messages.extend(award_xp(state.player, int(enemy.get("xp_reward", 0))))
+    messages.extend(award_xp(state.player, enemy.xp_reward))
 
-    gold_reward = int(enemy.get("gold_reward", 0))
+    gold_reward = enemy.gold_reward
     if gold_reward:
         state.player.gold += gold_reward
         messages.append(f"You gain {gold_reward} gold.")
 
-    skill_reward = int(enemy.get("skill_points_reward", 0))
-    if enemy.get("category") == "normal":
-        skill_reward += int(location.get("skill_points_per_kill", 0))
+    skill_reward = enemy.skill_points_reward
+    if enemy.is_normal:
+        skill_reward += skill_density
     if skill_reward:
         state.player.skill_points += skill_reward
         messages.append(f"You gain {skill_reward} skill points.")
 
     messages.append(_grant_healing_supplies(state))
 
-    drops: List[str] = list(enemy.get("guaranteed_drops", []))
+    drops: List[str] = list(enemy.guaranteed_drops)
 
-    loot_table = enemy.get("loot_table", [])
-    drop_chance = 0.45 if enemy.get("category") == "normal" else 0.7
+    loot_table = enemy.loot_table
+    drop_chance = 0.45 if enemy.is_normal else 0.7
     if loot_table and state.rng.random() < drop_chance:
-        rolled = _weighted_pick(state.rng, loot_table)
+        rolled = weighted_pick(state.rng, loot_table)
         if rolled:
             drops.append(rolled)
 
-    if enemy.get("category") == "normal":
-        skill_density = int(location.get("skill_points_per_kill", 0))
+    if enemy.is_normal:
         interesting_chance = min(0.14 + (skill_density * 0.01), 0.28)
         rare_chance = min(0.07 + (skill_density * 0.01), 0.2)
 
         if state.rng.random() < interesting_chance:
-            interesting_roll = _weighted_pick(state.rng, RARITY_TABLES.get("interesting_gear", []))
+            interesting_roll = weighted_pick(state.rng, RARITY_TABLES.get("interesting_gear", []))
             if interesting_roll:
                 drops.append(interesting_roll)
 
         if state.rng.random() < rare_chance:
-            rare_roll = _weighted_pick(state.rng, RARITY_TABLES.get("common_field", []))
+            rare_roll = weighted_pick(state.rng, RARITY_TABLES.get("common_field", []))
             if rare_roll:
                 drops.append(rare_roll)
 
@@ -127,9 +111,9 @@ def grant_rewards(state: GameState, enemy_id: str) -> List[str]:
         if item_id in seen:
             continue
         seen.add(item_id)
-        item = ITEMS.get(item_id, {})
-        if item.get("type") == "boon":
-            bonus = int(item.get("skill_points_bonus", 0))
+        item = compiled.item(item_id)
+        if item.type == "boon":
+            bonus = item.skill_points_bonus
             if bonus:
                 state.player.skill_points += bonus
                 messages.append(f"Rare boon found: {_item_name(item_id)} grants {bonus} skill points.")
@@ -144,22 +128,22 @@ def equip_item(state: GameState, item_query: str) -> List[str]:
     """Equip an owned item into its slot."""
     item_id = find_item_id_by_query(state.player, item_query)
     if not item_id:
-        return [f"You do not have '{item_query}'."]
+        return [f"You do not have '{item_query}'.{_owned_suggestions(state, item_query)}"]
 
-    item = ITEMS.get(item_id)
+    item = ITEM_RECORDS.get(item_id)
     if not item:
         return ["That item cannot be equipped."]
 
-    slot = EQUIPMENT_SLOT_BY_TYPE.get(item.get("type", ""))
+    slot = item.slot
     if not slot:
-        return [f"{item.get('name', item_id)} is not equippable."]
+        return [f"{item.name} is not equippable."]
 
     previous = state.player.equipment.get(slot)
-    state.player.equipment[slot] = item_id
+    state.player.equip(slot, item_id)
     clamp_player_hp(state.player)
     if previous and previous != item_id:
-        return [f"You equip {item['name']} and unequip {_item_name(previous)}."]
-    return [f"You equip {item['name']}."]
+        return [f"You equip {item.name} and unequip {_item_name(previous)}."]
+    return [f"You equip {item.name}."]
 
 
 def equip_best_available(state: GameState) -> List[str]:
@@ -167,7 +151,7 @@ def equip_best_available(state: GameState) -> List[str]:
     equippable_owned = [
         item_id
         for item_id in state.player.inventory
-        if EQUIPMENT_SLOT_BY_TYPE.get(ITEMS.get(item_id, {}).get("type", "")) is not None
+        if compiled.item(item_id).slot is not None
     ]
     if not equippable_owned:
         return ["You have no equippable items in your inventory."]
@@ -179,9 +163,7 @@ def equip_best_available(state: GameState) -> List[str]:
         best_score = _item_power_tuple(current_id)
 
         for item_id in equippable_owned:
-            item = ITEMS.get(item_id, {})
-            item_slot = EQUIPMENT_SLOT_BY_TYPE.get(item.get("type", ""))
-            if item_slot != slot:
+            if compiled.item(item_id).slot != slot:
                 continue
             score = _item_power_tuple(item_id)
             if score > best_score:
@@ -189,7 +171,7 @@ def equip_best_available(state: GameState) -> List[str]:
                 best_score = score
 
         if best_id and best_id != current_id:
-            state.player.equipment[slot] = best_id
+            state.player.equip(slot, best_id)
             if current_id:
                 changes.append(f"{slot}: {_item_name(current_id)} -> {_item_name(best_id)}")
             else:
@@ -213,24 +195,24 @@ def use_item(
     """Use an item. Returns (messages, consumes_turn)."""
     item_id = find_item_id_by_query(state.player, item_query)
     if not item_id:
-        return ([f"You do not have '{item_query}'."], False)
+        return ([f"You do not have '{item_query}'.{_owned_suggestions(state, item_query)}"], False)
 
-    item = ITEMS.get(item_id, {})
-    item_type = item.get("type")
+    item = compiled.item(item_id)
+    item_type = item.type
     messages: List[str] = []
 
     if item_type == "consumable":
-        healed = heal_player(state.player, int(item.get("heal_amount", 0)))
+        healed = heal_player(state.player, item.heal_amount)
         remove_item(state.player, item_id, 1)
-        messages.append(f"You use {item['name']} and recover {healed} HP.")
+        messages.append(f"You use {item.name} and recover {healed} HP.")
         return messages, True
 
     if item_id == "mysterious_ring":
         if "ring_surge_active" in state.flags:
             return ["The ring is quiet for now."], False
         state.flags.add("ring_surge_active")
-        state.player.temporary_bonuses["attack"] = state.player.temporary_bonuses.get("attack", 0) + 4
-        state.player.temporary_bonuses["defense"] = state.player.temporary_bonuses.get("defense", 0) + 2
+        state.player.add_temporary_bonus("attack", 4)
+        state.player.add_temporary_bonus("defense", 2)
         messages.append("You rub the ring. Power floods your limbs.")
         return messages, True
 
@@ -280,7 +262,7 @@ def use_item(
         return messages, False
 
     if item_type in {"key", "quest", "aura", "weapon", "armor", "shield", "accessory"}:
-        return [f"{item.get('name', item_id)} cannot be directly used right now."], False
+        return [f"{item.name} cannot be directly used right now."], False
 
     return ["Nothing happens."], False
 
@@ -290,12 +272,8 @@ def clear_ring_surge(state: GameState) -> None:
     if "ring_surge_active" not in state.flags:
         return
     state.flags.discard("ring_surge_active")
-    state.player.temporary_bonuses["attack"] = state.player.temporary_bonuses.get("attack", 0) - 4
-    state.player.temporary_bonuses["defense"] = state.player.temporary_bonuses.get("defense", 0) - 2
-    if state.player.temporary_bonuses["attack"] == 0:
-        state.player.temporary_bonuses.pop("attack", None)
-    if state.player.temporary_bonuses["defense"] == 0:
-        state.player.temporary_bonuses.pop("defense", None)
+    state.player.add_temporary_bonus("attack", -4)
+    state.player.add_temporary_bonus("defense", -2)
 
 
 def train_skill(state: GameState, skill_name: str, amount: int) -> List[str]:
@@ -1,34 +1,83 @@
-"""Quest stage tracking and progression checks."""
+"""Quest stage tracking and progression checks.
+
+The main quest is a chain of stages (`QUEST_ORDER`); each stage lists the flags
+(`completed_by`, any one of them) that finish it. Stages are compiled into a
+graph whose transitions are indexed by flag bit. Flag changes are the events:
+`check_and_advance` takes the bits changed since the last turn from
+`state.flags` and only evaluates the transitions those bits trigger. Turns that
+change no quest flag return immediately.
+"""
 
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, List, Tuple
 
-from content.quests import QUEST_STAGES
+import content
+from content.quests import QUEST_ORDER, QUEST_STAGES
+from game.flags import bit, mask_of
 from game.state import GameState
 
 
+# (stage, completion mask) in story order; the last stage has mask 0.
+_STAGE_GATES: Tuple[Tuple[str, int], ...] = ()
+_STAGE_POSITION: Dict[str, int] = {}
+# Flag bit -> position of the earliest stage that flag completes.
+_TRIGGERS: Dict[int, int] = {}
+_TRIGGER_MASK = 0
+
+
+def build_graph() -> None:
+    """Compile the stage graph and the flag trigger index from content."""
+    global _STAGE_GATES, _TRIGGER_MASK
+    gates = []
+    triggers: Dict[int, int] = {}
+    trigger_mask = 0
+    for position, stage in enumerate(QUEST_ORDER):
+        done_flags = QUEST_STAGES[stage].get("completed_by", [])
+        gates.append((stage, mask_of(done_flags)))
+        for flag in done_flags:
+            triggers.setdefault(bit(flag), position)
+            trigger_mask |= bit(flag)
+    _STAGE_GATES = tuple(gates)
+    _STAGE_POSITION.clear()
+    _STAGE_POSITION.update((stage, position) for position, stage in enumerate(QUEST_ORDER))
+    _TRIGGERS.clear()
+    _TRIGGERS.update(triggers)
+    _TRIGGER_MASK = trigger_mask
+
+
+build_graph()
+content.add_reload_hook(build_graph)
+
+
+def _stage_from(mask: int, position: int) -> str:
+    """Follow completed transitions from `position` to the first open stage."""
+    gates = _STAGE_GATES
+    while position < len(gates) - 1 and mask & gates[position][1]:
+        position += 1
+    return gates[position][0]
+
+
 def _determine_stage(state: GameState) -> str:
-    if "met_old_man" not in state.flags:
-        return "awakening"
-    if "frog_defeated" not in state.flags:
-        return "swamp_secret"
-    if "dragon_defeated" not in state.flags:
-        return "mountain_flame"
-    if "goblin_army_defeated" not in state.flags and "goblin_pass_granted" not in state.flags:
-        return "castle_road"
-    if "makor_defeated" not in state.flags:
-        return "black_hall"
-    if "onyx_witch_defeated" not in state.flags:
-        return "witch_bane"
-    if "elle_cleansed" not in state.flags:
-        return "rescue_elle"
-    return "homecoming"
+    """The stage implied by the flags alone, walking the whole chain."""
+    return _stage_from(state.flags.mask, 0)
 
 
 def check_and_advance(state: GameState) -> List[str]:
-    """Advance quest stage based on current flags."""
-    new_stage = _determine_stage(state)
+    """Advance quest stage for the flags changed since the last call."""
+    flags = state.flags
+    if not flags.changed & _TRIGGER_MASK:
+        return []
+    changed = flags.take_changes() & _TRIGGER_MASK
+
+    # Stages after the current one are re-checked when the chain reaches
+    # them, so only changes at or before the current stage matter now.
+    position = _STAGE_POSITION.get(state.quest_stage, 0)
+    while changed:
+        low = changed & -changed
+        position = min(position, _TRIGGERS[low])
+        changed ^= low
+    new_stage = _stage_from(state.flags.mask, position)
     if new_stage == state.quest_stage:
         return []
 
@@ -45,4 +94,3 @@ def check_and_advance(state: GameState) -> List[str]:
 def get_current_objective(state: GameState) -> dict:
     """Return the active quest stage object."""
     return QUEST_STAGES[state.quest_stage]
-
@@ -0,0 +1,140 @@
+"""Precomputed next-hop routing over the world graph.
+
+Only the flags named in exit requirements can change which exits are open,
+so the graph is compiled once per distinct set of those flags (the "relevant
+flag mask"), plus once with every lock ignored. Next-hop tables are filled in
+per target with a single reverse BFS and then answer every start location with
+a dictionary lookup. Memory grows with targets actually asked about, not with
+locations squared, so worlds with thousands of locations stay cheap.
+
+Routes match a forward BFS that expands exits in content order: the chosen
+first step is the earliest exit that lies on some shortest path.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import AbstractSet, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+import content
+from content.compiled import LOCATION_RECORDS, LocationRecord
+from game.flags import flags_mask, mask_of, names_of
+
+
+UNLOCKED = None
+
+
+def relevant_flags(locations: Mapping[str, LocationRecord]) -> Tuple[str, ...]:
+    """Every flag that some exit requirement looks at, sorted."""
+    found = set()
+    for location in locations.values():
+        for exit_record in location.exits:
+            if exit_record.requirement is not None:
+                found.update(exit_record.requirement.all_flags)
+                found.update(exit_record.requirement.any_flags)
+    return tuple(sorted(found))
+
+
+class RoutingIndex:
+    """Open exits for one flag mask and lazily built next-hop tables per target."""
+
+    __slots__ = ("exits", "incoming", "_next_hop")
+
+    def __init__(self, locations: Mapping[str, LocationRecord], mask: Optional[FrozenSet[str]]):
+        self.exits: Dict[str, List[Tuple[str, str]]] = {}
+        self.incoming: Dict[str, List[str]] = {}
+        for location_id, location in locations.items():
+            open_exits: List[Tuple[str, str]] = []
+            for exit_record in location.exits:
+                requirement = exit_record.requirement
+                if mask is not UNLOCKED and requirement is not None and not requirement.met(mask):
+                    continue
+                open_exits.append((exit_record.direction, exit_record.target))
+                self.incoming.setdefault(exit_record.target, []).append(location_id)
+            self.exits[location_id] = open_exits
+        self._next_hop: Dict[str, Dict[str, Tuple[str, str]]] = {}
+
+    def next_hops(self, target_id: str) -> Dict[str, Tuple[str, str]]:
+        """Map of start location -> (direction, next location) toward `target_id`."""
+        table = self._next_hop.get(target_id)
+        if table is not None:
+            return table
+
+        distance = {target_id: 0}
+        frontier = deque([target_id])
+        while frontier:
+            location_id = frontier.popleft()
+            step = distance[location_id] + 1
+            for previous_id in self.incoming.get(location_id, ()):
+                if previous_id not in distance:
+                    distance[previous_id] = step
+                    frontier.append(previous_id)
+
+        table = {}
+        for location_id, steps in distance.items():
+            if steps == 0:
+                continue
+            for hop in self.exits.get(location_id, ()):
+                if distance.get(hop[1]) == steps - 1:
+                    table[location_id] = hop
+                    break
+        self._next_hop[target_id] = table
+        return table
+
+    def next_step(self, start_id: str, target_id: str) -> Optional[str]:
+        """First direction from `start_id` to `target_id`; None if here already or unreachable."""
+        hop = self.next_hops(target_id).get(start_id)
+        return hop[0] if hop else None
+
+    def path(self, start_id: str, target_id: str) -> Optional[List[str]]:
+        """Full shortest list of directions, [] when already there, None when unreachable."""
+        hops = self.next_hops(target_id)
+        directions: List[str] = []
+        location_id = start_id
+        while location_id != target_id:
+            hop = hops.get(location_id)
+            if hop is None:
+                return None
+            directions.append(hop[0])
+            location_id = hop[1]
+        return directions
+
+
+_RELEVANT_MASK = 0
+_INDEXES: Dict[Optional[int], RoutingIndex] = {}
+
+
+def route_mask(flags: AbstractSet[str]) -> int:
+    """Bitmask (see `game.flags`) of the flags in `flags` that can open or close exits."""
+    return flags_mask(flags) & _RELEVANT_MASK
+
+
+def index_for(flags: AbstractSet[str], respect_locks: bool = True) -> RoutingIndex:
+    """Routing index for the current world under `flags` (or ignoring locks)."""
+    mask = route_mask(flags) if respect_locks else UNLOCKED
+    index = _INDEXES.get(mask)
+    if index is None:
+        index = RoutingIndex(LOCATION_RECORDS, UNLOCKED if mask is UNLOCKED else names_of(mask))
+        _INDEXES[mask] = index
+    return index
+
+
+def next_step(flags: AbstractSet[str], start_id: str, target_id: str, respect_locks: bool = True) -> Optional[str]:
+    """First direction of a shortest route; None if already there or no route exists."""
+    return index_for(flags, respect_locks).next_step(start_id, target_id)
+
+
+def path(flags: AbstractSet[str], start_id: str, target_id: str, respect_locks: bool = True) -> Optional[List[str]]:
+    """Shortest list of directions between two locations."""
+    return index_for(flags, respect_locks).path(start_id, target_id)
+
+
+def rebuild() -> None:
+    """Drop compiled indexes after the world changes."""
+    global _RELEVANT_MASK
+    _RELEVANT_MASK = mask_of(relevant_flags(LOCATION_RECORDS))
+    _INDEXES.clear()
+
+
+rebuild()
+content.add_reload_hook(rebuild)
@@ -0,0 +1,91 @@
+"""Constant-time weighted sampling for encounter and loot tables.
+
+Every weighted table in content is compiled once into a `WeightedTable`.
+Sampling keeps the original draw, `rng.randint(1, total)`, so seeds, saves,
+and journals replay exactly as before; only the lookup changes. Tables with
+small integer totals (all current content) use a dense roll -> id array for an
+O(1) lookup; very large totals fall back to a binary search over cumulative
+weights.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import content
+from content.compiled import ENEMY_LIST, LOCATION_LIST
+from content.enemies import AREA_ENCOUNTER_TABLES, RARITY_TABLES
+
+
+DENSE_LIMIT = 4096
+
+
+class WeightedTable:
+    """Precompiled weighted choice over (id, weight) pairs; weights below 0 count as 0."""
+
+    __slots__ = ("source", "total", "_dense", "_cumulative", "_ids")
+
+    def __init__(self, weighted_items: Sequence[Tuple[str, int]]):
+        self.source = weighted_items
+        ids = [item_id for item_id, _ in weighted_items]
+        weights = [max(0, int(weight)) for _, weight in weighted_items]
+        self.total = sum(weights)
+        self._ids = ids
+        self._cumulative: List[int] = list(accumulate(weights))
+        self._dense: Optional[Tuple[str, ...]] = None
+        if 0 < self.total <= DENSE_LIMIT:
+            dense: List[str] = []
+            for item_id, weight in zip(ids, weights):
+                dense.extend([item_id] * weight)
+            self._dense = tuple(dense)
+
+    def pick(self, rng) -> Optional[str]:
+        """Draw one id with a single `rng.randint(1, total)`; None for empty tables."""
+        if self.total <= 0:
+            return None
+        roll = rng.randint(1, self.total)
+        if self._dense is not None:
+            return self._dense[roll - 1]
+        return self._ids[bisect_left(self._cumulative, roll)]
+
+
+# Only the content tables `build_tables` compiles belong here, keyed by the
+# id of the content sequence (each entry keeps its source alive, so the id
+# cannot be reused). Anything else is compiled per call and never cached, so
+# callers passing temporary lists cannot grow it.
+_TABLES: Dict[int, WeightedTable] = {}
+
+
+def table_for(weighted_items: Sequence[Tuple[str, int]]) -> WeightedTable:
+    """Compiled table for a content list; other sequences get a fresh, uncached table."""
+    table = _TABLES.get(id(weighted_items))
+    if table is None or table.source is not weighted_items:
+        return WeightedTable(weighted_items)
+    return table
+
+
+def weighted_pick(rng, weighted_items: Sequence[Tuple[str, int]]) -> Optional[str]:
+    """Pick an id from (id, weight) pairs in constant time."""
+    if not weighted_items:
+        return None
+    return table_for(weighted_items).pick(rng)
+
+
+def build_tables() -> None:
+    """Compile every encounter, loot, and rarity table in content."""
+    _TABLES.clear()
+    sources: List[Sequence[Tuple[str, int]]] = [
+        *AREA_ENCOUNTER_TABLES.values(),
+        *RARITY_TABLES.values(),
+        *(enemy.loot_table for enemy in ENEMY_LIST),
+        *(location.encounters for location in LOCATION_LIST),
+    ]
+    for weighted_items in sources:
+        if weighted_items:
+            _TABLES[id(weighted_items)] = WeightedTable(weighted_items)
+
+
+build_tables()
+content.add_reload_hook(build_tables)
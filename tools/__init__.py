@@ -0,0 +1 @@
+"""Developer tools, load tests, and benchmarks for byte_world_ai."""
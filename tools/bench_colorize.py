@@ -0,0 +1,118 @@
+"""Check and time the single-pass name colorizer against per-category painting.
+
+Records every line the UI colorizes while story bots play full runs through
+`Engine.process_raw_command` (combat logs, action menus, map and status
+screens), adds `--fuzz` synthetic lines that pack names together with mixed
+case and separators, and checks `ui._colorize_single_pass` returns the same
+bytes as painting one category at a time. Then times both, plus the
+line-cached `ui._colorize_interactables` on the recorded log.
+
+    python -m tools.bench_colorize --runs 4 --fuzz 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from typing import Callable, List, Optional
+
+os.environ.setdefault("BYTE_WORLD_AI_FORCE_COLOR", "1")
+
+from game import ui
+from game.engine import Engine
+from game.state import create_initial_state
+from sim.bots import StoryBot, StoryBotOptions
+
+
+SEPARATORS = [" ", " ", ", ", "'s ", "", "-", " (", ") ", ". ", ": ", "_", "\n"]
+
+
+def record_play_lines(runs: int, max_turns: int) -> List[str]:
+    """Lines passed to the colorizer while story bots play `runs` seeds."""
+    lines: List[str] = []
+    original = ui._colorize_interactables
+
+    def record(text: str) -> str:
+        lines.append(text)
+        return original(text)
+
+    ui._colorize_interactables = record
+    try:
+        engine = Engine(output_fn=lambda _text: None)
+        for seed in range(runs):
+            state = create_initial_state(seed=seed)
+            bot = StoryBot(StoryBotOptions(goblins=("fight", "joke", "bribe")[seed % 3], ogre=seed % 2 == 1))
+            engine.initial_screen(state)
+            for _ in range(max_turns):
+                if state.victory or state.game_over:
+                    break
+                engine.process_raw_command(state, bot.next_command(state, None))
+    finally:
+        ui._colorize_interactables = original
+    return lines
+
+
+def fuzz_lines(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    names = sorted(ui._NAME_STYLES)
+    words = [*names, *(name.split(" ")[0] for name in names), *(name.split(" ")[-1] for name in names), "the", "a", "x"]
+    lines: List[str] = []
+    for _ in range(count):
+        parts: List[str] = []
+        for _ in range(rng.randint(1, 6)):
+            word = rng.choice(words)
+            style = rng.random()
+            if style < 0.3:
+                word = word.title()
+            elif style < 0.4:
+                word = word.upper()
+            parts.append(word)
+            parts.append(rng.choice(SEPARATORS))
+        lines.append("".join(parts))
+    return lines
+
+
+def _time(colorize: Callable[[str], str], lines: List[str], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            colorize(line)
+    return (time.perf_counter() - started) / (repeat * len(lines))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass colorizer")
+    parser.add_argument("--runs", type=int, default=4, help="Story-bot playthroughs to record.")
+    parser.add_argument("--max-turns", type=int, default=3000)
+    parser.add_argument("--fuzz", type=int, default=50000, help="Synthetic lines for the identity check.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if ui.output_mode() == ui.OUTPUT_PLAIN:
+        raise SystemExit("Color is disabled (NO_COLOR is set); nothing to compare.")
+
+    play = record_play_lines(args.runs, args.max_turns)
+    fuzz = fuzz_lines(args.fuzz, args.seed)
+    mismatches = [line for line in [*play, *fuzz] if ui._colorize_single_pass(line) != ui._colorize_by_category(line)]
+
+    per_category = _time(ui._colorize_by_category, play, args.repeat)
+    single = _time(ui._colorize_single_pass, play, args.repeat)
+    ui._colorize_interactables.cache_clear()
+    cached = _time(ui._colorize_interactables, play, args.repeat)
+    info = ui._colorize_interactables.cache_info()
+
+    print(f"recorded {len(play)} lines ({len(set(play))} distinct) from {args.runs} playthroughs, {len(fuzz)} fuzz lines")
+    print(f"per category: {per_category * 1e6:7.2f} us/line")
+    print(f"single pass:  {single * 1e6:7.2f} us/line  ({per_category / single:.1f}x)")
+    print(f"cached:       {cached * 1e6:7.2f} us/line  ({per_category / cached:.1f}x, hit rate {info.hits / max(1, info.hits + info.misses):.0%})")
+    print(f"byte-identical: {'yes' if not mismatches else f'NO ({len(mismatches)} lines differ)'}")
+    for line in mismatches[:5]:
+        print(f"  {line!r}")
+    raise SystemExit(0 if not mismatches else 1)
+
+
+if __name__ == "__main__":
+    main()
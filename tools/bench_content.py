@@ -0,0 +1,129 @@
+"""Compare raw content-dict lookups with the compiled content records.
+
+Replays the per-turn reads the systems modules make (enemy stats and intents,
+item bonuses for effective stats and best-in-slot, location exits and
+encounter tables) against the raw `content/*` dicts, the way they were written
+before `content.compiled`, and against the compiled records. Checks both give
+the same values, then times them and measures what each form of the tables
+costs in memory.
+
+    python -m tools.bench_content --rounds 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+from content import compiled
+from content.enemies import ENEMIES
+from content.items import EQUIPMENT_SLOT_BY_TYPE, ITEMS
+from content.world import LOCATIONS
+
+
+def raw_reads() -> List[tuple]:
+    out: List[tuple] = []
+    for enemy_id, enemy in ENEMIES.items():
+        intents = enemy.get("intents", []) or [{"base_damage": int(enemy.get("attack", 1)), "defend_multiplier": 0.5}]
+        for intent in intents:
+            out.append((
+                enemy_id,
+                int(enemy["hp"]),
+                int(enemy.get("defense", 0) / 2),
+                int(intent.get("base_damage", enemy.get("attack", 1))),
+                float(intent.get("defend_multiplier", 0.5)),
+                enemy.get("category") == "normal",
+                int(enemy.get("xp_reward", 0)),
+                len(enemy.get("loot_table", [])),
+            ))
+    for item_id in ITEMS:
+        item = ITEMS.get(item_id, {})
+        out.append((
+            item_id,
+            int(item.get("attack_bonus", 0)),
+            int(item.get("defense_bonus", 0)),
+            int(item.get("max_hp_bonus", 0)),
+            EQUIPMENT_SLOT_BY_TYPE.get(item.get("type", "")),
+        ))
+    for location_id, location in LOCATIONS.items():
+        exits = location.get("exits", {})
+        for direction in exits:
+            requirement = location.get("exit_requirements", {}).get(direction)
+            out.append((location_id, direction, exits[direction], bool(requirement)))
+        out.append((location_id, float(location.get("encounter_chance", 0.0)), len(location.get("encounters", []))))
+    return out
+
+
+def compiled_reads() -> List[tuple]:
+    out: List[tuple] = []
+    for enemy in compiled.ENEMY_LIST:
+        for intent in enemy.intents or (enemy.strike,):
+            out.append((
+                enemy.id,
+                enemy.hp,
+                int(enemy.defense / 2),
+                intent.base_damage,
+                intent.defend_multiplier,
+                enemy.is_normal,
+                enemy.xp_reward,
+                len(enemy.loot_table),
+            ))
+    for item in compiled.ITEM_LIST:
+        out.append((item.id, item.attack_bonus, item.defense_bonus, item.max_hp_bonus, item.slot))
+    for location in compiled.LOCATION_LIST:
+        for exit_record in location.exits:
+            out.append((location.id, exit_record.direction, exit_record.target, exit_record.requirement is not None))
+        out.append((location.id, location.encounter_chance, len(location.encounters)))
+    return out
+
+
+def _time(reads: Callable[[], List[tuple]], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        reads()
+    return (time.perf_counter() - started) / rounds
+
+
+def _allocated(build: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def _compile_copy() -> object:
+    # Records reference the raw strings, so copy first to count their text too.
+    return [
+        *(compiled._item_record(i, k, v) for i, (k, v) in enumerate(copy.deepcopy(ITEMS).items())),
+        *(compiled._enemy_record(i, k, v) for i, (k, v) in enumerate(copy.deepcopy(ENEMIES).items())),
+    ]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark compiled content records against raw dict lookups")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    same = raw_reads() == compiled_reads()
+    raw_seconds = _time(raw_reads, args.rounds)
+    compiled_seconds = _time(compiled_reads, args.rounds)
+    raw_bytes = _allocated(lambda: copy.deepcopy((ITEMS, ENEMIES)))
+    compiled_bytes = _allocated(_compile_copy)
+
+    print(f"{len(compiled.ITEM_LIST)} items, {len(compiled.ENEMY_LIST)} enemies, {len(compiled.LOCATION_LIST)} locations")
+    print(f"raw dicts:  {raw_seconds * 1e6:9.1f} us/pass over every table   {raw_bytes / 1024:8.1f} KiB (items + enemies)")
+    print(f"compiled:   {compiled_seconds * 1e6:9.1f} us/pass  ({raw_seconds / max(compiled_seconds, 1e-9):.1f}x)"
+          f"            {compiled_bytes / 1024:8.1f} KiB")
+    print(f"values identical: {'yes' if same else 'NO'}")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
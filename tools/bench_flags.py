@@ -0,0 +1,123 @@
+"""Compare string-set flag checks with the compiled bitmask predicates.
+
+Draws random flag sets, then evaluates every exit requirement, boss
+requirement, and the quest stage for each of them twice: with the previous
+string-membership checks on raw content dicts, and with the masks compiled by
+`content.compiled` and `systems.quest`. Checks both agree, then times them and
+compares the encoded flag section of a snapshot.
+
+    python -m tools.bench_flags --sets 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import AbstractSet, List, Mapping, Optional
+
+from content.compiled import LOCATION_LIST
+from content.world import LOCATIONS
+from game.flags import KNOWN_FLAGS, FlagSet
+from systems import quest
+
+
+def _requirement_by_names(flags: AbstractSet[str], requirement: Mapping) -> bool:
+    """An `exit_requirements` check as written before the compiled masks."""
+    all_flags = requirement.get("all_flags", [])
+    any_flags = requirement.get("any_flags", [])
+    if all_flags and any(flag not in flags for flag in all_flags):
+        return False
+    if any_flags and all(flag not in flags for flag in any_flags):
+        return False
+    return True
+
+
+def _stage_by_names(flags: AbstractSet[str]) -> str:
+    """`quest._determine_stage` as written before the stage gates."""
+    if "met_old_man" not in flags:
+        return "awakening"
+    if "frog_defeated" not in flags:
+        return "swamp_secret"
+    if "dragon_defeated" not in flags:
+        return "mountain_flame"
+    if "goblin_army_defeated" not in flags and "goblin_pass_granted" not in flags:
+        return "castle_road"
+    if "makor_defeated" not in flags:
+        return "black_hall"
+    if "onyx_witch_defeated" not in flags:
+        return "witch_bane"
+    if "elle_cleansed" not in flags:
+        return "rescue_elle"
+    return "homecoming"
+
+
+class _FlagsOnly:
+    def __init__(self, flags: FlagSet):
+        self.flags = flags
+
+
+def random_flag_sets(count: int, seed: int) -> List[FlagSet]:
+    """Random mixes of the game's flags plus one flag content does not know about."""
+    rng = random.Random(seed)
+    pool = [*KNOWN_FLAGS, "plugin_flag"]
+    return [FlagSet(flag for flag in pool if rng.random() < rng.random()) for _ in range(count)]
+
+
+def by_names(flag_sets: List[FlagSet]) -> list:
+    out = []
+    for flags in flag_sets:
+        for location in LOCATIONS.values():
+            for requirement in location.get("exit_requirements", {}).values():
+                out.append(_requirement_by_names(flags, requirement))
+            out.append(all(flag in flags for flag in location.get("boss_require_flags", [])))
+        out.append(_stage_by_names(flags))
+    return out
+
+
+def by_masks(flag_sets: List[FlagSet]) -> list:
+    out = []
+    for flags in flag_sets:
+        mask = flags.mask
+        for location in LOCATION_LIST:
+            for exit_record in location.exits:
+                if exit_record.requirement is not None:
+                    out.append(exit_record.requirement.met(flags))
+            out.append((mask & location.boss_require_mask) == location.boss_require_mask)
+        out.append(quest._determine_stage(_FlagsOnly(flags)))
+    return out
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bitmask flag predicates")
+    parser.add_argument("--sets", type=int, default=2000, help="Random flag sets to evaluate.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args(argv)
+
+    flag_sets = random_flag_sets(args.sets, args.seed)
+    same = by_names(flag_sets) == by_masks(flag_sets)
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        by_names(flag_sets)
+    names_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        by_masks(flag_sets)
+    masks_seconds = time.perf_counter() - started
+
+    every_flag = FlagSet(KNOWN_FLAGS)
+    names_bytes = sum(len(flag) + 2 for flag in every_flag)
+    mask_bytes = (every_flag.mask.bit_length() + 6) // 7
+
+    print(f"{len(flag_sets)} flag sets")
+    print(f"string checks: {names_seconds / args.repeat * 1e6:9.1f} us/pass")
+    print(f"mask checks:   {masks_seconds / args.repeat * 1e6:9.1f} us/pass  ({names_seconds / max(masks_seconds, 1e-9):.1f}x)")
+    print(f"snapshot flags with every known flag set: {names_bytes} B as strings, {mask_bytes} B as a mask")
+    print(f"answers identical: {'yes' if same else 'NO'}")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare rendered and headless engine turns per second.
+
+Runs the same seeded command stream through `Engine.process_raw_command` and
+`Engine.step`, checks both end in byte-identical states, and reports the
+throughput of each.
+
+    python -m tools.bench_headless --turns 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from typing import Callable, List, Optional
+
+os.environ.setdefault("BYTE_WORLD_AI_FORCE_COLOR", "1")
+
+from game.engine import Engine
+from game.snapshot import encode_state
+from game.state import GameState, create_initial_state
+
+
+COMMANDS = [
+    "look",
+    "status",
+    "map",
+    "hunt",
+    "fight",
+    "fight",
+    "defend",
+    "skill focus strike",
+    "use minor potion",
+    "run",
+    "inventory",
+    "quest",
+    "talk wise old man",
+    "move north",
+    "move south",
+    "move east",
+    "move west",
+    "equip all",
+    "train all",
+]
+
+
+def command_stream(turns: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [rng.choice(COMMANDS) for _ in range(turns)]
+
+
+def _run(apply: Callable[[GameState, str], object], commands: List[str], seed: int) -> tuple[float, GameState]:
+    state = create_initial_state(seed=seed)
+    started = time.perf_counter()
+    for raw in commands:
+        apply(state, raw)
+    return time.perf_counter() - started, state
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark headless Engine.step against process_raw_command")
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--latency", action="store_true", help="Print per-command dispatch latency afterwards.")
+    args = parser.parse_args(argv)
+
+    engine = Engine(output_fn=lambda _text: None)
+    commands = command_stream(args.turns, args.seed)
+    rendered_seconds, rendered_state = _run(engine.process_raw_command, commands, args.seed)
+    headless_seconds, headless_state = _run(engine.step, commands, args.seed)
+
+    same = encode_state(rendered_state, compression=0) == encode_state(headless_state, compression=0)
+    rendered_rate = args.turns / rendered_seconds
+    headless_rate = args.turns / headless_seconds
+    print(f"process_raw_command: {rendered_rate:10.0f} turns/s")
+    print(f"step (headless):     {headless_rate:10.0f} turns/s  ({headless_rate / rendered_rate:.1f}x)")
+    print(f"final states identical: {'yes' if same else 'NO'}")
+    if args.latency:
+        print("\n".join(engine.commands.latency_report()))
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
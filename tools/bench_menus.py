@@ -0,0 +1,70 @@
+"""Compare cached and freshly built action menus.
+
+Plays the seeded command stream from `tools.bench_headless` in several
+sessions that share one engine-wide menu cache, rendering the menu `--renders`
+times per command (the browser adapter renders it three times). Every cached
+menu is checked against a fresh build, and both paths are timed.
+
+    python -m tools.bench_menus --sessions 8 --turns 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List, Optional
+
+from game import engine as engine_module
+from game.engine import Engine
+from game.state import GameState, create_initial_state
+from tools.bench_headless import command_stream
+
+
+def fresh_hints(engine: Engine, state: GameState) -> List[str]:
+    """Build the menu the way every render did before the cache."""
+    if state.active_encounter:
+        return engine._action_lines(engine._encounter_actions(state), "Combat actions")
+    return engine._action_lines(engine._exploration_actions(state), "Available actions")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the action-menu cache")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--renders", type=int, default=3, help="Menu renders per command.")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args(argv)
+
+    engine = Engine(output_fn=lambda _text: None)
+    engine_module.clear_menu_cache()
+    cached_seconds = 0.0
+    fresh_seconds = 0.0
+    renders = 0
+    mismatches = 0
+    for session in range(args.sessions):
+        seed = args.seed + session
+        state = create_initial_state(seed=seed)
+        for raw in command_stream(args.turns, seed):
+            engine.step(state, raw)
+            if state.game_over:
+                break
+            started = time.perf_counter()
+            for _ in range(args.renders):
+                cached = engine._build_input_hints(state)
+            cached_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            for _ in range(args.renders):
+                fresh = fresh_hints(engine, state)
+            fresh_seconds += time.perf_counter() - started
+            renders += args.renders
+            mismatches += cached != fresh
+
+    print(f"{renders} menu renders over {args.sessions} sessions, {len(engine_module._MENU_CACHE)} distinct menus")
+    print(f"fresh build:  {fresh_seconds / renders * 1e6:8.1f} us/render")
+    print(f"cached:       {cached_seconds / renders * 1e6:8.1f} us/render  ({fresh_seconds / max(cached_seconds, 1e-9):.1f}x)")
+    print(f"menus identical: {'yes' if not mismatches else f'NO ({mismatches} differ)'}")
+    raise SystemExit(0 if not mismatches else 1)
+
+
+if __name__ == "__main__":
+    main()
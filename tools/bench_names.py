@@ -0,0 +1,182 @@
+"""Compare linear name scans with the shared name index.
+
+Builds a synthetic catalogue (`--items` made-up names plus the real item
+table) and a large inventory, then resolves `--queries` queries (ids, whole
+names, prefixes, inner substrings, typos and swapped letters) both ways: the scan the game used
+before `game.names` and `NameIndex.resolve`. Checks both agree on every query,
+then times typo suggestions on the first `--suggest` misses and checks them
+against a scan of every name. Finally checks that common typos in the real
+tables (`TYPO_CHECKS`, including swapped letters) get the right suggestion.
+
+    python -m tools.bench_names --items 2000 --queries 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Container, Dict, List, Optional
+
+from content.items import ITEMS
+from game import names as name_tables
+from game.names import SUGGESTION_LIMIT, NameIndex, edit_distance, normalize_name, typo_limit
+
+
+# (table, query, owned ids or None, first suggestion expected)
+TYPO_CHECKS = (
+    ("npc", "wsie", None, "Wise Old Man"),
+    ("npc", "wise old mna", None, "Wise Old Man"),
+    ("item", "swrod", None, "Crusty Sword"),
+    ("item", "crusty swrd", ("crusty_sword", "minor_potion"), "Crusty Sword"),
+    ("item", "crsuty sowrd", ("rusted_blade", "crusty_sword"), "Crusty Sword"),
+)
+
+WORDS = (
+    "iron steel onyx minor greater ancient cursed rusty gilded shadow ember frost "
+    "ring blade shield helm potion charm tonic amulet boots cloak riddle key"
+).split()
+
+
+def catalogue(size: int, seed: int) -> Dict[str, str]:
+    rng = random.Random(seed)
+    names = {item_id: item.get("name", item_id) for item_id, item in ITEMS.items()}
+    while len(names) < size + len(ITEMS):
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))).title()
+        names.setdefault(f"{name.lower().replace(' ', '_')}_{len(names)}", name)
+    return names
+
+
+def scan_resolve(names: Dict[str, str], query: str, candidates: Dict[str, int]) -> Optional[str]:
+    """The game's previous approach: normalize and scan every owned item."""
+    query_norm = normalize_name(query)
+    if not query_norm:
+        return None
+    if query in candidates:
+        return query
+    if query_norm in candidates:
+        return query_norm
+    for item_id in candidates:
+        item_name = names.get(item_id, item_id)
+        if normalize_name(item_name) == query_norm:
+            return item_id
+        if query_norm in normalize_name(item_name):
+            return item_id
+    return None
+
+
+def scan_suggest(
+    names: Dict[str, str], query: str, candidates: Optional[Container[str]] = None
+) -> List[str]:
+    """What `NameIndex.suggest` promises, by measuring every name word against every query word."""
+    words = normalize_name(query).split()
+    if not words:
+        return []
+    best: Dict[str, int] = {}
+    for entry_id, name in names.items():
+        if candidates is not None and entry_id not in candidates:
+            continue
+        terms = normalize_name(name).split()
+        total = 0
+        for word in words:
+            distance = min((edit_distance(word, term) for term in terms), default=typo_limit(word) + 1)
+            if distance > typo_limit(word):
+                break
+            total += distance
+        else:
+            best[entry_id] = total
+    ranked = sorted(best, key=lambda entry_id: (best[entry_id], names[entry_id]))
+    return [names[entry_id] for entry_id in ranked[:SUGGESTION_LIMIT]]
+
+
+def typo_misses() -> List[str]:
+    """`TYPO_CHECKS` rows whose expected name is not the first suggestion."""
+    indexes = {"npc": name_tables.NPC_INDEX, "item": name_tables.ITEM_INDEX}
+    misses = []
+    for table, query, owned, expected in TYPO_CHECKS:
+        suggestions = indexes[table].suggest(query, owned)
+        if suggestions[:1] != [expected]:
+            misses.append(f"{query!r} -> {suggestions} (expected {expected})")
+    return misses
+
+
+def make_query(rng: random.Random, names: Dict[str, str]) -> str:
+    item_id = rng.choice(list(names))
+    name = names[item_id].lower()
+    roll = rng.random()
+    if roll < 0.2:
+        return item_id
+    if roll < 0.4:
+        return name
+    if roll < 0.6:
+        return name[: rng.randint(1, len(name))]
+    if roll < 0.8:
+        start = rng.randrange(len(name))
+        return name[start : start + rng.randint(1, 8)]
+    chars = list(name)
+    if roll < 0.9 or len(chars) < 2:
+        chars[rng.randrange(len(chars))] = rng.choice("aeiouxz")
+    else:
+        swap = rng.randrange(len(chars) - 1)
+        chars[swap], chars[swap + 1] = chars[swap + 1], chars[swap]
+    return "".join(chars)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the name index against linear scans")
+    parser.add_argument("--items", type=int, default=2000, help="Synthetic names added to the item table.")
+    parser.add_argument("--inventory", type=int, default=500, help="Owned items the lookups search.")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--suggest", type=int, default=200, help="Unresolved queries to time suggestions on.")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    names = catalogue(args.items, args.seed)
+    rng = random.Random(args.seed)
+    # An id -> count dict, like Player.inventory.
+    inventory = dict.fromkeys(rng.sample(list(names), min(args.inventory, len(names))), 1)
+    queries = [make_query(rng, names) for _ in range(args.queries)]
+
+    started = time.perf_counter()
+    index = NameIndex(names)
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scanned = [scan_resolve(names, query, inventory) for query in queries]
+    scan_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    indexed = [index.resolve(query, inventory) for query in queries]
+    index_seconds = time.perf_counter() - started
+
+    misses = [query for query, found in zip(queries, indexed) if found is None][: args.suggest]
+    started = time.perf_counter()
+    suggestions = [index.suggest(query) for query in misses]
+    suggest_seconds = time.perf_counter() - started
+    suggested = sum(1 for found in suggestions if found)
+    wrong_suggestions = [
+        query for query, found in zip(misses, suggestions) if found != scan_suggest(names, query)
+    ]
+    typos = typo_misses()
+
+    mismatches = [query for query, old, new in zip(queries, scanned, indexed) if old != new]
+    print(f"{len(names)} names, {len(inventory)} owned, {len(queries)} queries")
+    print(f"linear scan:  {scan_seconds / len(queries) * 1e6:9.1f} us/query")
+    print(f"name index:   {index_seconds / len(queries) * 1e6:9.1f} us/query  "
+          f"(+{build_seconds * 1e3:.0f} ms one-off build, {scan_seconds / max(index_seconds, 1e-9):.0f}x)")
+    if misses:
+        print(f"suggestions:  {suggest_seconds / len(misses) * 1e6:9.1f} us/miss  ({suggested}/{len(misses)} misses got one)")
+    print(f"answers identical: {'yes' if not mismatches else f'NO ({len(mismatches)} differ)'}")
+    for query in mismatches[:5]:
+        print(f"  {query!r}")
+    print(f"suggestions match a full scan: {'yes' if not wrong_suggestions else f'NO ({len(wrong_suggestions)} differ)'}")
+    for query in wrong_suggestions[:5]:
+        print(f"  {query!r}")
+    print(f"typo checks: {len(TYPO_CHECKS) - len(typos)}/{len(TYPO_CHECKS)}")
+    for line in typos:
+        print(f"  {line}")
+    ok = not mismatches and not wrong_suggestions and not typos
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
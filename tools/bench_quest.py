@@ -0,0 +1,121 @@
+"""Compare polled quest progression with the event-driven stage graph.
+
+Replays random games of `--game-length` turns: most turns change no flag, some
+set a story flag, a few set or clear some other flag. After every turn the
+stage is derived twice: by re-walking every stage the way `check_and_advance`
+did before the stage graph, and by `quest.check_and_advance` consuming the
+flag changes. Checks both agree turn by turn, then times them.
+
+    python -m tools.bench_quest --turns 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List, Optional, Tuple
+
+from game.flags import KNOWN_FLAGS
+from game.state import create_initial_state
+from systems import quest
+
+
+OTHER_FLAGS = (*KNOWN_FLAGS, "plugin_flag")
+
+
+def random_turns(count: int, seed: int) -> List[Tuple[str, str]]:
+    """(action, flag) per turn; action is "", "add", or "discard"."""
+    rng = random.Random(seed)
+    turns = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.9:
+            turns.append(("", ""))
+        elif roll < 0.97:
+            turns.append(("add", rng.choice(KNOWN_FLAGS)))
+        else:
+            turns.append((rng.choice(("add", "discard")), rng.choice(OTHER_FLAGS)))
+    return turns
+
+
+def _apply(flags, action: str, flag: str) -> None:
+    if action == "add":
+        flags.add(flag)
+    elif action == "discard":
+        flags.discard(flag)
+
+
+def unchecked(turns: List[Tuple[str, str]], game_length: int) -> List[str]:
+    """The replay loop alone, subtracted from the timings below."""
+    stages = []
+    for turn, (action, flag) in enumerate(turns):
+        if turn % game_length == 0:
+            state = create_initial_state(seed=0)
+        _apply(state.flags, action, flag)
+        stages.append(state.quest_stage)
+    return stages
+
+
+def polled(turns: List[Tuple[str, str]], game_length: int) -> List[str]:
+    stages = []
+    for turn, (action, flag) in enumerate(turns):
+        if turn % game_length == 0:
+            state = create_initial_state(seed=0)
+        _apply(state.flags, action, flag)
+        new_stage = quest._determine_stage(state)
+        if new_stage != state.quest_stage:
+            state.quest_stage = new_stage
+        stages.append(state.quest_stage)
+    return stages
+
+
+def evented(turns: List[Tuple[str, str]], game_length: int) -> List[str]:
+    stages = []
+    for turn, (action, flag) in enumerate(turns):
+        if turn % game_length == 0:
+            state = create_initial_state(seed=0)
+        _apply(state.flags, action, flag)
+        quest.check_and_advance(state)
+        stages.append(state.quest_stage)
+    return stages
+
+
+def _best(replay, turns: List[Tuple[str, str]], game_length: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        replay(turns, game_length)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark event-driven quest progression")
+    parser.add_argument("--turns", type=int, default=100000)
+    parser.add_argument("--game-length", type=int, default=300, help="Turns before starting a new game.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed replays; the fastest is reported.")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    turns = random_turns(args.turns, args.seed)
+    old = polled(turns, args.game_length)
+    new = evented(turns, args.game_length)
+    loop_seconds = _best(unchecked, turns, args.game_length, args.repeat)
+    polled_seconds = _best(polled, turns, args.game_length, args.repeat)
+    evented_seconds = _best(evented, turns, args.game_length, args.repeat)
+
+    quiet = sum(1 for action, _ in turns if not action)
+    finished = sum(1 for turn, stage in enumerate(new) if stage == "homecoming" and (turn + 1) % args.game_length == 0)
+    print(f"{len(turns)} turns, {quiet} without a flag change, {finished} of {len(turns) // args.game_length} games finished")
+    polled_seconds = max(polled_seconds - loop_seconds, 1e-9)
+    evented_seconds = max(evented_seconds - loop_seconds, 1e-9)
+    print(f"polling:      {polled_seconds / len(turns) * 1e9:7.0f} ns/turn spent on quest progression")
+    print(f"flag events:  {evented_seconds / len(turns) * 1e9:7.0f} ns/turn  ({polled_seconds / evented_seconds:.1f}x)")
+    same = old == new
+    print(f"stages identical: {'yes' if same else 'NO'}")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare per-query BFS routing with the precomputed routing index.
+
+Builds a synthetic grid world (`--size` x `--size` locations, with a share of
+exits locked behind flags) and compiles it the way `content.compiled` compiles
+LOCATIONS, then answers the same `map`-style queries (six
+targets, open route then lock-ignoring route) with a fresh BFS per query and
+with `systems.routing.RoutingIndex`. Checks both agree on every query.
+
+    python -m tools.bench_routing --size 60 --queries 2000
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+from content.compiled import LocationRecord, _location_record
+from systems.routing import RoutingIndex
+
+
+OFFSETS = {"north": (0, -1), "south": (0, 1), "east": (1, 0), "west": (-1, 0)}
+LOCK_FLAGS = ("gate_a", "gate_b", "gate_c", "gate_d")
+
+
+def grid_world(size: int, lock_share: float, seed: int) -> Dict[str, dict]:
+    rng = random.Random(seed)
+    locations: Dict[str, dict] = {}
+    for y in range(size):
+        for x in range(size):
+            exits: Dict[str, str] = {}
+            requirements: Dict[str, dict] = {}
+            for direction, (dx, dy) in OFFSETS.items():
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < size and 0 <= ny < size:
+                    exits[direction] = f"r{nx}_{ny}"
+                    if rng.random() < lock_share:
+                        requirements[direction] = {"all_flags": [rng.choice(LOCK_FLAGS)]}
+            locations[f"r{x}_{y}"] = {"name": f"Room {x},{y}", "exits": exits, "exit_requirements": requirements}
+    return locations
+
+
+def compile_world(locations: Dict[str, dict]) -> Dict[str, LocationRecord]:
+    location_index = {location_id: index for index, location_id in enumerate(locations)}
+    return {
+        location_id: _location_record(index, location_id, raw, location_index)
+        for index, (location_id, raw) in enumerate(locations.items())
+    }
+
+
+def bfs_first_step(
+    locations: Dict[str, LocationRecord], flags: set, start: str, target: str, respect_locks: bool
+) -> Optional[str]:
+    """The engine's previous approach: one forward BFS per query."""
+    if start == target:
+        return None
+    frontier: deque[tuple[str, List[str]]] = deque([(start, [])])
+    visited = {start}
+    while frontier:
+        location_id, path = frontier.popleft()
+        for exit_record in locations[location_id].exits:
+            requirement = exit_record.requirement
+            if respect_locks and requirement is not None and not requirement.met(flags):
+                continue
+            next_id = exit_record.target
+            if next_id in visited:
+                continue
+            next_path = [*path, exit_record.direction]
+            if next_id == target:
+                return next_path[0]
+            visited.add(next_id)
+            frontier.append((next_id, next_path))
+    return None
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark BFS routing against the routing index")
+    parser.add_argument("--size", type=int, default=60, help="Grid side; the world has size*size locations.")
+    parser.add_argument("--queries", type=int, default=2000, help="Map commands to simulate.")
+    parser.add_argument("--lock-share", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    locations = compile_world(grid_world(args.size, args.lock_share, args.seed))
+    ids = list(locations)
+    rng = random.Random(args.seed)
+    targets = rng.sample(ids, 6)
+    flags = {"gate_a", "gate_c"}
+    starts = [rng.choice(ids) for _ in range(args.queries)]
+
+    def answers(first_step) -> List[Optional[str]]:
+        out: List[Optional[str]] = []
+        for start in starts:
+            for target in targets:
+                step = first_step(start, target, True)
+                if step is None:
+                    step = first_step(start, target, False)
+                out.append(step)
+        return out
+
+    started = time.perf_counter()
+    bfs_answers = answers(lambda s, t, locks: bfs_first_step(locations, flags, s, t, locks))
+    bfs_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indexes = {True: RoutingIndex(locations, frozenset(flags)), False: RoutingIndex(locations, None)}
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index_answers = answers(lambda s, t, locks: indexes[locks].next_step(s, t))
+    index_seconds = time.perf_counter() - started
+
+    same = bfs_answers == index_answers
+    print(f"world: {len(locations)} locations, {args.queries} map commands x {len(targets)} targets")
+    print(f"bfs per query:   {bfs_seconds / args.queries * 1e3:9.3f} ms/map")
+    print(f"routing index:   {index_seconds / args.queries * 1e3:9.3f} ms/map  "
+          f"(+{build_seconds * 1e3:.1f} ms one-off build, {bfs_seconds / max(index_seconds, 1e-9):.0f}x)")
+    print(f"answers identical: {'yes' if same else 'NO'}")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare the binary snapshot codec with the legacy JSON save format.
+
+Plays a scripted run to get a representative mid-game state, then reports
+encoded size and per-call encode/decode time for each format. The last row
+is the same state with its RNG restored through `setstate`, which the codec
+has to store as the raw twister state instead of seed and words drawn.
+
+    python -m tools.bench_snapshot --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import Callable, List, Optional
+
+os.environ.setdefault("NO_COLOR", "1")
+
+from game.engine import Engine
+from game.snapshot import decode_state, encode_state, state_from_dict, state_to_dict
+from game.state import GameState, create_initial_state
+
+
+SCRIPT = [
+    "talk wise old man",
+    "move north",
+    "hunt",
+    "fight",
+    "fight",
+    "fight",
+    "fight",
+    "hunt",
+    "fight",
+    "fight",
+    "fight",
+    "fight",
+    "move south",
+    "status",
+]
+
+
+def build_sample_state(seed: int = 7) -> GameState:
+    """Play the scripted commands from a seeded state."""
+    state = create_initial_state()
+    state.rng.seed(seed)
+    engine = Engine(output_fn=lambda _text: None)
+    for raw in SCRIPT:
+        engine.process_raw_command(state, raw)
+    return state
+
+
+def _time_per_call(fn: Callable[[], object], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+
+def _json_encode(state: GameState) -> bytes:
+    return json.dumps({"version": 1, "state": state_to_dict(state)}).encode("utf-8")
+
+
+def _json_decode(blob: bytes) -> Optional[GameState]:
+    return state_from_dict(json.loads(blob.decode("utf-8"))["state"])
+
+
+def run_benchmark(iterations: int, seed: int) -> List[str]:
+    state = build_sample_state(seed)
+    # The legacy layout keeps the whole state, RNG included, so equal dicts mean an exact round trip.
+    reference = state_to_dict(state)
+    raw_rng = decode_state(encode_state(state))
+    raw_rng.rng.setstate(raw_rng.rng.getstate())
+    rows = []
+    formats = [
+        ("json (legacy web save)", lambda: _json_encode(state), _json_decode),
+        ("snapshot, uncompressed", lambda: encode_state(state, compression=0), decode_state),
+        ("snapshot, zlib level 1", lambda: encode_state(state, compression=1), decode_state),
+        ("snapshot, zlib level 6", lambda: encode_state(state, compression=6), decode_state),
+        ("snapshot, raw rng, zlib 1", lambda: encode_state(raw_rng, compression=1), decode_state),
+    ]
+    for label, encode, decode in formats:
+        blob = encode()
+        restored = decode(blob)
+        round_trip = restored is not None and state_to_dict(restored) == reference
+        encode_us = _time_per_call(encode, iterations) * 1e6
+        decode_us = _time_per_call(lambda: decode(blob), iterations) * 1e6
+        rows.append(
+            f"{label:<26} {len(blob):>7} B  encode {encode_us:8.1f} us  decode {decode_us:8.1f} us"
+            f"  round-trip {'ok' if round_trip else 'MISMATCH'}"
+        )
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark GameState snapshot formats")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    for row in run_benchmark(args.iterations, args.seed):
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
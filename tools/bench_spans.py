@@ -0,0 +1,141 @@
+"""Check and time span output against ANSI escapes decoded after the fact.
+
+Story bots play the same games twice through `Engine.process_raw_command`,
+once in the `ansi` output mode and once in `spans`, and `--fuzz` synthetic
+lines from `tools.bench_colorize` go through the colorizer in both modes.
+For every screen and line this checks that:
+
+- `ui.spans` gives the same colored runs the web page used to recover from
+  the escapes (a port of its old `ansiToHtml` decoder, below);
+- `ui.to_ansi`, the CLI's terminal sink, restores the exact ANSI bytes.
+
+Then times the escape decoder against `ui.spans` on the recorded screens.
+
+    python -m tools.bench_spans --runs 4 --fuzz 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+from game import ui
+from game.engine import Engine
+from game.state import create_initial_state
+from sim.bots import StoryBot, StoryBotOptions
+from tools.bench_colorize import fuzz_lines
+
+
+_ANSI_PATTERN = re.compile(r"\x1b\[([0-9;]+)m")
+_CONTROL_PATTERN = re.compile(r"\x1b\[(?![0-9;]*m)[0-9;]*[A-Za-z]")
+_KNOWN_CODES = {code[2:-1] for code in ui.STYLE_ANSI.values()}
+
+Run = Tuple[str, str]
+
+
+def decode_ansi(text: str) -> List[Run]:
+    """(text, escape) runs the way the page's `ansiToHtml` read escapes."""
+    clean = _CONTROL_PATTERN.sub("", text).replace("\r", "")
+    runs: List[Run] = []
+    color = ""
+    index = 0
+    for match in _ANSI_PATTERN.finditer(clean):
+        runs.append((clean[index : match.start()], color))
+        code = match.group(1)
+        if code == "0":
+            color = ""
+        elif code in _KNOWN_CODES:
+            color = f"\x1b[{code}m"
+        index = match.end()
+    runs.append((clean[index:], color))
+    return runs
+
+
+def span_colors(spans: List[ui.Span]) -> List[Run]:
+    return [(run[0], ui.STYLE_ANSI[run[1]]) if isinstance(run, list) else (run, "") for run in spans]
+
+
+def _merged(runs: List[Run]) -> List[Run]:
+    merged: List[Run] = []
+    for text, color in runs:
+        if not text:
+            continue
+        if merged and merged[-1][1] == color:
+            merged[-1] = (merged[-1][0] + text, color)
+        else:
+            merged.append((text, color))
+    return merged
+
+
+def play_screens(mode: str, runs: int, max_turns: int, extra: List[str]) -> List[str]:
+    """Screens story bots see in `mode`, then `extra` lines colorized in `mode`."""
+    ui.set_output_mode(mode)
+    engine = Engine(output_fn=lambda _text: None)
+    screens: List[str] = []
+    for seed in range(runs):
+        state = create_initial_state(seed=seed)
+        bot = StoryBot(StoryBotOptions(goblins=("fight", "joke", "bribe")[seed % 3], ogre=seed % 2 == 1))
+        screens.append(engine.initial_screen(state))
+        screens.append(engine.process_raw_command(state, "help"))
+        for _ in range(max_turns):
+            if state.victory or state.game_over:
+                break
+            screens.append(engine.process_raw_command(state, bot.next_command(state, None)))
+    screens.extend(ui.format_messages([line]) for line in extra)
+    return screens
+
+
+def _time(decode: Callable[[str], object], screens: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for screen in screens:
+            decode(screen)
+        best = min(best, time.perf_counter() - started)
+    return best / max(1, len(screens))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark span output against decoding ANSI escapes")
+    parser.add_argument("--runs", type=int, default=4, help="Story-bot playthroughs to record.")
+    parser.add_argument("--max-turns", type=int, default=3000)
+    parser.add_argument("--fuzz", type=int, default=20000, help="Synthetic lines for the identity check.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    previous = ui.output_mode()
+    extra = fuzz_lines(args.fuzz, args.seed)
+    try:
+        ansi = play_screens(ui.OUTPUT_ANSI, args.runs, args.max_turns, extra)
+        marked = play_screens(ui.OUTPUT_SPANS, args.runs, args.max_turns, extra)
+    finally:
+        ui.set_output_mode(previous)
+
+    played = len(ansi) - len(extra)
+    page_mismatches = [
+        index for index, (escaped, markup) in enumerate(zip(ansi, marked))
+        if _merged(decode_ansi(escaped)) != _merged(span_colors(ui.spans(markup)))
+    ]
+    sink_mismatches = [index for index, (escaped, markup) in enumerate(zip(ansi, marked)) if ui.to_ansi(markup) != escaped]
+    decoded = _time(decode_ansi, ansi[:played], args.repeat)
+    spanned = _time(ui.spans, marked[:played], args.repeat)
+    sink = _time(ui.to_ansi, marked[:played], args.repeat)
+
+    print(f"{played} screens from {args.runs} playthroughs, {len(extra)} fuzz lines")
+    print(f"decode escapes: {decoded * 1e6:7.2f} us/screen")
+    print(f"ui.spans:       {spanned * 1e6:7.2f} us/screen  ({decoded / max(spanned, 1e-12):.1f}x)")
+    print(f"ui.to_ansi:     {sink * 1e6:7.2f} us/screen")
+    print(f"same colored runs: {'yes' if not page_mismatches else f'NO ({len(page_mismatches)} differ)'}")
+    print(f"terminal bytes identical: {'yes' if not sink_mismatches else f'NO ({len(sink_mismatches)} differ)'}")
+    for index in (page_mismatches + sink_mismatches)[:5]:
+        print(f"  {ansi[index]!r}")
+    same = not page_mismatches and not sink_mismatches and len(ansi) == len(marked)
+    print(f"identical: {'yes' if same else 'NO'}")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Time engine startup with and without bytecode and the content image.
+
+Copies the game sources into two scratch trees and starts fresh interpreters
+in each that import the engine and render the opening screen:
+
+- cold: no game `.pyc` files (`-B`) and the content image disabled, so every
+  game module compiles and every derived table is rebuilt;
+- warm: bytecode and the content image written by a first run are reused.
+
+The standard library's own bytecode is used in both.
+
+Reports time to first screen and, from `-X importtime`, the modules that
+cost the most in each setup. Checks both render the same screen.
+
+    python -m tools.bench_startup --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from tools.build_web_bundle import REPO_ROOT, bundle_members
+
+
+FIRST_SCREEN_PROBE = """
+import hashlib, time
+started = time.perf_counter()
+from game.engine import Engine
+from game.state import create_initial_state
+engine = Engine()
+screen = engine.initial_screen(create_initial_state(seed=1))
+print(time.perf_counter() - started, hashlib.sha256(screen.encode("utf-8")).hexdigest())
+"""
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)")
+
+
+def _copy_sources(tree: Path) -> Path:
+    for member in bundle_members():
+        (tree / member).parent.mkdir(parents=True, exist_ok=True)
+        (tree / member).write_bytes((REPO_ROOT / member).read_bytes())
+    return tree
+
+
+def first_screen(tree: Path, cold: bool, importtime: bool = False) -> Tuple[float, str, Dict[str, int]]:
+    """(seconds to first screen, screen hash, self import microseconds per game module)."""
+    env = {key: value for key, value in os.environ.items() if key not in ("PYTHONDONTWRITEBYTECODE", "PYTHONPATH")}
+    if cold:
+        env["BYTE_WORLD_AI_NO_STARTUP_CACHE"] = "1"
+    command = [sys.executable, *(["-B"] if cold else []), *(["-X", "importtime"] if importtime else []), "-c", FIRST_SCREEN_PROBE]
+    done = subprocess.run(command, cwd=tree, env=env, capture_output=True, text=True, check=True)
+    elapsed, screen_hash = done.stdout.split()
+    modules = {
+        name: int(micros)
+        for micros, name in _IMPORTTIME_LINE.findall(done.stderr)
+        if name.split(".")[0] in ("content", "game", "systems")
+    }
+    return float(elapsed), screen_hash, modules
+
+
+def _top(modules: Dict[str, int], count: int = 4) -> str:
+    ranked = sorted(modules.items(), key=lambda item: -item[1])[:count]
+    return ", ".join(f"{name} {micros / 1e3:.1f}" for name, micros in ranked)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark engine startup with the startup cache")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreters per setup; the fastest is reported.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        cold_tree = _copy_sources(Path(scratch) / "cold")
+        warm_tree = _copy_sources(Path(scratch) / "warm")
+        first_screen(warm_tree, cold=False)  # writes bytecode and the content image
+
+        results: Dict[str, List[Tuple[float, str, Dict[str, int]]]] = {"cold": [], "warm": []}
+        for _ in range(args.runs):
+            results["cold"].append(first_screen(cold_tree, cold=True))
+            results["warm"].append(first_screen(warm_tree, cold=False))
+        profiles = {
+            "cold": first_screen(cold_tree, cold=True, importtime=True)[2],
+            "warm": first_screen(warm_tree, cold=False, importtime=True)[2],
+        }
+
+    cold = min(elapsed for elapsed, _, _ in results["cold"])
+    for setup, runs in results.items():
+        best = min(elapsed for elapsed, _, _ in runs)
+        print(f"{setup:5s} first screen {best * 1e3:7.1f} ms  ({cold / max(best, 1e-9):.1f}x)"
+              f"  game imports {sum(profiles[setup].values()) / 1e3:6.1f} ms self; top: {_top(profiles[setup])}")
+    screens = {screen for runs in results.values() for _, screen, _ in runs}
+    same = len(screens) == 1
+    print(f"first screens identical: {'yes' if same else 'NO'}")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Measure the per-turn cost of effective-stat lookups with and without the cache.
+
+Runs the seeded command stream from `tools.bench_headless` through
+`Engine.step` (headless) and through `Engine.process_raw_command` (rendered,
+as the CLI, web page and server play), each twice: once with
+`Player.effective_stats` cached (the default) and once recomputing on every
+lookup. Reports lookups and recomputes per turn, the cost of a single lookup
+each way, and the time per turn on both paths (best of `--repeat` runs).
+
+    python -m tools.bench_stats --turns 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+from game import state as state_module
+from game.engine import Engine
+from game.snapshot import encode_state
+from game.state import GameState, Player, create_initial_state, get_effective_stats
+from tools.bench_headless import command_stream
+
+
+class _Counter:
+    def __init__(self) -> None:
+        self.lookups = 0
+        self.recomputes = 0
+
+
+def _instrument(counter: _Counter, cached: bool):
+    """Patch the stat lookup to count calls; returns a function restoring the originals."""
+    original_lookup = Player.effective_stats
+    original_compute = state_module._compute_effective_stats
+
+    def compute(player: Player):
+        counter.recomputes += 1
+        return original_compute(player)
+
+    def lookup(player: Player):
+        counter.lookups += 1
+        if cached:
+            return original_lookup(player)
+        return compute(player)
+
+    state_module._compute_effective_stats = compute
+    Player.effective_stats = lookup
+
+    def restore() -> None:
+        state_module._compute_effective_stats = original_compute
+        Player.effective_stats = original_lookup
+
+    return restore
+
+
+def _run_stream(
+    commands: list[str], seed: int, cached: bool, render: bool, counter: Optional[_Counter] = None
+) -> tuple[float, GameState]:
+    engine = Engine(output_fn=lambda _text: None)
+    play = engine.process_raw_command if render else engine.step
+    restore = None
+    if counter is not None:
+        restore = _instrument(counter, cached)
+    elif not cached:
+        original_lookup = Player.effective_stats
+        Player.effective_stats = state_module._compute_effective_stats
+
+        def restore() -> None:
+            Player.effective_stats = original_lookup
+
+    try:
+        state = create_initial_state(seed=seed)
+        started = time.perf_counter()
+        for raw in commands:
+            play(state, raw)
+        return time.perf_counter() - started, state
+    finally:
+        if restore is not None:
+            restore()
+
+
+def _lookup_cost(player: Player, calls: int) -> tuple[float, float]:
+    compute = state_module._compute_effective_stats
+    started = time.perf_counter()
+    for _ in range(calls):
+        get_effective_stats(player)
+    cached = (time.perf_counter() - started) / calls
+    started = time.perf_counter()
+    for _ in range(calls):
+        compute(player)
+    uncached = (time.perf_counter() - started) / calls
+    return cached, uncached
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cached effective stats against recomputing them")
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--calls", type=int, default=200000, help="Lookups for the single-call timing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per path and mode (best is kept).")
+    args = parser.parse_args(argv)
+
+    commands = command_stream(args.turns, args.seed)
+    same = True
+    lookup_costs = None
+    for label, render in (("headless", False), ("rendered", True)):
+        counter = _Counter()
+        _, counted_state = _run_stream(commands, args.seed, cached=True, render=render, counter=counter)
+        seconds = {}
+        states = [counted_state]
+        for cached in (False, True):
+            runs = [_run_stream(commands, args.seed, cached=cached, render=render) for _ in range(args.repeat)]
+            seconds[cached] = min(elapsed for elapsed, _state in runs)
+            states.append(runs[-1][1])
+        encoded = {encode_state(state, compression=0) for state in states}
+        same = same and len(encoded) == 1
+        if lookup_costs is None:
+            lookup_costs = _lookup_cost(states[-1].player, args.calls)
+            print(f"lookup cost:     {lookup_costs[0] * 1e9:6.0f} ns cached  {lookup_costs[1] * 1e9:.0f} ns recomputed")
+        per_turn = {cached: elapsed / args.turns * 1e6 for cached, elapsed in seconds.items()}
+        print(f"{label}:  {counter.lookups / args.turns:5.2f} lookups/turn, {counter.recomputes / args.turns:.3f} recomputes/turn;"
+              f"  {per_turn[False]:6.2f} us/turn recomputing -> {per_turn[True]:6.2f} us/turn cached"
+              f"  ({per_turn[False] - per_turn[True]:+.2f} us, {seconds[False] / seconds[True]:.2f}x)")
+    print(f"final states identical: {'yes' if same else 'NO'}")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Time web cold start with loose source files against the single-archive bundle.
+
+Serves a throwaway copy of the web files over local HTTP, adding `--latency`
+milliseconds to every request to stand in for a network round trip, and
+replays what `static/engine_worker.js` does before the engine can start:
+
+- loose: fetch every entry of `SOURCE_FILES` one after another (the loader
+  before the bundle), write them out, and import the engine from the tree;
+- bundle, cold cache: fetch the manifest and the hashed zip, then import the
+  engine from the zip through zipimport;
+- bundle, warm cache: only the manifest is fetched; the zip is already cached.
+
+Imports run in a fresh interpreter with bytecode writing off, as in Pyodide.
+Checks that the bundle holds every loose file and that every import path
+renders the same opening screen.
+
+    python -m tools.bench_web_bundle --latency 40
+"""
+
+from __future__ import annotations
+
+import argparse
+from functools import partial
+import http.server
+import json
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Optional, Tuple
+import urllib.request
+
+from tools.build_web_bundle import MANIFEST_NAME, REPO_ROOT, bundle_members, write_bundle
+
+
+IMPORT_PROBE = """
+import hashlib, sys, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+from game.engine import Engine
+from game.state import create_initial_state
+elapsed = time.perf_counter() - started
+engine = Engine()
+state = create_initial_state(seed=1)
+screen = engine.initial_screen(state) + engine.process_raw_command(state, "help")
+print(elapsed, hashlib.sha256(screen.encode("utf-8")).hexdigest())
+"""
+
+
+def source_files() -> List[str]:
+    """`SOURCE_FILES` as listed in static/engine_worker.js."""
+    script = (REPO_ROOT / "static" / "engine_worker.js").read_text(encoding="utf-8")
+    block = re.search(r"const SOURCE_FILES = \[(.*?)\];", script, re.S)
+    if block is None:
+        raise SystemExit("SOURCE_FILES not found in static/engine_worker.js")
+    return re.findall(r'"([^"]+)"', block.group(1))
+
+
+class _SlowHandler(http.server.SimpleHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self) -> None:
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def _fetch(base: str, path: str) -> bytes:
+    with urllib.request.urlopen(f"{base}/{path}") as response:
+        return response.read()
+
+
+def _import(path: Path) -> Tuple[float, str]:
+    done = subprocess.run(
+        [sys.executable, "-B", "-c", IMPORT_PROBE, str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=path.parent if path.is_file() else path,
+    )
+    elapsed, screen_hash = done.stdout.split()
+    return float(elapsed), screen_hash
+
+
+def _loose(base: str, files: List[str], work: Path) -> Tuple[float, float, str]:
+    tree = work / "loose"
+    started = time.perf_counter()
+    for path in files:
+        target = tree / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(_fetch(base, path))
+    fetch_seconds = time.perf_counter() - started
+    return (fetch_seconds, *_import(tree))
+
+
+def _bundle(base: str, work: Path, cached: bool) -> Tuple[float, float, str]:
+    started = time.perf_counter()
+    manifest = json.loads(_fetch(base, f"static/bundle/{MANIFEST_NAME}"))
+    archive = work / "bundle" / manifest["bundle"]
+    if not cached:
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        archive.write_bytes(_fetch(base, f"static/bundle/{manifest['bundle']}"))
+    fetch_seconds = time.perf_counter() - started
+    return (fetch_seconds, *_import(archive))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark web cold start with and without the bundle")
+    parser.add_argument("--latency", type=float, default=40.0, help="Added milliseconds per HTTP request.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the fastest is reported.")
+    args = parser.parse_args(argv)
+
+    files = source_files()
+    with tempfile.TemporaryDirectory() as scratch:
+        site = Path(scratch) / "site"
+        for path in files:
+            (site / path).parent.mkdir(parents=True, exist_ok=True)
+            (site / path).write_bytes((REPO_ROOT / path).read_bytes())
+        manifest = write_bundle(site / "static" / "bundle")
+
+        _SlowHandler.latency = args.latency / 1000.0
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), partial(_SlowHandler, directory=str(site)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            results = {"loose": [], "bundle (cold cache)": [], "bundle (warm cache)": []}
+            for run in range(args.repeat):
+                work = Path(scratch) / f"run{run}"
+                results["loose"].append(_loose(base, files, work))
+                results["bundle (cold cache)"].append(_bundle(base, work, cached=False))
+                results["bundle (warm cache)"].append(_bundle(base, work, cached=True))
+        finally:
+            server.shutdown()
+
+    print(f"{len(files)} loose files vs {manifest['bundle']} ({manifest['files']} files, {manifest['bytes']} bytes), "
+          f"{args.latency:.0f} ms per request")
+    baseline = min(fetch + imported for fetch, imported, _ in results["loose"])
+    for mode, runs in results.items():
+        fetch, imported, _ = min(runs, key=lambda run: run[0] + run[1])
+        total = fetch + imported
+        print(f"{mode:20s} fetch {fetch * 1e3:7.1f} ms + import {imported * 1e3:6.1f} ms = {total * 1e3:7.1f} ms"
+              f"  ({baseline / max(total, 1e-9):.1f}x)")
+    missing = sorted(set(files) - set(bundle_members()))
+    if missing:
+        print(f"missing from bundle: {', '.join(missing)}")
+    screens = {screen for runs in results.values() for _, _, screen in runs}
+    same = len(screens) == 1 and not missing
+    print(f"opening screens identical: {'yes' if same else 'NO'}")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compare full web payloads with per-panel deltas.
+
+Runs the Python half of `static/engine_worker.js` (its `BOOTSTRAP_CODE`) in
+CPython twice, side by side, and plays the same random games in both: each
+turn picks one of the commands the actions panel offers. One copy forgets
+what it sent before every command, so it builds and sends every panel as the
+web build did before deltas; the other sends only the panels that changed.
+
+Checks that the panels the page ends up with (the deltas merged into the
+previous ones) equal the full payload after every turn, then reports the
+JSON bytes per command and the time `web_process` takes in each mode.
+
+    python -m tools.bench_web_payload --turns 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from tools.build_web_bundle import REPO_ROOT
+
+
+def bootstrap_code() -> str:
+    """The Python source `static/engine_worker.js` runs in Pyodide."""
+    script = (REPO_ROOT / "static" / "engine_worker.js").read_text(encoding="utf-8")
+    block = re.search(r"const BOOTSTRAP_CODE = String\.raw`(.*?)`;", script, re.S)
+    if block is None:
+        raise SystemExit("BOOTSTRAP_CODE not found in static/engine_worker.js")
+    return block.group(1)
+
+
+def _engine_namespace(code: str, seed: int) -> Dict[str, object]:
+    namespace: Dict[str, object] = {"__name__": "byte_world_web"}
+    exec(compile(code, "engine_worker.js:BOOTSTRAP_CODE", "exec"), namespace)
+    namespace["_state"] = namespace["create_initial_state"](seed=seed)
+    return namespace
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark full web payloads against panel deltas")
+    parser.add_argument("--turns", type=int, default=2000, help="Commands played in total.")
+    parser.add_argument("--game-length", type=int, default=200, help="Commands per game before a reset.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    code = bootstrap_code()
+    rng = random.Random(args.seed)
+    modes = ("full", "delta")
+    engines = {}
+    page: Dict[str, object] = {}
+    sizes: Dict[str, List[int]] = {mode: [] for mode in modes}
+    seconds: Dict[str, float] = {mode: 0.0 for mode in modes}
+    mismatches = 0
+    played = args.game_length
+
+    for _ in range(args.turns):
+        if played >= args.game_length:
+            game_seed = rng.randrange(1 << 30)
+            engines = {mode: _engine_namespace(code, game_seed) for mode in modes}
+            engines["full"]["web_initial"]()
+            opening = json.loads(engines["delta"]["web_initial"]())
+            page = {name: panel["data"] for name, panel in opening["panels"].items()}
+            played = 0
+        actions = page["actions"]["actions"]
+        command = rng.choice(actions)["command"] if actions else "look"
+        played += 1
+
+        payloads = {}
+        for mode in modes:
+            engine = engines[mode]
+            if mode == "full":
+                engine["_panels_sent"].clear()
+            started = time.perf_counter()
+            text = engine["web_process"](command)
+            seconds[mode] += time.perf_counter() - started
+            sizes[mode].append(len(text.encode("utf-8")))
+            payloads[mode] = json.loads(text)
+
+        full, delta = payloads["full"], payloads["delta"]
+        page.update({name: panel["data"] for name, panel in delta.pop("panels").items()})
+        expected = {name: panel["data"] for name, panel in full.pop("panels").items()}
+        if page != expected or full != delta:
+            mismatches += 1
+        if full["game_over"]:
+            played = args.game_length
+
+    for mode in modes:
+        total = sum(sizes[mode])
+        print(f"{mode:5s} {total / args.turns:8.0f} bytes/command  {seconds[mode] / args.turns * 1e3:6.3f} ms/command"
+              f"  ({sum(sizes['full']) / max(total, 1):.1f}x smaller, "
+              f"{seconds['full'] / max(seconds[mode], 1e-9):.1f}x faster)")
+    same = mismatches == 0
+    print(f"identical: {'yes' if same else 'NO'} ({mismatches} of {args.turns} turns differ)")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
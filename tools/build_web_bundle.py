@@ -0,0 +1,141 @@
+"""Pack the game sources into one content-hashed zip for the web build.
+
+Collects every module of `content`, `game`, and `systems` plus the title text
+into `static/bundle/byte_world-<hash>.zip` and writes `manifest.json` next to
+it naming that file. `static/engine_worker.js` fetches the manifest, then the zip once
+(cacheable forever, since a new build gets a new name), writes it into the
+Pyodide filesystem, and imports the packages from it with zipimport.
+
+Next to each module the zip carries its bytecode (`.pyc`, unchecked-hash
+since the archive never changes), and it also holds the content image from
+`game.startup_cache`, so the browser neither compiles sources nor re-derives
+content tables. Build with the Python version Pyodide runs; zipimport ignores
+bytecode from any other version and falls back to the sources.
+
+The archive is reproducible: entries are sorted and carry fixed timestamps, so
+unchanged sources give the same hash and stay cached in browsers.
+
+    python -m tools.build_web_bundle
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+import py_compile
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional
+import zipfile
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PACKAGES = ("content", "game", "systems")
+DATA_FILES = ("content/ascii/title_text.txt",)
+DEFAULT_OUT_DIR = REPO_ROOT / "static" / "bundle"
+BUNDLE_PREFIX = "byte_world-"
+MANIFEST_NAME = "manifest.json"
+_ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+
+def bundle_members(root: Path = REPO_ROOT) -> List[str]:
+    """Repo-relative paths packed into the bundle, sorted."""
+    members = set(DATA_FILES)
+    for package in PACKAGES:
+        for path in (root / package).rglob("*.py"):
+            if "__pycache__" not in path.parts:
+                members.add(path.relative_to(root).as_posix())
+    return sorted(members)
+
+
+def _bytecode(source: Path, member: str) -> bytes:
+    with tempfile.TemporaryDirectory() as scratch:
+        compiled = Path(scratch) / "module.pyc"
+        py_compile.compile(
+            str(source),
+            cfile=str(compiled),
+            dfile=member,
+            doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+        return compiled.read_bytes()
+
+
+_IMAGE_PROBE = """
+import sys
+import game.engine
+from game import startup_cache
+sys.stdout.write(startup_cache.image_name() + "\\n")
+sys.stdout.flush()
+sys.stdout.buffer.write(startup_cache.dump())
+"""
+
+
+def _content_image(root: Path) -> tuple[str, bytes]:
+    """(zip member, bytes) of the content image derived by importing the engine.
+
+    Built in a fresh interpreter with a fixed hash seed and the on-disk image
+    ignored, so set ordering inside the image, and with it the bundle hash,
+    is the same on every build.
+    """
+    env = {**os.environ, "PYTHONHASHSEED": "0", "BYTE_WORLD_AI_NO_STARTUP_CACHE": "1"}
+    done = subprocess.run([sys.executable, "-c", _IMAGE_PROBE], cwd=root, env=env, capture_output=True, check=True)
+    name, _, image = done.stdout.partition(b"\n")
+    return f"game/{name.decode('ascii')}", image
+
+
+def build_archive(root: Path = REPO_ROOT, bytecode: bool = True) -> bytes:
+    """The bundle zip as bytes; identical sources give identical bytes."""
+    entries = {member: (root / member).read_bytes() for member in bundle_members(root)}
+    if bytecode:
+        for member in list(entries):
+            if member.endswith(".py"):
+                entries[member + "c"] = _bytecode(root / member, member)
+        image_member, image = _content_image(root)
+        entries[image_member] = image
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        for member in sorted(entries):
+            info = zipfile.ZipInfo(member, date_time=_ZIP_TIMESTAMP)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, entries[member])
+    return buffer.getvalue()
+
+
+def write_bundle(out_dir: Path = DEFAULT_OUT_DIR, root: Path = REPO_ROOT, bytecode: bool = True) -> dict:
+    """Write the hashed zip and its manifest, removing older bundles; returns the manifest."""
+    data = build_archive(root, bytecode)
+    digest = hashlib.sha256(data).hexdigest()
+    name = f"{BUNDLE_PREFIX}{digest[:16]}.zip"
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for stale in out_dir.glob(f"{BUNDLE_PREFIX}*.zip"):
+        if stale.name != name:
+            stale.unlink()
+    (out_dir / name).write_bytes(data)
+    manifest = {"bundle": name, "sha256": digest, "bytes": len(data), "files": len(bundle_members(root))}
+    if bytecode:
+        manifest["python"] = f"{sys.version_info.major}.{sys.version_info.minor}"
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return manifest
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the single-archive web bundle")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT_DIR, help="Output directory.")
+    parser.add_argument("--no-bytecode", action="store_true", help="Pack sources only, without .pyc files or the content image.")
+    args = parser.parse_args(argv)
+
+    manifest = write_bundle(args.out, bytecode=not args.no_bytecode)
+    print(f"{args.out / manifest['bundle']}: {manifest['files']} files, {manifest['bytes']} bytes")
+
+
+if __name__ == "__main__":
+    main()
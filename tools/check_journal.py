@@ -0,0 +1,124 @@
+"""Check that journals replay to the live state, including resumed sessions.
+
+Each case plays seeded commands through `Engine.process_raw_command` while a
+`CommandJournal` records them, closes it, and then requires that
+`verify_journal` matches every checkpoint and the live state, and that
+`restore_state` gives back the live state byte for byte. Cases:
+
+- a story-bot run recorded in one sitting;
+- a session ended with `quit`, resumed the way `main.py --journal` does,
+  and played on past the next checkpoint;
+- a journal whose final record was torn by a crash.
+
+    python -m tools.check_journal --runs 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from typing import Callable, List, Optional, Tuple
+
+os.environ.setdefault("NO_COLOR", "1")
+
+from game.engine import Engine
+from game.journal import CommandJournal, restore_state, verify_journal
+from game.snapshot import encode_state
+from game.state import GameState, create_initial_state
+from sim.bots import StoryBot, StoryBotOptions
+
+
+INTERVAL = 50
+
+
+def _play(engine: Engine, journal: CommandJournal, state: GameState, commands: List[str]) -> None:
+    for raw in commands:
+        engine.process_raw_command(state, raw)
+        journal.record(state, raw)
+
+
+def _bot_commands(seed: int, turns: int) -> List[str]:
+    """Commands a story bot sends playing `turns` turns of a seeded game."""
+    engine = Engine(output_fn=lambda _text: None)
+    state = create_initial_state(seed=seed)
+    bot = StoryBot(StoryBotOptions(goblins=("fight", "joke", "bribe")[seed % 3]))
+    commands = []
+    for _ in range(turns):
+        if state.victory or state.game_over:
+            break
+        raw = bot.next_command(state, None)
+        engine.process_raw_command(state, raw)
+        commands.append(raw)
+    return commands
+
+
+def one_sitting(path: str, seed: int, engine: Engine) -> GameState:
+    state = create_initial_state(seed=seed)
+    with CommandJournal.create(path, state, seed=seed, checkpoint_interval=INTERVAL) as journal:
+        _play(engine, journal, state, _bot_commands(seed, 400))
+    return state
+
+
+def _resume(path: str, engine: Engine) -> Tuple[CommandJournal, GameState]:
+    """Reopen a journal the way `main.py --journal` does."""
+    journal, state = CommandJournal.resume(path, engine=engine, checkpoint_interval=INTERVAL)
+    state.game_over = False
+    return journal, state
+
+
+def quit_and_resume(path: str, seed: int, engine: Engine) -> GameState:
+    state = create_initial_state(seed=seed)
+    with CommandJournal.create(path, state, seed=seed, checkpoint_interval=INTERVAL) as journal:
+        _play(engine, journal, state, ["look", "quit"])
+    journal, state = _resume(path, engine)
+    with journal:
+        _play(engine, journal, state, ["status"] * (INTERVAL + 10) + ["quit"])
+    journal, state = _resume(path, engine)
+    with journal:
+        _play(engine, journal, state, _bot_commands(seed, 120))
+    return state
+
+
+def torn_tail(path: str, seed: int, engine: Engine) -> GameState:
+    commands = _bot_commands(seed, 120)
+    state = create_initial_state(seed=seed)
+    with CommandJournal.create(path, state, seed=seed, checkpoint_interval=INTERVAL) as journal:
+        _play(engine, journal, state, commands[:-1])
+    with open(path, "ab") as handle:
+        handle.write(b"C\x40fig")
+    return state
+
+
+CASES: List[Tuple[str, Callable[[str, int, Engine], GameState]]] = [
+    ("one sitting", one_sitting),
+    ("quit, resume", quit_and_resume),
+    ("torn tail", torn_tail),
+]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check command journals replay to the live state")
+    parser.add_argument("--runs", type=int, default=4, help="Seeds per case.")
+    args = parser.parse_args(argv)
+
+    engine = Engine(output_fn=lambda _text: None)
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for label, play in CASES:
+            for seed in range(args.runs):
+                path = os.path.join(directory, f"{seed}.bwj")
+                live = play(path, seed, engine)
+                report = verify_journal(path, live_state=live)
+                restored = restore_state(path)
+                same = encode_state(restored, compression=0) == encode_state(live, compression=0)
+                if not report.ok or not same:
+                    failures += 1
+                    print(f"  {label}, seed {seed}: {report.mismatch or 'restore_state differs from the live state'}")
+            print(f"{label:14s} {args.runs} journals checked")
+    print(f"identical: {'yes' if not failures else 'NO'}")
+    raise SystemExit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Load test for the asyncio game server.
+
+Starts `python -m game.server` in a subprocess, parks thousands of idle
+connections on it, then drives a pool of active clients as fast as the server
+answers. The server reports its session-pool counters on stderr; when more
+sessions are opened than `--resident-sessions`, the run must have hibernated
+sessions and thawed them again (the idle probe wakes hibernated ones). Exits
+non-zero when the idle, throughput, or hibernation checks fail.
+
+    python -m tools.load_test --idle 3000 --clients 50 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import re
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PROMPT_MARKER = b"\r\n> "
+COMMAND_MIX = [
+    "look",
+    "status",
+    "map",
+    "hunt",
+    "fight",
+    "defend",
+    "fight",
+    "inventory",
+    "quest",
+    "sense",
+    "run",
+    "talk wise old man",
+]
+STATS_INTERVAL = 0.2
+_STAT_FIELD = re.compile(r"(\w+)=(\d+)(?=\s|$)")
+
+
+def _raise_fd_limit(wanted: int) -> int:
+    """Raise the soft open-file limit toward `wanted`; return the new soft limit."""
+    try:
+        import resource
+    except ImportError:
+        return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        return target
+    return soft
+
+
+async def _start_server(host: str, resident_sessions: int) -> Tuple[asyncio.subprocess.Process, int]:
+    env = dict(os.environ)
+    env.setdefault("NO_COLOR", "1")
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "game.server",
+        "--host",
+        host,
+        "--port",
+        "0",
+        "--resident-sessions",
+        str(resident_sessions),
+        "--stats-interval",
+        str(STATS_INTERVAL),
+        cwd=str(REPO_ROOT),
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    assert process.stdout is not None
+    banner = (await asyncio.wait_for(process.stdout.readline(), timeout=30)).decode().strip()
+    port = int(banner.rsplit(":", 1)[1])
+    return process, port
+
+
+async def _connect(host: str, port: int) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    await reader.readuntil(PROMPT_MARKER)
+    return reader, writer
+
+
+async def _open_idle(host: str, port: int, count: int, batch: int) -> List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]:
+    connections: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        connections.extend(await asyncio.gather(*(_connect(host, port) for _ in range(size))))
+    return connections
+
+
+async def _active_client(
+    host: str,
+    port: int,
+    deadline: float,
+    offset: int,
+    latencies: List[float],
+) -> int:
+    reader, writer = await _connect(host, port)
+    sent = 0
+    try:
+        while time.perf_counter() < deadline:
+            command = COMMAND_MIX[(offset + sent) % len(COMMAND_MIX)]
+            started = time.perf_counter()
+            writer.write(f"{command}\r\n".encode())
+            await writer.drain()
+            await reader.readuntil(PROMPT_MARKER)
+            latencies.append(time.perf_counter() - started)
+            sent += 1
+    finally:
+        writer.close()
+    return sent
+
+
+async def _probe_idle(connections: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]], sample: int) -> int:
+    """Send one command to a sample of idle connections and count live replies."""
+    step = max(1, len(connections) // max(1, sample))
+    alive = 0
+    for reader, writer in connections[::step][:sample]:
+        writer.write(b"look\r\n")
+        await writer.drain()
+        try:
+            await asyncio.wait_for(reader.readuntil(PROMPT_MARKER), timeout=10)
+            alive += 1
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+    return alive
+
+
+async def _follow_stats(stream: asyncio.StreamReader, latest: Dict[str, int]) -> None:
+    """Keep `latest` updated with the integer counters of the server's stats lines."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            return
+        latest.update({name: int(value) for name, value in _STAT_FIELD.findall(line.decode(errors="replace"))})
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+async def run_load_test(args: argparse.Namespace) -> bool:
+    fd_limit = _raise_fd_limit(args.idle * 2 + args.clients * 2 + 256)
+    if fd_limit < args.idle + args.clients + 64:
+        print(f"warning: open-file limit {fd_limit} is below the requested connection count", file=sys.stderr)
+
+    process, port = await _start_server(args.host, args.resident_sessions)
+    pool_stats: Dict[str, int] = {}
+    assert process.stderr is not None
+    follower = asyncio.get_running_loop().create_task(_follow_stats(process.stderr, pool_stats))
+    try:
+        started = time.perf_counter()
+        idle = await _open_idle(args.host, port, args.idle, args.batch)
+        connect_seconds = time.perf_counter() - started
+        print(f"idle connections: {len(idle)} opened in {connect_seconds:.2f}s")
+
+        latencies: List[float] = []
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        counts = await asyncio.gather(
+            *(_active_client(args.host, port, deadline, index, latencies) for index in range(args.clients))
+        )
+        elapsed = time.perf_counter() - started
+        total = sum(counts)
+        rate = total / elapsed if elapsed > 0 else 0.0
+        print(f"active clients: {args.clients}, commands: {total} in {elapsed:.2f}s -> {rate:.1f} commands/s")
+        if latencies:
+            print(
+                "latency ms: "
+                f"p50={_percentile(latencies, 50) * 1000:.1f} "
+                f"p95={_percentile(latencies, 95) * 1000:.1f} "
+                f"p99={_percentile(latencies, 99) * 1000:.1f} "
+                f"mean={statistics.fmean(latencies) * 1000:.1f}"
+            )
+
+        alive = await _probe_idle(idle, args.probe)
+        print(f"idle probe: {alive}/{min(args.probe, len(idle))} idle sessions still answer")
+
+        await asyncio.sleep(STATS_INTERVAL * 3)
+        evictions = pool_stats.get("evictions", 0)
+        thaws = pool_stats.get("thaws", 0)
+        print(f"session pool: {evictions} hibernations, {thaws} thaws, {pool_stats.get('resident', 0)} resident")
+        pooled = len(idle) + args.clients > args.resident_sessions
+        hibernation_ok = not pooled or (evictions > 0 and thaws > 0)
+        if not hibernation_ok:
+            print("sessions exceeded --resident-sessions but the pool never hibernated and thawed them")
+
+        for _, writer in idle:
+            writer.close()
+
+        ok = len(idle) >= args.idle and rate >= args.min_rate and alive == min(args.probe, len(idle)) and hibernation_ok
+        print("PASS" if ok else "FAIL")
+        return ok
+    finally:
+        process.terminate()
+        await process.wait()
+        follower.cancel()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test the byte_world_ai TCP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--idle", type=int, default=3000, help="Idle connections to hold open.")
+    parser.add_argument("--batch", type=int, default=250, help="Idle connections opened concurrently.")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrently active clients.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of active traffic.")
+    parser.add_argument("--probe", type=int, default=100, help="Idle sessions re-checked after the run.")
+    parser.add_argument(
+        "--resident-sessions",
+        type=int,
+        default=1000,
+        help="Server session-pool size; smaller values exercise hibernation.",
+    )
+    parser.add_argument("--min-rate", type=float, default=200.0, help="Required commands per second.")
+    args = parser.parse_args(argv)
+    ok = asyncio.run(run_load_test(args))
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Headless-browser smoke test for the web build and its engine worker.
+
+Serves the repository with `http.server` and opens it in headless Chromium
+through Playwright, then:
+
+- measures the page's longest main-thread task while Pyodide boots (the
+  engine runs in `static/engine_worker.js`, so this should stay short);
+- submits `--commands` commands back to back without waiting, which the page
+  queues while the worker is busy, and checks from the save journal that
+  every one ran, in order;
+- reloads the page and checks the saved game is restored.
+
+Needs Playwright and a Chromium build (`pip install playwright` then
+`playwright install chromium`) and network access for the Pyodide CDN. Run
+`python -m tools.build_web_bundle` first to test the bundled load path.
+
+    python -m tools.web_smoke --commands 8
+"""
+
+from __future__ import annotations
+
+import argparse
+from functools import partial
+import http.server
+import threading
+import time
+from typing import Optional
+
+from tools.build_web_bundle import REPO_ROOT
+
+
+BOOT_TIMEOUT_MS = 120_000
+# static/app.js journals each command here until the next checkpoint (every 25 commands).
+JOURNAL_STORAGE_KEY = "byte_world_ai_save_journal_v1"
+MAX_TYPE_AHEAD = 24
+TYPE_AHEAD = ["look", "status", "inventory", "map", "quest", "look", "help", "status"]
+# Installed before any page script: records the longest main-thread task.
+LONG_TASK_PROBE = """
+window.__longestTask = 0;
+new PerformanceObserver((list) => {
+  for (const entry of list.getEntries()) {
+    window.__longestTask = Math.max(window.__longestTask, entry.duration);
+  }
+}).observe({ type: "longtask", buffered: true });
+"""
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def _wait_ready(page) -> None:
+    page.wait_for_function(
+        "!document.getElementById('command-input').disabled"
+        " && document.getElementById('status-line').textContent.includes('continue')",
+        timeout=BOOT_TIMEOUT_MS,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Smoke-test the web build in headless Chromium")
+    parser.add_argument("--commands", type=int, default=len(TYPE_AHEAD), help="Commands typed ahead without waiting.")
+    parser.add_argument("--max-long-task", type=float, default=200.0, help="Longest main-thread task allowed (ms).")
+    args = parser.parse_args(argv)
+    if not 0 < args.commands <= MAX_TYPE_AHEAD:
+        parser.error(f"--commands must be between 1 and {MAX_TYPE_AHEAD} (the journal is checkpointed after 25)")
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("The web smoke test needs Playwright (pip install playwright; playwright install chromium).")
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=str(REPO_ROOT)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    failures = []
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch()
+            page = browser.new_page()
+            page.add_init_script(LONG_TASK_PROBE)
+            errors = []
+            page.on("pageerror", lambda error: errors.append(str(error)))
+
+            started = time.perf_counter()
+            page.goto(url)
+            _wait_ready(page)
+            boot_seconds = time.perf_counter() - started
+            longest = float(page.evaluate("window.__longestTask"))
+            print(f"booted in {boot_seconds:.1f} s; longest main-thread task {longest:.0f} ms")
+            if longest > args.max_long_task:
+                failures.append(f"main thread blocked for {longest:.0f} ms during boot")
+
+            commands = [TYPE_AHEAD[index % len(TYPE_AHEAD)] for index in range(args.commands)]
+            started = time.perf_counter()
+            for command in commands:
+                page.fill("#command-input", command)
+                page.press("#command-input", "Enter")
+            _wait_ready(page)
+            queued_seconds = time.perf_counter() - started
+            journal = page.evaluate(f"JSON.parse(localStorage.getItem({JOURNAL_STORAGE_KEY!r}) || '[]')")
+            print(f"{len(commands)} typed-ahead commands answered in {queued_seconds:.2f} s")
+            if journal != commands:
+                failures.append(f"typed-ahead commands ran as {journal}, expected {commands}")
+
+            page.reload()
+            _wait_ready(page)
+            status = page.inner_text("#status-line")
+            print(f"after reload: {status}")
+            if "Saved game loaded" not in status:
+                failures.append("saved game was not restored after reload")
+
+            failures.extend(f"page error: {error}" for error in errors)
+            browser.close()
+    finally:
+        server.shutdown()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print(f"smoke test passed: {'yes' if not failures else 'NO'}")
+    raise SystemExit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()